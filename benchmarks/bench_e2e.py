@@ -0,0 +1,159 @@
+# coding=utf-8
+"""
+同步 client 端到端吞吐与延迟, 默认在进程内启动 SnbSimulator
+
+    PYTHONPATH=src python benchmarks/bench_e2e.py --requests 2000 --concurrency 8 > e2e.json
+
+进程内的模拟服务与 client 共享 GIL, 对比绝对数值时建议单独启动模拟服务:
+
+    PYTHONPATH=src python -m snbpy.simulator --port 8080 &
+    PYTHONPATH=src python benchmarks/bench_e2e.py --port 8080
+
+    get_balance        资产查询
+    get_order_by_id    按 ID 查询订单
+    get_order_list     订单列表, 每页 --page-size 条
+    place_order        下单
+    place_template     使用 OrderTemplate 下单
+每个场景先预热, 再以 --concurrency 个线程共执行 --requests 次
+结果以 JSON 输出, 延迟为毫秒(p50/p99/mean/max), rps 为每秒请求数, errors 为失败次数
+"""
+import argparse
+import itertools
+import json
+import platform
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from snbpy.common.constant.snb_constant import SecurityType, OrderSide, Currency
+from snbpy.common.domain.snb_config import SnbConfig
+from snbpy.simulator import SnbSimulator
+from snbpy.snb_api_client import SnbHttpClient
+
+try:
+    from importlib.metadata import version as _version
+except ImportError:  # pragma: no cover
+    _version = None
+
+
+def metadata() -> dict:
+    """
+    运行环境, 用于区分不同版本/机器的结果
+    """
+    snbpy_version = "unknown"
+    if _version is not None:
+        try:
+            snbpy_version = _version("snbpy")
+        except Exception:
+            pass
+    return {"snbpy": snbpy_version, "python": platform.python_version(), "platform": platform.platform(),
+            "time": int(time.time())}
+
+
+def percentile(sorted_values: list, q: float) -> float:
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def run(name: str, func, requests: int, concurrency: int, warmup: int) -> dict:
+    for _ in range(warmup):
+        func()
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+
+    def call(_):
+        start = time.perf_counter()
+        try:
+            ok = func().succeed()
+        except Exception:
+            ok = False
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+            if not ok:
+                errors[0] += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(call, range(requests)))
+    duration = time.perf_counter() - start
+    latencies.sort()
+    return {"name": name, "requests": requests, "errors": errors[0], "rps": round(requests / duration, 1),
+            "p50_ms": round(percentile(latencies, 0.5) * 1000, 3),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+            "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3),
+            "max_ms": round(latencies[-1] * 1000, 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=None, help="external simulator port, default in-process")
+    parser.add_argument("--requests", type=int, default=2000, help="requests per case")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0, help="in-process simulator latency, seconds")
+    parser.add_argument("--cases", default="get_balance,get_order_by_id,get_order_list,place_order,place_template")
+    args = parser.parse_args()
+
+    simulator = None
+    port = args.port
+    if port is None:
+        simulator = SnbSimulator(args.host, 0, latency=args.latency)
+        simulator.start()
+        port = simulator.port
+
+    config = SnbConfig()
+    config.account = "U123"
+    config.key = "123"
+    config.sign_type = "None"
+    config.snb_server = args.host
+    config.snb_port = str(port)
+    config.timeout = 10
+    config.schema = "http"
+    config.pool_size = args.concurrency
+    config.keep_result_str = False
+    client = SnbHttpClient(config)
+    # 每次调用都发出请求, 不合并并发的相同查询
+    for request_class in SnbHttpClient.COALESCED_REQUESTS:
+        client.set_coalescing(request_class, False)
+    client.login()
+
+    # 生成器不能在多线程间共享, itertools.count 的 next 是原子的
+    prefix, counter = "bench-%d-" % int(time.time() * 1000), itertools.count()
+
+    def next_order_id():
+        return prefix + str(next(counter))
+
+    template = client.create_order_template(SecurityType.STK, "00700", "HKEX", Currency.HKD)
+    for _ in range(args.page_size):
+        client.place_order(next_order_id(), SecurityType.STK, "00700", "HKEX", OrderSide.BUY, Currency.HKD, 100,
+                           100.1)
+    known_id = client.get_order_list(1, 1).data["items"][0]["id"]
+
+    cases = {"get_balance": client.get_balance,
+             "get_order_by_id": lambda: client.get_order_by_id(known_id),
+             "get_order_list": lambda: client.get_order_list(1, args.page_size),
+             "place_order": lambda: client.place_order(next_order_id(), SecurityType.STK, "00700", "HKEX",
+                                                       OrderSide.BUY, Currency.HKD, 100, 100.1),
+             "place_template": lambda: client.place_template_order(template, next_order_id(), OrderSide.BUY, 100,
+                                                                   100.1)}
+    try:
+        results = [run(name, cases[name], args.requests, args.concurrency, args.warmup)
+                   for name in args.cases.split(",")]
+    finally:
+        client.close()
+        if simulator is not None:
+            simulator.stop()
+    meta = dict(metadata(), concurrency=args.concurrency, page_size=args.page_size,
+                simulator="in-process" if simulator is not None else "%s:%d" % (args.host, port))
+    json.dump({"benchmark": "e2e", "meta": meta, "results": results}, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+# coding=utf-8
+"""
+客户端热点路径的微基准, 不访问网络
+
+    PYTHONPATH=src python benchmarks/bench_micro.py --items 2000 > micro.json
+
+    build_place_order         构造 PlaceOrderRequest
+    place_order_params        PlaceOrderRequest.generate_params + verify
+    template_encode           OrderTemplate.encode, 预编码下单请求体
+    order_list_params         GetOrderListRequest.generate_params
+    parse_order_page          _parse_response 解析一页订单 (--items 条)
+    parse_position_list       _parse_response 解析持仓列表 (--items 条)
+    model_order_page          as_orders 后遍历全部订单模型
+结果以 JSON 输出, time_us 为单次耗时(多轮取最小值), ops 为每秒次数, 可用 compare.py 对比两个版本
+"""
+import argparse
+import json
+import sys
+import timeit
+
+from bench_e2e import metadata
+from bench_parse_response import order_page, build_client
+from snbpy.common.constant.snb_constant import SecurityType, OrderSide, Currency
+from snbpy.common.domain.request import PlaceOrderRequest, GetOrderListRequest, OrderTemplate
+from snbpy.common.util.json_utils import default_decoder
+
+
+def position_list(items: int) -> bytes:
+    position = {"account_id": "DU1234567", "average_price": 176.4124, "exchange": "USEX", "market_price": 152.55,
+                "position": 378753, "realized_pnl": 0.0, "security_type": "STK", "symbol": "EL"}
+    return json.dumps({"result_code": "60000", "msg": None,
+                       "result_data": [dict(position, symbol="S%d" % i) for i in range(items)]}).encode("utf-8")
+
+
+def measure(name: str, func, number: int) -> dict:
+    time_us = min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+    return {"name": name, "time_us": round(time_us, 3), "ops": round(1e6 / time_us, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=2000, help="items per parsed page")
+    parser.add_argument("--number", type=int, default=20000, help="calls per timing round for the request cases")
+    args = parser.parse_args()
+
+    def build_place_order():
+        return PlaceOrderRequest("U123", "1711419657579", SecurityType.STK, "00700", "HKEX", OrderSide.BUY,
+                                 Currency.HKD, 100, 100.1)
+
+    place_order = build_place_order()
+    order_list = GetOrderListRequest("U123", 1, 100)
+    template = OrderTemplate("U123", SecurityType.STK, "00700", "HKEX", Currency.HKD)
+    client = build_client(default_decoder(), False)
+    orders, positions = order_page(args.items), position_list(args.items)
+    parse_number = max(1, args.number // args.items)
+
+    def place_order_params():
+        place_order.verify()
+        return place_order.generate_params()
+
+    results = [measure("build_place_order", build_place_order, args.number),
+               measure("place_order_params", place_order_params, args.number),
+               measure("template_encode", lambda: template.encode(OrderSide.BUY, 100, 100.1), args.number),
+               measure("order_list_params", order_list.generate_params, args.number),
+               measure("parse_order_page", lambda: client._parse_response(orders), parse_number),
+               measure("parse_position_list", lambda: client._parse_response(positions), parse_number),
+               measure("model_order_page", lambda: list(client._parse_response(orders).as_orders()), parse_number)]
+    json.dump({"benchmark": "micro", "meta": dict(metadata(), items=args.items), "results": results},
+              sys.stdout, indent=2)
+    sys.stdout.write("\n")
+
+
+if __name__ == '__main__':
+    main()
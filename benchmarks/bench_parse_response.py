@@ -0,0 +1,82 @@
+# coding=utf-8
+"""
+_parse_response 的 CPU 与内存对比
+
+    PYTHONPATH=src python benchmarks/bench_parse_response.py --items 2000
+
+对比三种方式解析同一页订单:
+    json+str     1.0.7 的方式, body 先解码为 str, 标准库解析, 保留 result_str
+    json         直接从 bytes 解析, 不保留 result_str
+    orjson       orjson 从 bytes 解析, 不保留 result_str (需安装 orjson)
+结果以 JSON 输出, time_us 为单次解析耗时, retained_kb 为解析结果常驻内存, peak_kb 为解析过程的内存峰值
+"""
+import argparse
+import json
+import sys
+import timeit
+import tracemalloc
+
+from snbpy.common.domain.snb_config import SnbConfig
+from snbpy.common.util.json_utils import JsonDecoder, OrjsonDecoder, orjson
+from snbpy.snb_api_client import SnbHttpClient
+
+
+def order_page(items: int) -> bytes:
+    order = {"account_id": "DU123456", "average_price": 0.0, "children": None, "currency": "HKD",
+             "exchange": "HKEX", "filled_quantity": 0, "group_id": None, "id": "1711419657579", "memo": "",
+             "order_time": 1711419658000, "order_type": "STOP_LIMIT", "parent": None, "price": 100.0,
+             "quantity": 100, "rth": True, "secondary_order_id": "004c4d6b.000130f7.66010d09.0002",
+             "security_type": "STK", "side": "BUY", "snb_order_id": "5588456391694560", "status": "WITHDRAWED",
+             "stop_price": None, "symbol": "00700", "tif": "DAY"}
+    page = [dict(order, id=str(1711419657579 + i), snb_order_id=str(5588456391694560 + i)) for i in range(items)]
+    return json.dumps({"result_code": "60000", "msg": None,
+                       "result_data": {"count": items, "page": 1, "size": items, "items": page}}).encode("utf-8")
+
+
+def build_client(decoder, keep_result_str: bool) -> SnbHttpClient:
+    config = SnbConfig()
+    config.account = "U123"
+    config.key = "123"
+    config.sign_type = "None"
+    config.snb_server = "localhost"
+    config.snb_port = "8080"
+    config.timeout = 1000
+    config.schema = "http"
+    config.keep_result_str = keep_result_str
+    client = SnbHttpClient(config)
+    client.json_decoder = decoder
+    return client
+
+
+def measure(name: str, parse, body: bytes, number: int) -> dict:
+    time_us = min(timeit.repeat(lambda: parse(body), number=number, repeat=5)) / number * 1e6
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    response = parse(body)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del response
+    return {"name": name, "time_us": round(time_us, 1), "retained_kb": round((current - baseline) / 1024, 1),
+            "peak_kb": round((peak - baseline) / 1024, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=2000, help="items per page")
+    parser.add_argument("--number", type=int, default=20, help="parses per timing round")
+    args = parser.parse_args()
+
+    body = order_page(args.items)
+    legacy = build_client(JsonDecoder(), True)
+    cases = [("json+str", lambda data: legacy._parse_response(data.decode("utf-8"))),
+             ("json", build_client(JsonDecoder(), False)._parse_response)]
+    if orjson is not None:
+        cases.append(("orjson", build_client(OrjsonDecoder(), False)._parse_response))
+    results = [measure(name, parse, body, args.number) for name, parse in cases]
+    json.dump({"benchmark": "parse_response", "items": args.items, "body_kb": round(len(body) / 1024, 1),
+               "results": results}, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+# coding=utf-8
+"""
+对比两次基准结果, 如发版前后
+
+    PYTHONPATH=src python benchmarks/compare.py base.json head.json
+
+按 benchmark 与 name 匹配结果, 输出各指标的变化比例 (head / base)
+耗时类指标(_us, _ms)比例小于 1 为变快, 吞吐类指标(ops, rps)比例大于 1 为变快
+--threshold 设置后, 任一指标变慢超过该比例时退出码为 1, 可用于 CI
+"""
+import argparse
+import json
+import sys
+
+LOWER_IS_BETTER = ("_us", "_ms", "_kb")
+HIGHER_IS_BETTER = ("ops", "rps")
+
+
+def load(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        report = json.load(f)
+    return {(report["benchmark"], result["name"]): result for result in report["results"]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--threshold", type=float, default=None, help="allowed slowdown, e.g. 0.1 for 10%%")
+    args = parser.parse_args()
+
+    base, head = load(args.base), load(args.head)
+    rows = []
+    regressed = False
+    for key in sorted(set(base) & set(head)):
+        for metric, base_value in sorted(base[key].items()):
+            head_value = head[key].get(metric)
+            if not isinstance(base_value, (int, float)) or not isinstance(head_value, (int, float)) \
+                    or isinstance(base_value, bool) or not base_value:
+                continue
+            if metric.endswith(LOWER_IS_BETTER):
+                slowdown = head_value / base_value - 1
+            elif metric.endswith(HIGHER_IS_BETTER):
+                slowdown = base_value / head_value - 1 if head_value else float("inf")
+            else:
+                continue
+            if args.threshold is not None and slowdown > args.threshold:
+                regressed = True
+            rows.append({"benchmark": key[0], "name": key[1], "metric": metric, "base": base_value,
+                         "head": head_value, "ratio": round(head_value / base_value, 3)})
+    json.dump({"comparison": rows, "regressed": regressed}, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    sys.exit(1 if regressed else 0)
+
+
+if __name__ == '__main__':
+    main()
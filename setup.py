@@ -44,6 +44,12 @@ setup(
     packages=find_packages(where='src'),
     python_requires='>=3.6, <4',
     install_requires=['requests'],
+    extras_require={
+        'async': ['aiohttp'],
+        'numpy': ['numpy'],
+        'pandas': ['pandas'],
+        'arrow': ['pyarrow'],
+    },
     py_modules=['snbpy'],
     project_urls={
         'Bug Reports': 'https://github.com/snowballsecurities/snbpy/issues',
@@ -0,0 +1,157 @@
+# coding=utf-8
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+logger = logging.getLogger("snbpy")
+
+
+class FileCache(object):
+    """
+    持久化缓存, 保存 access token 与证券信息, 进程重启后可直接使用
+
+    每个账户一个紧凑 JSON 文件, 写入时先写临时文件再原子替换, 读-改-写过程持有文件锁(仅 POSIX),
+    多个进程共享同一个 cache_path 是安全的, 目录在首次写入时创建, 创建失败时记录警告并停用缓存
+    {
+        "token": {"access_token": "...", "expiry_time": 1711451636344},
+        "security_details": {"00700": {"result_code": "60000", "msg": "", "data": {...}, "expire_at": 1711451636.3}}
+    }
+    """
+
+    def __init__(self, cache_path: str, account: str):
+        self._cache_path = cache_path
+        self._file = os.path.join(cache_path, "snbpy_%s.json" % account)
+        self._lock_file = self._file + ".lock"
+        self._lock = threading.Lock()
+        self._dir_ready = False
+        self._disabled = False
+
+    @property
+    def file(self) -> str:
+        return self._file
+
+    @property
+    def disabled(self) -> bool:
+        return self._disabled
+
+    def _ensure_dir(self) -> bool:
+        """
+        创建缓存目录, 失败后停用缓存, 不再读写文件
+        :return: 缓存是否可用
+        """
+        if self._dir_ready:
+            return True
+        if self._disabled:
+            return False
+        try:
+            os.makedirs(self._cache_path, exist_ok=True)
+            self._dir_ready = True
+        except OSError as e:
+            self._disabled = True
+            logger.warning("create cache path failed, file cache disabled;; path: %s; %s", self._cache_path, e)
+        return self._dir_ready
+
+    @contextmanager
+    def _locked(self):
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self._lock_file, "a") as lock_file:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def load(self) -> dict:
+        if self._disabled:
+            return {}
+        try:
+            with open(self._file, "rb") as f:
+                return json.loads(f.read())
+        except FileNotFoundError:
+            return {}
+        except (ValueError, OSError) as e:
+            logger.warning("cache file is broken, ignored;; file: %s; %s", self._file, e)
+            return {}
+
+    def _write(self, content: dict):
+        fd, tmp_file = tempfile.mkstemp(prefix=".snbpy_", dir=os.path.dirname(self._file))
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(content, f, separators=(',', ':'))
+            os.replace(tmp_file, self._file)
+        except Exception:
+            os.unlink(tmp_file)
+            raise
+
+    def update(self, func):
+        """
+        读-改-写缓存文件
+        :param func: 以缓存内容 dict 为参数, 原地修改
+        """
+        if not self._ensure_dir():
+            return
+        try:
+            with self._locked():
+                content = self.load()
+                func(content)
+                self._write(content)
+        except OSError as e:
+            logger.warning("write cache file failed;; file: %s; %s", self._file, e)
+
+    def get_token(self):
+        """
+        :return: (access_token, expiry_time), 不存在时返回 None
+        """
+        token = self.load().get("token")
+        if not token:
+            return None
+        return token.get("access_token"), token.get("expiry_time")
+
+    def put_token(self, access_token: str, expiry_time: int):
+        self.update(lambda content: content.__setitem__(
+            "token", {"access_token": access_token, "expiry_time": expiry_time}))
+
+    def get_security_details(self) -> dict:
+        """
+        :return: symbol -> 证券信息, 已过期的条目不返回
+        """
+        now = time.time()
+        details = self.load().get("security_details") or {}
+        return {symbol: detail for symbol, detail in details.items()
+                if detail.get("expire_at") is None or detail.get("expire_at") > now}
+
+    def put_security_detail(self, symbol: str, result_code: str, msg: str, data, expire_at: float = None):
+        def put(content):
+            details = content.setdefault("security_details", {})
+            now = time.time()
+            for key in [key for key, detail in details.items()
+                        if detail.get("expire_at") is not None and detail.get("expire_at") <= now]:
+                del details[key]
+            details[symbol] = {"result_code": result_code, "msg": msg, "data": data, "expire_at": expire_at}
+
+        self.update(put)
+
+    def remove_security_detail(self, symbol: str = None):
+        """
+        :param symbol: 证券代码, 为空时清除全部
+        """
+
+        def remove(content):
+            if symbol is None:
+                content.pop("security_details", None)
+            else:
+                (content.get("security_details") or {}).pop(symbol, None)
+
+        self.update(remove)
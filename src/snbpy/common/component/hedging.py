@@ -0,0 +1,216 @@
+# coding=utf-8
+import collections
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+
+from snbpy.common.constant.exceptions import SnbException, RATE_LIMITED, OVERLOADED
+
+logger = logging.getLogger("snbpy")
+
+
+class RequestHedger(object):
+    """
+    对冲请求: 第一次请求在延迟阈值内未返回时, 再发送一次相同的请求, 使用先成功返回的结果, 丢弃另一个
+    只能用于幂等请求, client 中只对 GET 请求生效
+
+    第一次请求不排队, 不会因排队而被限制并发或误判为慢请求: 有对冲额度且最多 primary_workers 个线程的
+    第一次请求线程池有空闲线程时在线程池中执行, 调用线程等待先返回的结果, 否则直接在调用线程执行且不对冲;
+    对冲请求在最多 max_workers 个线程的对冲线程池中执行, 线程池已满时不对冲
+    延迟阈值为该接口最近 window 次请求延迟的 quantile 分位数, 限制在 [min_delay, max_delay] 内,
+    样本不足 min_samples 时使用 max_delay, 延迟从请求开始执行时计算
+    对冲受预算限制: 每个请求积累 budget_ratio 个额度, 每次对冲消耗 1 个, 额度上限为 max_budget,
+    因此对冲请求数不超过请求总数的 budget_ratio 倍(加上 max_budget 的突发);
+    hedge_func 因本地没有空闲的连接或限流名额(OVERLOADED/RATE_LIMITED)而未发出请求时退还额度, 不计入对冲次数
+    """
+
+    def __init__(self, quantile: float = 0.95, min_delay: float = 0.005, max_delay: float = 1.0,
+                 budget_ratio: float = 0.1, max_budget: float = 10, window: int = 512, min_samples: int = 20,
+                 max_workers: int = 32, primary_workers: int = 10):
+        """
+        :param quantile: 延迟阈值对应的分位数
+        :param min_delay: 延迟阈值下限, 秒
+        :param max_delay: 延迟阈值上限, 秒
+        :param budget_ratio: 每个请求积累的对冲额度
+        :param max_budget: 对冲额度上限, 也是初始额度
+        :param window: 每个接口保留的延迟样本数
+        :param min_samples: 计算分位数所需的最少样本数
+        :param max_workers: 同时进行的对冲请求数上限
+        :param primary_workers: 执行第一次请求的线程数, 一般与连接池大小 SnbConfig.pool_size 一致
+        """
+        self._quantile = quantile
+        self._min_delay = min_delay
+        self._max_delay = max_delay
+        self._budget_ratio = budget_ratio
+        self._max_budget = max_budget
+        self._window = window
+        self._min_samples = min_samples
+        self._max_workers = max_workers
+        self._primary_workers = primary_workers
+        self._hedge_slots = threading.BoundedSemaphore(max_workers)
+        self._primary_slots = threading.BoundedSemaphore(primary_workers)
+        self._lock = threading.Lock()
+        self._budget = max_budget
+        self._samples = {}
+        self._observed = {}
+        self._delays = {}
+        self._executor = None
+        self._primary_executor = None
+        self._requests = 0
+        self._hedged = 0
+        self._hedge_wins = 0
+
+    def delay(self, key) -> float:
+        """
+        :return: 接口 key 当前的对冲延迟阈值, 秒
+        """
+        with self._lock:
+            return self._delays.get(key, self._max_delay)
+
+    def stats(self) -> dict:
+        """
+        :return: {"requests": 请求数, "hedged": 对冲次数, "hedge_wins": 对冲请求先返回的次数, "budget": 剩余额度}
+        """
+        with self._lock:
+            return {"requests": self._requests, "hedged": self._hedged, "hedge_wins": self._hedge_wins,
+                    "budget": self._budget}
+
+    def close(self):
+        with self._lock:
+            executors = (self._executor, self._primary_executor)
+            self._executor = self._primary_executor = None
+        for executor in executors:
+            if executor is not None:
+                executor.shutdown(wait=False)
+
+    def call(self, key, func, hedge_func=None):
+        """
+        执行 func, 必要时对冲
+        :param key: 接口标识, 延迟样本按 key 统计, 如请求类名
+        :param func: 无参的幂等调用, 可能在两个线程中同时执行
+        :param hedge_func: 对冲时执行的无参调用, 返回值与 func 相同, 默认为 func;
+                           可在其中占用限流名额、连接等, 抛出异常视为对冲失败
+        :return: 先成功返回的结果, 两次都失败时抛出第一次请求的异常
+        """
+        with self._lock:
+            self._requests += 1
+            self._budget = min(self._max_budget, self._budget + self._budget_ratio)
+            delay = self._delays.get(key, self._max_delay)
+            can_hedge = self._budget >= 1
+        if not can_hedge or not self._primary_slots.acquire(blocking=False):
+            return self._timed(key, func)
+        primary = Future()
+        try:
+            self._primary_pool().submit(self._run, key, func, primary, self._primary_slots)
+        except BaseException:
+            self._primary_slots.release()
+            raise
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+        hedge = self._hedge(key, hedge_func or func)
+        if hedge is None:
+            return primary.result()
+        logger.debug("hedge request;; key: %s; delay: %s", key, delay)
+        pending = [primary, hedge]
+        while True:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in (primary, hedge):
+                if future in done and future.exception() is None:
+                    if future is hedge:
+                        with self._lock:
+                            self._hedge_wins += 1
+                    # 另一个请求已发出时无法中断, 其结果被丢弃
+                    for other in pending:
+                        other.cancel()
+                    return future.result()
+            pending = [future for future in pending if future not in done]
+            if not pending:
+                return primary.result()
+
+    def _hedge(self, key, func):
+        """
+        占用对冲线程与额度后提交对冲请求, 线程池已满或额度不足时返回 None
+        """
+        if not self._hedge_slots.acquire(blocking=False):
+            return None
+        with self._lock:
+            if self._budget < 1:
+                self._hedge_slots.release()
+                return None
+            # 先扣除额度避免并发对冲超出预算, 对冲未发出时在 _run 中退还
+            self._budget -= 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self._max_workers,
+                                                    thread_name_prefix="snbpy-hedge")
+            executor = self._executor
+        future = Future()
+        try:
+            executor.submit(self._run, key, func, future, self._hedge_slots, True)
+        except BaseException:
+            self._hedge_slots.release()
+            with self._lock:
+                self._budget = min(self._max_budget, self._budget + 1)
+            raise
+        return future
+
+    def _primary_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._primary_executor is None:
+                self._primary_executor = ThreadPoolExecutor(max_workers=self._primary_workers,
+                                                            thread_name_prefix="snbpy-hedge-primary")
+            return self._primary_executor
+
+    def _run(self, key, func, future: Future, slots: threading.BoundedSemaphore, hedge: bool = False):
+        try:
+            if not future.set_running_or_notify_cancel():
+                if hedge:
+                    self._settle_hedge(False)
+                return
+            try:
+                result = self._timed(key, func)
+            except BaseException as e:
+                if hedge:
+                    self._settle_hedge(not self._not_sent(e))
+                future.set_exception(e)
+            else:
+                if hedge:
+                    self._settle_hedge(True)
+                future.set_result(result)
+        finally:
+            slots.release()
+
+    @staticmethod
+    def _not_sent(e: BaseException) -> bool:
+        """
+        :return: 异常是否表示对冲请求因没有空闲的连接或限流名额而未发出
+        """
+        return isinstance(e, SnbException) and e.code in (OVERLOADED, RATE_LIMITED)
+
+    def _settle_hedge(self, sent: bool):
+        with self._lock:
+            if sent:
+                self._hedged += 1
+            else:
+                self._budget = min(self._max_budget, self._budget + 1)
+
+    def _timed(self, key, func):
+        start = time.perf_counter()
+        result = func()
+        self._observe(key, time.perf_counter() - start)
+        return result
+
+    def _observe(self, key, latency: float):
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = collections.deque(maxlen=self._window)
+            samples.append(latency)
+            observed = self._observed[key] = self._observed.get(key, 0) + 1
+            # 达到最少样本数后, 每积累 1/16 个窗口的新样本重新计算一次阈值
+            if observed == self._min_samples or \
+                    observed > self._min_samples and observed % max(1, self._window // 16) == 0:
+                ordered = sorted(samples)
+                value = ordered[min(len(ordered) - 1, int(self._quantile * len(ordered)))]
+                self._delays[key] = min(self._max_delay, max(self._min_delay, value))
@@ -1,2 +1,96 @@
+# coding=utf-8
+import threading
+import time
+from collections import OrderedDict
+
+
 class LocalCache(object):
-    pass
+    """
+    线程安全的本地缓存, 支持按条目过期(TTL)与容量上限(LRU 淘汰), 并统计命中率
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = None):
+        """
+        :param max_size: 最大条目数, 超出后淘汰最久未使用的条目
+        :param ttl: 默认过期时间, 秒, None 表示不过期
+        """
+        self._max_size = max_size
+        self._ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.RLock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, expire_at = entry
+                if expire_at is None or expire_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self._hits += 1
+                    return value
+                del self._data[key]
+            self._misses += 1
+            return default
+
+    def put(self, key, value, ttl: float = None):
+        """
+        :param ttl: 该条目的过期时间, 秒, 为空时使用默认过期时间
+        """
+        ttl = self._ttl if ttl is None else ttl
+        expire_at = None if ttl is None else time.monotonic() + ttl
+        with self._lock:
+            self._data[key] = (value, expire_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self._max_size:
+                self._data.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self, key) -> bool:
+        with self._lock:
+            return self._data.pop(key, None) is not None
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def items(self) -> list:
+        """
+        :return: 未过期的 (key, value, expire_at) 列表, expire_at 为 time.monotonic() 时间
+        """
+        now = time.monotonic()
+        with self._lock:
+            return [(key, value, expire_at) for key, (value, expire_at) in self._data.items()
+                    if expire_at is None or expire_at > now]
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+    def __contains__(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            return entry is not None and (entry[1] is None or entry[1] > time.monotonic())
+
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        return self._misses
+
+    @property
+    def evictions(self) -> int:
+        return self._evictions
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self._hits + self._misses
+            return {"size": len(self._data),
+                    "hits": self._hits,
+                    "misses": self._misses,
+                    "evictions": self._evictions,
+                    "hit_rate": self._hits / total if total else 0.0}
@@ -0,0 +1,213 @@
+# coding=utf-8
+import abc
+import bisect
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+try:
+    from http.server import ThreadingHTTPServer
+except ImportError:  # pragma: no cover
+    from socketserver import ThreadingMixIn
+
+
+    class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+        daemon_threads = True
+
+logger = logging.getLogger("snbpy")
+
+# 请求各阶段: 校验(含 token 与请求头), 参数准备, 网络, 解析, 总耗时
+PHASES = ("verify", "prepare", "network", "parse", "total")
+
+# 延迟直方图的桶上界, 秒
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class MetricsSink(metaclass=abc.ABCMeta):
+    """
+    指标接收器, 通过 client.metrics_sink 设置, 每个请求结束后调用一次 record
+    未设置时 client 不做任何计时
+    """
+
+    @abc.abstractmethod
+    def record(self, endpoint: str, result_code: str, timings: dict):
+        """
+        :param endpoint: 接口名, 即请求类名, 如 GetOrderListRequest
+        :param result_code: 响应的 result_code, 异常时为异常的 code 或异常类名
+        :param timings: 阶段 -> 耗时(秒), 阶段见 PHASES, 合并请求的跟随者只有 total
+        """
+        pass
+
+
+class CallbackMetricsSink(MetricsSink):
+    """
+    把指标转发给回调函数 callback(endpoint, result_code, timings)
+    """
+
+    def __init__(self, callback):
+        self._callback = callback
+
+    def record(self, endpoint: str, result_code: str, timings: dict):
+        try:
+            self._callback(endpoint, result_code, timings)
+        except Exception as e:
+            logger.warning("metrics callback failed;; %s", e)
+
+
+class Histogram(object):
+    def __init__(self, buckets: tuple = DEFAULT_BUCKETS):
+        self._buckets = buckets
+        self._counts = [0] * (len(buckets) + 1)
+        self._count = 0
+        self._sum = 0.0
+
+    def observe(self, value: float):
+        self._counts[bisect.bisect_left(self._buckets, value)] += 1
+        self._count += 1
+        self._sum += value
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @property
+    def sum(self) -> float:
+        return self._sum
+
+    def cumulative(self) -> list:
+        """
+        :return: [(上界, 累计数量)], 最后一个上界为 inf
+        """
+        result = []
+        total = 0
+        for bound, count in zip(self._buckets + (float("inf"),), self._counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def quantile(self, q: float) -> float:
+        """
+        按桶估算分位数, 返回所在桶的上界, 无数据时返回 None
+        """
+        if self._count == 0:
+            return None
+        rank = q * self._count
+        for bound, total in self.cumulative():
+            if total >= rank:
+                return bound if bound != float("inf") else self._buckets[-1]
+        return self._buckets[-1]
+
+
+class _EndpointMetrics(object):
+    def __init__(self, buckets):
+        self.count = 0
+        self.result_codes = {}
+        self.histograms = {phase: Histogram(buckets) for phase in PHASES}
+
+
+class MetricsRecorder(MetricsSink):
+    """
+    按接口聚合请求数、result_code 分布与各阶段延迟直方图, 线程安全
+    """
+
+    def __init__(self, buckets: tuple = DEFAULT_BUCKETS):
+        self._buckets = buckets
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def record(self, endpoint: str, result_code: str, timings: dict):
+        with self._lock:
+            metrics = self._endpoints.get(endpoint)
+            if metrics is None:
+                metrics = self._endpoints[endpoint] = _EndpointMetrics(self._buckets)
+            metrics.count += 1
+            metrics.result_codes[result_code] = metrics.result_codes.get(result_code, 0) + 1
+            for phase, value in timings.items():
+                metrics.histograms[phase].observe(value)
+
+    def quantile(self, endpoint: str, q: float, phase: str = "total") -> float:
+        with self._lock:
+            metrics = self._endpoints.get(endpoint)
+            return None if metrics is None else metrics.histograms[phase].quantile(q)
+
+    def snapshot(self) -> dict:
+        """
+        :return: 接口 -> {"count", "result_codes", "latency": 阶段 -> {"count", "sum", "p50", "p99"}}
+        """
+        with self._lock:
+            return {endpoint: {"count": metrics.count,
+                               "result_codes": dict(metrics.result_codes),
+                               "latency": {phase: {"count": histogram.count, "sum": histogram.sum,
+                                                   "p50": histogram.quantile(0.5), "p99": histogram.quantile(0.99)}
+                                           for phase, histogram in metrics.histograms.items()}}
+                    for endpoint, metrics in self._endpoints.items()}
+
+    def render_prometheus(self) -> str:
+        """
+        :return: Prometheus 文本格式的指标
+        """
+        lines = ["# TYPE snbpy_requests_total counter"]
+        with self._lock:
+            endpoints = sorted(self._endpoints.items())
+            for endpoint, metrics in endpoints:
+                for result_code, count in sorted(metrics.result_codes.items()):
+                    lines.append('snbpy_requests_total{endpoint="%s",result_code="%s"} %d' % (
+                        endpoint, result_code, count))
+            lines.append("# TYPE snbpy_request_duration_seconds histogram")
+            for endpoint, metrics in endpoints:
+                for phase in PHASES:
+                    histogram = metrics.histograms[phase]
+                    if histogram.count == 0:
+                        continue
+                    labels = 'endpoint="%s",phase="%s"' % (endpoint, phase)
+                    for bound, total in histogram.cumulative():
+                        le = "+Inf" if bound == float("inf") else repr(bound)
+                        lines.append('snbpy_request_duration_seconds_bucket{%s,le="%s"} %d' % (labels, le, total))
+                    lines.append('snbpy_request_duration_seconds_sum{%s} %r' % (labels, histogram.sum))
+                    lines.append('snbpy_request_duration_seconds_count{%s} %d' % (labels, histogram.count))
+        return "\n".join(lines) + "\n"
+
+
+class PrometheusExporter(object):
+    """
+    以 HTTP 暴露 MetricsRecorder 的指标, 供 Prometheus 抓取
+
+    exporter = PrometheusExporter(recorder, port=9108)
+    exporter.start()
+
+    默认只监听本机, 需要被其它机器抓取时显式传入 host="0.0.0.0"
+    """
+
+    def __init__(self, recorder: MetricsRecorder, host: str = "127.0.0.1", port: int = 9108):
+        self._recorder = recorder
+        self._host = host
+        self._port = port
+        self._server = None
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1] if self._server is not None else self._port
+
+    def start(self):
+        recorder = self._recorder
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = recorder.render_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self._host, self._port), Handler)
+        threading.Thread(target=self._server.serve_forever, name="snbpy-metrics", daemon=True).start()
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
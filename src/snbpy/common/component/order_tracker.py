@@ -0,0 +1,204 @@
+# coding=utf-8
+import logging
+import threading
+
+from snbpy.common.constant.snb_constant import UNFINISHED_ORDER_STATUSES
+from snbpy.common.domain.request import GetOrderByOrderIdRequest, GetOrderListRequest
+
+logger = logging.getLogger("snbpy")
+
+# 比较差异的订单字段
+TRACKED_FIELDS = ("status", "filled_quantity", "average_price")
+# 已离开未完成状态但无法查询最终状态的订单标记
+DEPARTED = "departed"
+
+
+class OrderTracker(object):
+    """
+    本地订单簿, 按 id 与 snb_order_id 索引, 查询为 O(1), 返回的订单均为副本
+
+    未完成状态见 UNFINISHED_ORDER_STATUSES, 包括撤单中、改单中的订单, 这些订单在撤单或改单完成前仍可能成交
+    refresh 按每个未完成状态拉取订单列表的前几页, 与本地订单簿比较后只应用差异(status, filled_quantity, average_price),
+    每个变化的订单调用一次监听器; 离开未完成状态的订单只对这部分订单单独查询一次最终状态
+    因此每轮的请求数与未完成订单数无关(每个状态不超过 max_pages 页), 而不是每个订单一次 get_order_by_id
+    get_order_by_id 只支持客户端订单 ID, 不是通过 API 下的订单(id 为空)离开未完成状态时无法查询最终状态,
+    只标记 departed 为 True 并通知监听器, 之后不再查询, 也不计入 open_orders
+
+    tracker = OrderTracker(client)
+    tracker.add_listener(lambda order, changes: print(order["id"], changes))
+    tracker.refresh()
+    """
+
+    def __init__(self, client, security_type: str = "STK,OPT,WAR,IOPT,FUT", page_size: int = 100,
+                 max_pages: int = 5):
+        """
+        :param client: SnbHttpClient
+        :param security_type: 证券类型，多个类型用逗号分隔，参见数据字典：SecurityType
+        :param page_size: 每页大小
+        :param max_pages: 每轮每个状态最多拉取的页数
+        """
+        self._client = client
+        self._security_type = security_type
+        self._page_size = page_size
+        self._max_pages = max_pages
+        self._open_statuses = frozenset(status.value for status in UNFINISHED_ORDER_STATUSES)
+        self._lock = threading.Lock()
+        self._orders = {}
+        self._ids = {}
+        self._listeners = []
+
+    def add_listener(self, listener):
+        """
+        :param listener: listener(order, changes), changes 为 字段 -> (旧值, 新值), 新订单的旧值为 None
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        self._listeners.remove(listener)
+
+    def get(self, order_id: str) -> dict:
+        """
+        :param order_id: 客户端订单 ID
+        """
+        with self._lock:
+            order = self._orders.get(self._ids.get(order_id))
+            return dict(order) if order is not None else None
+
+    def get_by_snb_order_id(self, snb_order_id: str) -> dict:
+        with self._lock:
+            order = self._orders.get(snb_order_id)
+            return dict(order) if order is not None else None
+
+    def open_orders(self) -> list:
+        """
+        :return: 未完成的订单, 包括撤单中、改单中的订单
+        """
+        with self._lock:
+            return [dict(order) for order in self._orders.values() if self._is_open(order)]
+
+    def __len__(self):
+        with self._lock:
+            return len(self._orders)
+
+    def clear_final(self) -> int:
+        """
+        移除已完成(成交、撤销、过期等)与标记为 departed 的订单
+        :return: 移除的数量
+        """
+        with self._lock:
+            final = [snb_order_id for snb_order_id, order in self._orders.items() if not self._is_open(order)]
+            for snb_order_id in final:
+                self._remove(snb_order_id)
+            return len(final)
+
+    def refresh(self) -> list:
+        """
+        同步一次未完成订单
+        :return: 本轮变化的 (order, changes) 列表
+        """
+        items, complete = self._fetch_open_orders()
+        events = []
+        with self._lock:
+            seen = set()
+            for item in items:
+                snb_order_id = item.get("snb_order_id")
+                seen.add(snb_order_id)
+                event = self._apply(item)
+                if event is not None:
+                    events.append(event)
+            departed = [order for snb_order_id, order in self._orders.items()
+                        if snb_order_id not in seen and self._is_open(order)] if complete else []
+        if departed:
+            events.extend(self._refresh_departed(departed))
+        for order, changes in events:
+            for listener in list(self._listeners):
+                try:
+                    listener(order, changes)
+                except Exception as e:
+                    logger.warning("order listener failed;; %s", e)
+        return events
+
+    def _is_open(self, order: dict) -> bool:
+        return order.get("status") in self._open_statuses and not order.get(DEPARTED)
+
+    def _fetch_open_orders(self) -> tuple:
+        """
+        订单列表的 status 参数只支持单个状态, 每个未完成状态分别查询, 各状态的第一页并发拉取
+        :return: (未完成订单列表, 是否已拉取全部)
+        """
+        account = self._client.config.account
+        statuses = sorted(self._open_statuses)
+        request_list = [GetOrderListRequest(account, 1, self._page_size, status, self._security_type)
+                        for status in statuses]
+        items = []
+        complete = True
+        for status, result in zip(statuses, self._client.execute_batch(request_list)):
+            response, page = result.response, 1
+            while True:
+                if response is None or not response.succeed():
+                    logger.warning("refresh open orders failed;; status: %s; page: %s; %s", status, page,
+                                   result.exception if response is None else response.message)
+                    complete = False
+                    break
+                page_items = response.data.get("items") or []
+                items.extend(item for item in page_items if item.get("status") in self._open_statuses)
+                if len(page_items) < self._page_size or page * self._page_size >= (response.data.get("count") or 0):
+                    break
+                if page >= self._max_pages:
+                    logger.warning("%s orders exceed %s pages, departed orders are not detected this round",
+                                   status, self._max_pages)
+                    complete = False
+                    break
+                page += 1
+                response = self._client.get_order_list(page, self._page_size, status, self._security_type)
+        return items, complete
+
+    def _refresh_departed(self, departed: list) -> list:
+        """
+        查询离开未完成状态的订单的最终状态, 没有客户端订单 ID 的只标记 departed
+        """
+        events = []
+        with self._lock:
+            for order in departed:
+                if not order.get("id"):
+                    order[DEPARTED] = True
+                    events.append((dict(order), {DEPARTED: (None, True)}))
+        account = self._client.config.account
+        request_list = [GetOrderByOrderIdRequest(account, order["id"]) for order in departed if order.get("id")]
+        for result in self._client.execute_batch(request_list):
+            if result.succeed() and result.response.data:
+                with self._lock:
+                    event = self._apply(result.response.data)
+                if event is not None:
+                    events.append(event)
+            else:
+                logger.warning("query departed order failed;; order_id: %s", result.request.order_id)
+        return events
+
+    def _apply(self, item: dict):
+        snb_order_id = item.get("snb_order_id")
+        if snb_order_id is None:
+            return None
+        order = self._orders.get(snb_order_id)
+        if order is None:
+            order = dict(item)
+            self._orders[snb_order_id] = order
+            if order.get("id"):
+                self._ids[order["id"]] = snb_order_id
+            return dict(order), {field: (None, order.get(field)) for field in TRACKED_FIELDS}
+        changes = {field: (order.get(field), item.get(field)) for field in TRACKED_FIELDS
+                   if order.get(field) != item.get(field)}
+        if order.get(DEPARTED):
+            # 标记为 departed 的订单又出现在未完成订单中
+            changes[DEPARTED] = (True, None)
+        if not changes:
+            return None
+        for field, (_, value) in changes.items():
+            order[field] = value
+        order.pop(DEPARTED, None)
+        return dict(order), changes
+
+    def _remove(self, snb_order_id: str):
+        order = self._orders.pop(snb_order_id, None)
+        if order is not None and order.get("id"):
+            self._ids.pop(order["id"], None)
@@ -0,0 +1,143 @@
+# coding=utf-8
+import collections
+import heapq
+import itertools
+import logging
+import threading
+from concurrent.futures import Future
+
+from snbpy.common.domain.request import PlaceOrderRequest, TemplateOrderRequest, CancelOrderRequest, \
+    GetOrderByOrderIdRequest
+
+logger = logging.getLogger("snbpy")
+
+# 优先级, 数值越小越先执行
+CANCEL_PRIORITY = 0
+ORDER_PRIORITY = 1
+QUERY_PRIORITY = 2
+
+
+class OrderedDispatcher(object):
+    """
+    按 key 有序、跨 key 并行的请求分发器
+    同一个 key 的请求严格按提交顺序逐个执行, 如撤单不会先于它撤的下单; 不同 key 的请求在线程池中并行执行
+    可执行的请求中撤单优先, 其次下单, 最后查询, 同一个 key 内仍保持提交顺序
+
+    默认 key 为订单 ID: 下单与按 ID 查询取 order_id, 撤单取 origin_order_id, 其他请求没有 key, 不排序
+    按雪盈订单 ID 撤单(OrderIdType.SNB)时与下单的 key 不同, 需要在 submit 时显式指定 key, 也可以按证券代码指定
+
+    dispatcher = OrderedDispatcher(client, max_workers=8)
+    place_future = dispatcher.submit(place_order_request)
+    cancel_future = dispatcher.submit(cancel_order_request)
+    """
+
+    def __init__(self, client, max_workers: int = None):
+        """
+        :param client: SnbHttpClient, 通过 client.execute 执行请求
+        :param max_workers: 工作线程数, 默认为 SnbConfig.pool_size
+        """
+        self._client = client
+        self._max_workers = max_workers or client.config.pool_size
+        self._condition = threading.Condition()
+        self._ready = []
+        self._pending = {}
+        self._sequence = itertools.count()
+        self._threads = []
+        self._shutdown = False
+
+    @staticmethod
+    def default_key(request):
+        if isinstance(request, (PlaceOrderRequest, TemplateOrderRequest)):
+            return request.order_id
+        if isinstance(request, CancelOrderRequest):
+            return request.origin_order_id
+        if isinstance(request, GetOrderByOrderIdRequest):
+            return request.order_id
+        return None
+
+    @staticmethod
+    def default_priority(request) -> int:
+        if isinstance(request, CancelOrderRequest):
+            return CANCEL_PRIORITY
+        if isinstance(request, (PlaceOrderRequest, TemplateOrderRequest)):
+            return ORDER_PRIORITY
+        return QUERY_PRIORITY
+
+    def submit(self, request, key=None, priority: int = None) -> Future:
+        """
+        :param request: 请求对象
+        :param key: 排序键, 默认为 default_key(request)
+        :param priority: 优先级, 默认为 default_priority(request)
+        :return: Future, 结果为 HttpResponse
+        """
+        key = key if key is not None else self.default_key(request)
+        priority = priority if priority is not None else self.default_priority(request)
+        future = Future()
+        task = (priority, next(self._sequence), key, request, future)
+        with self._condition:
+            if self._shutdown:
+                raise RuntimeError("cannot submit after shutdown")
+            if key is not None and key in self._pending:
+                # 同一个 key 已有请求在执行或等待, 排在它后面
+                self._pending[key].append(task)
+            else:
+                if key is not None:
+                    self._pending[key] = collections.deque()
+                heapq.heappush(self._ready, task)
+                self._condition.notify()
+            if len(self._threads) < self._max_workers:
+                thread = threading.Thread(target=self._run, name="snbpy-dispatcher-%d" % len(self._threads),
+                                          daemon=True)
+                self._threads.append(thread)
+                thread.start()
+        return future
+
+    def shutdown(self, wait: bool = True):
+        """
+        不再接受新请求, 已提交的请求会继续执行
+        :param wait: 是否等待全部请求执行完成
+        """
+        with self._condition:
+            self._shutdown = True
+            self._condition.notify_all()
+            threads = list(self._threads)
+        if wait:
+            for thread in threads:
+                thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
+
+    def _next_task(self):
+        with self._condition:
+            while not self._ready:
+                if self._shutdown and not self._pending:
+                    return None
+                self._condition.wait()
+            return heapq.heappop(self._ready)
+
+    def _run(self):
+        while True:
+            task = self._next_task()
+            if task is None:
+                return
+            _, _, key, request, future = task
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(self._client.execute(request))
+                except BaseException as e:
+                    logger.debug("dispatched request failed;; key: %s; %s", key, e)
+                    future.set_exception(e)
+            if key is not None:
+                with self._condition:
+                    tasks = self._pending[key]
+                    if tasks:
+                        heapq.heappush(self._ready, tasks.popleft())
+                        self._condition.notify()
+                    else:
+                        del self._pending[key]
+                        if self._shutdown and not self._pending:
+                            self._condition.notify_all()
@@ -0,0 +1,139 @@
+# coding=utf-8
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+from snbpy.common.constant.exceptions import ApiExecuteException, OVERLOADED
+from snbpy.common.domain.request import PlaceOrderRequest, TemplateOrderRequest, CancelOrderRequest, \
+    GetOrderByOrderIdRequest, GetOrderListRequest, GetTransactionListRequest
+
+logger = logging.getLogger("snbpy")
+
+# 优先级, 数值越小越优先
+CANCEL = 0
+PLACE = 1
+ORDER_STATUS = 2
+ACCOUNT = 3
+HISTORY = 4
+
+PRIORITY_NAMES = {CANCEL: "cancel", PLACE: "place", ORDER_STATUS: "order_status", ACCOUNT: "account",
+                  HISTORY: "history"}
+
+_DEFAULT_PRIORITIES = {CancelOrderRequest: CANCEL, PlaceOrderRequest: PLACE, TemplateOrderRequest: PLACE,
+                       GetOrderByOrderIdRequest: ORDER_STATUS, GetOrderListRequest: ORDER_STATUS,
+                       GetTransactionListRequest: HISTORY}
+
+
+class PriorityScheduler(object):
+    """
+    按优先级分配连接: 撤单 > 下单 > 订单状态 > 账户查询(资产、持仓、证券信息等) > 历史成交
+    每个优先级最多同时占用 limits[priority] 个连接, 低优先级的上限更小, 剩余的连接留给高优先级
+    连接不足时按优先级排队, 同一优先级先到先得; 排队超过 max_wait 或队列超过 max_queue 时拒绝(shed),
+    抛出 ApiExecuteException(OVERLOADED)
+    登录等无需鉴权的请求不受限制
+
+    client.priority_scheduler = PriorityScheduler(slots=client.config.pool_size, max_wait={HISTORY: 5})
+    """
+
+    def __init__(self, slots: int, limits: dict = None, max_wait: dict = None, max_queue: dict = None):
+        """
+        :param slots: 连接数, 一般为 SnbConfig.pool_size
+        :param limits: 优先级 -> 可同时占用的连接数, 默认撤单 slots, 下单 slots-1, 订单状态与账户查询 slots-2,
+                       历史成交 slots/2, 均至少为 1
+        :param max_wait: 优先级 -> 最长排队时间(秒), 默认一直等待
+        :param max_queue: 优先级 -> 最大排队数, 默认不限
+        """
+        default_limits = {CANCEL: slots, PLACE: slots - 1, ORDER_STATUS: slots - 2, ACCOUNT: slots - 2,
+                          HISTORY: slots // 2}
+        default_limits.update(limits or {})
+        self._limits = {priority: max(1, min(slots, limit)) for priority, limit in default_limits.items()}
+        self._max_wait = max_wait or {}
+        self._max_queue = max_queue or {}
+        self._priorities = dict(_DEFAULT_PRIORITIES)
+        self._condition = threading.Condition()
+        self._sequence = itertools.count()
+        self._waiters = []
+        self._queued = dict.fromkeys(self._limits, 0)
+        self._in_use = 0
+        self._shed = dict.fromkeys(self._limits, 0)
+
+    def set_priority(self, request_class, priority: int):
+        """
+        调整某类请求的优先级
+        :param request_class: 请求类, 如 GetPositionListRequest
+        :param priority: CANCEL/PLACE/ORDER_STATUS/ACCOUNT/HISTORY
+        """
+        self._priorities[request_class] = priority
+
+    def priority(self, request) -> int:
+        """
+        :return: 请求的优先级, 无需调度时返回 None
+        """
+        if request.auth() <= 0:
+            return None
+        return self._priorities.get(type(request), ACCOUNT)
+
+    def acquire(self, request, wait: bool = True):
+        """
+        获取一个连接, 需要与 release 成对调用
+        :param wait: 没有空闲连接时是否排队, 为 False 时直接抛出 ApiExecuteException(OVERLOADED), 不计入 shed
+        :return: 优先级, 无需调度时为 None
+        """
+        priority = self.priority(request)
+        if priority is None:
+            return None
+        limit = self._limits[priority]
+        with self._condition:
+            if not self._waiters and self._in_use < limit:
+                self._in_use += 1
+                return priority
+            if not wait:
+                raise ApiExecuteException(OVERLOADED, "no free connection for %s request"
+                                          % PRIORITY_NAMES.get(priority, priority))
+            max_queue = self._max_queue.get(priority)
+            if max_queue is not None and self._queued[priority] >= max_queue:
+                self._reject(priority, "queue full")
+            max_wait = self._max_wait.get(priority)
+            deadline = time.monotonic() + max_wait if max_wait is not None else None
+            waiter = (priority, next(self._sequence))
+            heapq.heappush(self._waiters, waiter)
+            self._queued[priority] += 1
+            try:
+                while not (self._waiters[0] == waiter and self._in_use < limit):
+                    remaining = deadline - time.monotonic() if deadline is not None else None
+                    if remaining is not None and remaining <= 0:
+                        self._reject(priority, "wait timeout")
+                    self._condition.wait(remaining)
+                heapq.heappop(self._waiters)
+                self._in_use += 1
+                return priority
+            except BaseException:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                    heapq.heapify(self._waiters)
+                raise
+            finally:
+                self._queued[priority] -= 1
+                self._condition.notify_all()
+
+    def release(self, priority):
+        if priority is None:
+            return
+        with self._condition:
+            self._in_use -= 1
+            self._condition.notify_all()
+
+    def _reject(self, priority: int, reason: str):
+        self._shed[priority] += 1
+        logger.warning("request shed;; priority: %s; reason: %s", PRIORITY_NAMES.get(priority, priority), reason)
+        raise ApiExecuteException(OVERLOADED, "overloaded, %s request shed: %s"
+                                  % (PRIORITY_NAMES.get(priority, priority), reason))
+
+    def stats(self) -> dict:
+        """
+        :return: {"in_use": 占用的连接数, "queued": 优先级 -> 排队数, "shed": 优先级 -> 拒绝数}
+        """
+        with self._condition:
+            return {"in_use": self._in_use, "queued": dict(self._queued), "shed": dict(self._shed)}
@@ -0,0 +1,218 @@
+# coding=utf-8
+import logging
+import threading
+import time
+
+from snbpy.common.constant.exceptions import ApiExecuteException, RATE_LIMITED
+from snbpy.common.domain.request import PlaceOrderRequest, TemplateOrderRequest, CancelOrderRequest
+
+logger = logging.getLogger("snbpy")
+
+# 请求类别
+ORDER = "order"
+CANCEL = "cancel"
+QUERY = "query"
+
+
+def _remaining(deadline):
+    return None if deadline is None else deadline - time.monotonic()
+
+
+class TokenBucket(object):
+    """
+    令牌桶, 每秒补充 rate 个令牌, 最多积累 burst 个
+    """
+
+    def __init__(self, rate: float, burst: float = None):
+        self._rate = rate
+        self._burst = burst if burst is not None else max(1.0, rate)
+        self._tokens = self._burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def rate(self) -> float:
+        return self._rate
+
+    def acquire(self, deadline: float = None) -> bool:
+        """
+        获取一个令牌, 不足时等待
+        :param deadline: time.monotonic() 截止时间, 为 None 时一直等待
+        :return: 截止前是否获取成功
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self._burst, self._tokens + (now - self._updated) * self._rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self._rate
+            remaining = _remaining(deadline)
+            if remaining is not None:
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+
+class AimdLimiter(object):
+    """
+    自适应并发上限(AIMD): 请求正常时每轮上限加 increase, 被限流或延迟明显升高时上限乘以 backoff
+    延迟升高指平滑延迟超过基线延迟的 latency_tolerance 倍, 基线取近期最低延迟并缓慢上移
+    两次降低之间至少间隔一个平滑延迟, 避免同一次拥塞被重复计算
+    """
+
+    def __init__(self, initial_limit: float = 10, min_limit: float = 1, max_limit: float = 100,
+                 increase: float = 1, backoff: float = 0.5, latency_tolerance: float = 2.0):
+        """
+        :param initial_limit: 初始并发上限
+        :param min_limit: 并发上限下限
+        :param max_limit: 并发上限上限
+        :param increase: 每轮(约等于上限个请求)增加的上限
+        :param backoff: 降低时的乘数
+        :param latency_tolerance: 延迟容忍倍数, 为 None 时只根据限流降低
+        """
+        self._limit = float(initial_limit)
+        self._min_limit = min_limit
+        self._max_limit = max_limit
+        self._increase = increase
+        self._backoff = backoff
+        self._latency_tolerance = latency_tolerance
+        self._in_flight = 0
+        self._baseline = None
+        self._smoothed = None
+        self._last_decrease = 0
+        self._throttled = 0
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        return max(int(self._limit), 1)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def throttled(self) -> int:
+        return self._throttled
+
+    def acquire(self, deadline: float = None) -> bool:
+        with self._condition:
+            while self._in_flight >= self.limit:
+                remaining = _remaining(deadline)
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+            self._in_flight += 1
+            return True
+
+    def release(self, latency: float, throttled: bool = False):
+        """
+        :param latency: 请求耗时, 秒, 为 None 表示请求未发出, 只归还名额, 不调整并发上限
+        :param throttled: 是否被服务端限流
+        """
+        with self._condition:
+            self._in_flight -= 1
+            now = time.monotonic()
+            if throttled:
+                self._throttled += 1
+                self._decrease(now, "throttled")
+            elif latency is not None:
+                self._smoothed = latency if self._smoothed is None else self._smoothed * 0.8 + latency * 0.2
+                self._baseline = latency if self._baseline is None \
+                    else min(latency, self._baseline + (latency - self._baseline) * 0.01)
+                if self._latency_tolerance is not None \
+                        and self._smoothed > self._baseline * self._latency_tolerance:
+                    self._decrease(now, "latency")
+                else:
+                    self._limit = min(self._max_limit, self._limit + self._increase / self._limit)
+            self._condition.notify_all()
+
+    def _decrease(self, now: float, reason: str):
+        if now - self._last_decrease < (self._smoothed or 0):
+            return
+        self._last_decrease = now
+        self._limit = max(self._min_limit, self._limit * self._backoff)
+        logger.debug("decrease concurrency limit;; reason: %s; limit: %s", reason, self._limit)
+
+
+class _Permit(object):
+    __slots__ = ("bucket_class", "limiter")
+
+    def __init__(self, bucket_class, limiter):
+        self.bucket_class = bucket_class
+        self.limiter = limiter
+
+
+class RateLimiter(object):
+    """
+    客户端限流, 按请求类别(下单 order, 撤单 cancel, 查询 query)分别控制:
+        令牌桶限制每秒请求数, rates 中未配置的类别不限速
+        AIMD 控制并发数, 根据延迟与服务端限流自动调整
+    登录等无需鉴权的请求不受限制
+
+    client.rate_limiter = RateLimiter(rates={"order": 20, "cancel": 20, "query": 10})
+    """
+
+    def __init__(self, rates: dict = None, max_wait: float = None, **aimd_kwargs):
+        """
+        :param rates: 类别 -> 每秒请求数, 如 {"query": 10}
+        :param max_wait: 最长排队时间, 秒, 超时抛出 ApiExecuteException(RATE_LIMITED), 为 None 时一直等待
+        :param aimd_kwargs: AimdLimiter 的参数, 各类别相同
+        """
+        rates = rates or {}
+        self._max_wait = max_wait
+        self._buckets = {name: TokenBucket(rates[name]) if rates.get(name) else None
+                         for name in (ORDER, CANCEL, QUERY)}
+        self._limiters = {name: AimdLimiter(**aimd_kwargs) for name in (ORDER, CANCEL, QUERY)}
+
+    @staticmethod
+    def classify(request) -> str:
+        """
+        :return: 请求类别, 无需限流时返回 None
+        """
+        if request.auth() <= 0:
+            return None
+        if isinstance(request, (PlaceOrderRequest, TemplateOrderRequest)):
+            return ORDER
+        if isinstance(request, CancelOrderRequest):
+            return CANCEL
+        return QUERY
+
+    def limiter(self, request_class: str) -> AimdLimiter:
+        return self._limiters[request_class]
+
+    def acquire(self, request, deadline: float = None):
+        """
+        按请求类别获取令牌与并发名额, 需要与 release 成对调用
+        :param deadline: time.monotonic() 截止时间, 为 None 时按 max_wait 计算, 传入当前时间则不等待
+        :return: permit, 无需限流时为 None
+        """
+        request_class = self.classify(request)
+        if request_class is None:
+            return None
+        if deadline is None and self._max_wait is not None:
+            deadline = time.monotonic() + self._max_wait
+        bucket, limiter = self._buckets[request_class], self._limiters[request_class]
+        if bucket is not None and not bucket.acquire(deadline):
+            raise ApiExecuteException(RATE_LIMITED, "rate limited: %s" % request_class)
+        if not limiter.acquire(deadline):
+            raise ApiExecuteException(RATE_LIMITED, "concurrency limited: %s" % request_class)
+        return _Permit(request_class, limiter)
+
+    def release(self, permit, latency: float, throttled: bool = False):
+        """
+        :param latency: 请求耗时, 秒, 为 None 表示请求未发出
+        """
+        if permit is not None:
+            permit.limiter.release(latency, throttled)
+
+    def stats(self) -> dict:
+        """
+        :return: 类别 -> {"limit": 并发上限, "in_flight": 进行中的请求, "throttled": 被限流次数}
+        """
+        return {name: {"limit": limiter.limit, "in_flight": limiter.in_flight, "throttled": limiter.throttled}
+                for name, limiter in self._limiters.items()}
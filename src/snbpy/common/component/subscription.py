@@ -0,0 +1,312 @@
+# coding=utf-8
+import asyncio
+import collections
+import logging
+import threading
+import time
+
+from snbpy.common.component.order_tracker import OrderTracker
+from snbpy.common.component.rate_limiter import TokenBucket
+from snbpy.common.util.item_utils import ItemUtils
+
+logger = logging.getLogger("snbpy")
+
+# 事件类型
+ORDER = "order"
+FILL = "fill"
+POSITION = "position"
+
+# 比较差异的持仓字段, 不含频繁变化的 market_price
+POSITION_FIELDS = ("position", "average_price")
+
+
+class SubscriptionEvent(object):
+    """
+    :param kind: 事件类型, ORDER/FILL/POSITION
+    :param data: 订单、成交或持仓
+    :param changes: 字段 -> (旧值, 新值), 成交事件为 None
+    """
+    __slots__ = ("kind", "data", "changes")
+
+    def __init__(self, kind: str, data: dict, changes: dict = None):
+        self.kind = kind
+        self.data = data
+        self.changes = changes
+
+    def __repr__(self):
+        return "SubscriptionEvent(kind=%r, data=%r, changes=%r)" % (self.kind, self.data, self.changes)
+
+
+class Subscription(object):
+    """
+    订阅, 事件交给回调函数, 或放入 asyncio.Queue(在 queue 所属的事件循环中执行 put_nowait)
+    """
+
+    def __init__(self, scheduler, kind: str, callback=None, queue: asyncio.Queue = None, loop=None):
+        self._scheduler = scheduler
+        self._kind = kind
+        self._callback = callback
+        self._queue = queue
+        self._loop = loop
+
+    @property
+    def kind(self) -> str:
+        return self._kind
+
+    def cancel(self):
+        self._scheduler.unsubscribe(self)
+
+    def deliver(self, event: SubscriptionEvent):
+        try:
+            if self._callback is not None:
+                self._callback(event)
+            if self._queue is not None:
+                self._loop.call_soon_threadsafe(self._queue.put_nowait, event)
+        except Exception as e:
+            logger.warning("deliver subscription event failed;; kind: %s; %s", self._kind, e)
+
+
+class _BudgetedClient(object):
+    """
+    轮询使用的 client 代理, 每发出一个 HTTP 请求从共享的令牌桶中消耗一个令牌
+    """
+
+    def __init__(self, client, bucket: TokenBucket):
+        self._client = client
+        self._bucket = bucket
+
+    @property
+    def config(self):
+        return self._client.config
+
+    def get_order_list(self, *args, **kwargs):
+        self._bucket.acquire()
+        return self._client.get_order_list(*args, **kwargs)
+
+    def get_transaction_list(self, *args, **kwargs):
+        self._bucket.acquire()
+        return self._client.get_transaction_list(*args, **kwargs)
+
+    def get_position_list(self, *args, **kwargs):
+        self._bucket.acquire()
+        return self._client.get_position_list(*args, **kwargs)
+
+    def execute_batch(self, request_list: list, max_workers: int = None) -> list:
+        for _ in request_list:
+            self._bucket.acquire()
+        return self._client.execute_batch(request_list, max_workers)
+
+
+class _Channel(object):
+    def __init__(self, kind: str, poll, min_interval: float):
+        self.kind = kind
+        self.poll = poll
+        self.subscriptions = []
+        self.interval = min_interval
+        self.due = 0
+
+
+class SubscriptionScheduler(object):
+    """
+    Open API 没有推送, 用一个共享的轮询线程模拟订单、成交、持仓的事件订阅
+
+    有未完成订单(包括撤单中、改单中的订单, 它们仍可能成交)或最近 hot_period 秒内有事件时按 min_interval 轮询, 空闲时每轮间隔乘以 backoff, 最长 max_interval
+    所有接口共用每秒 requests_per_second 个请求的预算, 每个 HTTP 请求消耗一次(一轮订单轮询可能发出多个请求),
+    按到期时间先后轮询, 不会相互饿死
+    事件已去重: 订单与持仓只在字段变化时通知, 成交只通知订阅后新出现的
+
+    scheduler = SubscriptionScheduler(client)
+    scheduler.subscribe_fills(lambda event: print(event.data))
+    ...
+    scheduler.stop()
+    """
+
+    def __init__(self, client, requests_per_second: float = 5, min_interval: float = 0.5, max_interval: float = 10,
+                 backoff: float = 2, hot_period: float = 10, page_size: int = 100, max_pages: int = 5,
+                 tracker: OrderTracker = None):
+        """
+        :param client: SnbHttpClient
+        :param requests_per_second: 所有接口共用的每秒 HTTP 请求数
+        :param min_interval: 活跃时的轮询间隔, 秒
+        :param max_interval: 空闲时的最长轮询间隔, 秒
+        :param backoff: 空闲时轮询间隔的增长倍数
+        :param hot_period: 最近一次事件之后保持活跃的时间, 秒
+        :param page_size: 每页大小
+        :param max_pages: 订单与成交每轮最多拉取的页数
+        :param tracker: 订单簿, 默认新建; 传入的订单簿直接使用它自己的 client, 其请求不计入预算
+        """
+        self._bucket = TokenBucket(requests_per_second)
+        self._client = _BudgetedClient(client, self._bucket)
+        self._min_interval = min_interval
+        self._max_interval = max_interval
+        self._backoff = backoff
+        self._hot_period = hot_period
+        self._page_size = page_size
+        self._max_pages = max_pages
+        self._tracker = tracker or OrderTracker(self._client, page_size=page_size, max_pages=max_pages)
+        self._channels = {ORDER: _Channel(ORDER, self._poll_orders, min_interval),
+                          FILL: _Channel(FILL, self._poll_fills, min_interval),
+                          POSITION: _Channel(POSITION, self._poll_positions, min_interval)}
+        self._condition = threading.Condition()
+        self._last_activity = 0
+        self._fill_keys = None
+        self._fill_key_order = collections.deque()
+        self._positions = None
+        self._thread = None
+        self._stopped = False
+
+    @property
+    def tracker(self) -> OrderTracker:
+        return self._tracker
+
+    def subscribe_orders(self, callback=None, queue: asyncio.Queue = None, loop=None) -> Subscription:
+        """
+        订阅订单变化, 首次轮询时通知全部未完成订单
+        :param callback: callback(event)
+        :param queue: asyncio.Queue, 与 callback 至少指定一个
+        :param loop: queue 所属的事件循环, 默认为当前事件循环
+        """
+        return self._subscribe(ORDER, callback, queue, loop)
+
+    def subscribe_fills(self, callback=None, queue: asyncio.Queue = None, loop=None) -> Subscription:
+        """
+        订阅新成交, 参数同 subscribe_orders
+        """
+        return self._subscribe(FILL, callback, queue, loop)
+
+    def subscribe_positions(self, callback=None, queue: asyncio.Queue = None, loop=None) -> Subscription:
+        """
+        订阅持仓变化, 首次轮询时通知全部持仓, 持仓清空时 position 变为 0, 参数同 subscribe_orders
+        """
+        return self._subscribe(POSITION, callback, queue, loop)
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._condition:
+            subscriptions = self._channels[subscription.kind].subscriptions
+            if subscription in subscriptions:
+                subscriptions.remove(subscription)
+
+    def poke(self):
+        """
+        通知有新的活动(如刚下单), 所有接口立即恢复为最短间隔轮询
+        """
+        with self._condition:
+            self._last_activity = time.monotonic()
+            for channel in self._channels.values():
+                channel.interval = self._min_interval
+                channel.due = 0
+            self._condition.notify_all()
+
+    def stop(self):
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+
+    def _subscribe(self, kind: str, callback, queue, loop) -> Subscription:
+        if callback is None and queue is None:
+            raise ValueError("callback or queue is required")
+        if queue is not None and loop is None:
+            loop = asyncio.get_event_loop()
+        subscription = Subscription(self, kind, callback, queue, loop)
+        with self._condition:
+            self._channels[kind].subscriptions.append(subscription)
+            self._condition.notify_all()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="snbpy-subscription", daemon=True)
+                self._thread.start()
+        return subscription
+
+    def _next_channel(self):
+        """
+        等待下一个到期的接口, 停止时返回 None
+        """
+        with self._condition:
+            while not self._stopped:
+                active = [channel for channel in self._channels.values() if channel.subscriptions]
+                if not active:
+                    self._condition.wait()
+                    continue
+                channel = min(active, key=lambda c: c.due)
+                delay = channel.due - time.monotonic()
+                if delay <= 0:
+                    return channel
+                self._condition.wait(delay)
+            return None
+
+    def _run(self):
+        while True:
+            channel = self._next_channel()
+            if channel is None:
+                return
+            try:
+                events = channel.poll()
+            except Exception as e:
+                logger.warning("poll failed;; kind: %s; %s", channel.kind, e)
+                events = []
+            now = time.monotonic()
+            with self._condition:
+                if events:
+                    self._last_activity = now
+                hot = events or now - self._last_activity < self._hot_period or self._tracker.open_orders()
+                channel.interval = self._min_interval if hot \
+                    else min(self._max_interval, channel.interval * self._backoff)
+                channel.due = now + channel.interval
+                subscriptions = list(channel.subscriptions)
+            for event in events:
+                for subscription in subscriptions:
+                    subscription.deliver(event)
+
+    def _poll_orders(self) -> list:
+        return [SubscriptionEvent(ORDER, order, changes) for order, changes in self._tracker.refresh()]
+
+    def _poll_fills(self) -> list:
+        events = []
+        for page in range(1, self._max_pages + 1):
+            response = self._client.get_transaction_list(page, self._page_size)
+            if not response.succeed():
+                logger.warning("poll fills failed;; page: %s; msg: %s", page, response.message)
+                break
+            items = response.data.get("items") or []
+            if self._fill_keys is None:
+                # 首次成功读取时只记录订阅前的成交, 不通知; 读取失败时下一轮重新记录
+                self._fill_keys = set()
+                for item in items:
+                    self._remember_fill(ItemUtils.transaction_key(item))
+                break
+            new_items = [item for item in items if ItemUtils.transaction_key(item) not in self._fill_keys]
+            for item in new_items:
+                self._remember_fill(ItemUtils.transaction_key(item))
+            events.extend(SubscriptionEvent(FILL, item) for item in new_items)
+            # 整页都是新成交时, 下一页可能还有
+            if len(new_items) < len(items) or len(items) < self._page_size:
+                break
+        # 成交列表按时间倒序, 按时间顺序通知
+        events.reverse()
+        return events
+
+    def _remember_fill(self, key):
+        self._fill_keys.add(key)
+        self._fill_key_order.append(key)
+        if len(self._fill_key_order) > self._page_size * self._max_pages * 10:
+            self._fill_keys.discard(self._fill_key_order.popleft())
+
+    def _poll_positions(self) -> list:
+        response = self._client.get_position_list()
+        if not response.succeed():
+            logger.warning("poll positions failed;; msg: %s", response.message)
+            return []
+        positions = {(item.get("symbol"), item.get("security_type")): item for item in response.data or []}
+        previous = self._positions or {}
+        self._positions = positions
+        events = []
+        for key, item in positions.items():
+            old = previous.get(key) or {}
+            changes = {field: (old.get(field), item.get(field)) for field in POSITION_FIELDS
+                       if old.get(field) != item.get(field)}
+            if changes:
+                events.append(SubscriptionEvent(POSITION, item, changes))
+        for key, old in previous.items():
+            if key not in positions and old.get("position"):
+                events.append(SubscriptionEvent(POSITION, dict(old, position=0),
+                                                {"position": (old.get("position"), 0)}))
+        return events
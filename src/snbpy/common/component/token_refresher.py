@@ -0,0 +1,64 @@
+# coding=utf-8
+import logging
+import threading
+import time
+import weakref
+
+logger = logging.getLogger("snbpy")
+
+
+class TokenRefresher(object):
+    """
+    后台刷新 token 的守护线程, 在 token 过期前 refresh_ahead 秒重新登录
+    只持有 client 的弱引用, client 被回收后线程自动退出
+    """
+
+    def __init__(self, client, refresh_ahead: float = 5 * 60, retry_interval: float = 10):
+        """
+        :param client: 提供 token, token_expire_time 与 refresh_token 的 client
+        :param refresh_ahead: 提前刷新的时间, 秒
+        :param retry_interval: 刷新失败后的重试间隔, 秒
+        """
+        self._client_ref = weakref.ref(client)
+        self._refresh_ahead = refresh_ahead
+        self._retry_interval = retry_interval
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name="snbpy-token-refresher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive() and not self._stop_event.is_set()
+
+    def _next_delay(self) -> float:
+        client = self._client_ref()
+        if client is None:
+            return -1
+        token, token_expire_time = client.token, client.token_expire_time
+        delay = (token_expire_time or 0) / 1000 - self._refresh_ahead - time.time()
+        if not token or delay <= 0:
+            try:
+                client.refresh_token(token)
+            except Exception as e:
+                logger.warning("refresh token failed, retry in %s seconds;; %s", self._retry_interval, e)
+                return self._retry_interval
+            delay = (client.token_expire_time or 0) / 1000 - self._refresh_ahead - time.time()
+        return max(delay, self._retry_interval)
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            delay = self._next_delay()
+            if delay < 0:
+                return
+            self._stop_event.wait(delay)
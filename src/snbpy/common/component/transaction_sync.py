@@ -0,0 +1,136 @@
+# coding=utf-8
+import json
+import logging
+import sqlite3
+import threading
+
+from snbpy.common.util.item_utils import ItemUtils
+
+logger = logging.getLogger("snbpy")
+
+
+class TransactionStore(object):
+    """
+    基于 SQLite 的本地成交存储, 以 ItemUtils.transaction_key 为主键, 并记录每个账户的同步水位
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("CREATE TABLE IF NOT EXISTS snb_transaction ("
+                               "account_id TEXT NOT NULL, "
+                               "item_key TEXT NOT NULL, "
+                               "id TEXT, "
+                               "trade_time INTEGER, "
+                               "payload TEXT NOT NULL, "
+                               "PRIMARY KEY (account_id, item_key))")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_snb_transaction_trade_time "
+                               "ON snb_transaction (account_id, trade_time)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS snb_sync_state ("
+                               "account_id TEXT PRIMARY KEY, "
+                               "watermark INTEGER NOT NULL)")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def upsert(self, account_id: str, transactions: list) -> int:
+        """
+        写入成交, 已存在的成交会被覆盖
+        :return: 新增的成交数
+        """
+        rows = [(account_id, json.dumps(ItemUtils.transaction_key(item)), item.get('id'), item.get('trade_time'),
+                 json.dumps(item, separators=(',', ':'))) for item in transactions]
+        with self._lock, self._conn:
+            before = self._count(account_id)
+            self._conn.executemany("INSERT OR REPLACE INTO snb_transaction "
+                                   "(account_id, item_key, id, trade_time, payload) VALUES (?, ?, ?, ?, ?)", rows)
+            return self._count(account_id) - before
+
+    def _count(self, account_id: str) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM snb_transaction WHERE account_id = ?",
+                                  (account_id,)).fetchone()[0]
+
+    def count(self, account_id: str) -> int:
+        with self._lock:
+            return self._count(account_id)
+
+    def query(self, account_id: str, trade_time_min: int = None, trade_time_max: int = None) -> list:
+        """
+        按成交时间查询本地成交, 按成交时间升序
+        """
+        sql = "SELECT payload FROM snb_transaction WHERE account_id = ?"
+        args = [account_id]
+        if trade_time_min is not None:
+            sql += " AND trade_time >= ?"
+            args.append(trade_time_min)
+        if trade_time_max is not None:
+            sql += " AND trade_time <= ?"
+            args.append(trade_time_max)
+        sql += " ORDER BY trade_time"
+        with self._lock:
+            return [json.loads(row[0]) for row in self._conn.execute(sql, args)]
+
+    def get_watermark(self, account_id: str):
+        """
+        :return: 已同步成交的最大成交时间, 从未同步过返回 None
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT watermark FROM snb_sync_state WHERE account_id = ?",
+                                     (account_id,)).fetchone()
+        return row[0] if row else None
+
+    def set_watermark(self, account_id: str, watermark: int):
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO snb_sync_state (account_id, watermark) VALUES (?, ?)",
+                               (account_id, watermark))
+
+
+class TransactionSync(object):
+    """
+    成交增量同步, 每次只拉取上次水位之后的成交并写入 TransactionStore
+
+    接口只支持按下单时间过滤, 因此每次从 水位 - overlap 开始拉取, overlap 需覆盖订单从下单到成交的时长,
+    默认 1 天, 可覆盖当日有效订单的迟到成交; 重叠部分的成交按主键去重
+
+    sync = TransactionSync(client, TransactionStore("/path/to/transactions.db"))
+    sync.sync()
+    """
+
+    def __init__(self, client, store: TransactionStore, overlap: int = 24 * 60 * 60 * 1000, page_size: int = 100,
+                 max_workers: int = None):
+        """
+        :param client: SnbHttpClient
+        :param store: 本地成交存储
+        :param overlap: 重叠窗口, 毫秒
+        :param page_size: 每页大小
+        :param max_workers: 最大并发数, 默认为 SnbConfig.pool_size
+        """
+        self._client = client
+        self._store = store
+        self._overlap = overlap
+        self._page_size = page_size
+        self._max_workers = max_workers
+
+    @property
+    def store(self) -> TransactionStore:
+        return self._store
+
+    def sync(self) -> int:
+        """
+        执行一次增量同步
+        :return: 新增的成交数
+        """
+        account_id = self._client.config.account
+        watermark = self._store.get_watermark(account_id)
+        order_time_min = None if watermark is None else max(watermark - self._overlap, 0)
+        transactions = self._client.get_all_transactions(self._page_size, order_time_min=order_time_min,
+                                                         max_workers=self._max_workers)
+        inserted = self._store.upsert(account_id, transactions)
+        trade_times = [item.get('trade_time') for item in transactions if item.get('trade_time') is not None]
+        if trade_times:
+            self._store.set_watermark(account_id, max(trade_times + ([watermark] if watermark is not None else [])))
+        logger.debug("sync transactions;; account: %s; order_time_min: %s; fetched: %s; inserted: %s", account_id,
+                     order_time_min, len(transactions), inserted)
+        return inserted
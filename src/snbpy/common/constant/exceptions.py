@@ -7,6 +7,9 @@ LOGIN_NEEDED = '002003'
 KEY_INVALID = '002004'
 INVALID_PARAM = '002005'
 INVALID_ORDER_ID = '002006'
+THROTTLED = '002007'
+RATE_LIMITED = '002008'
+OVERLOADED = '002009'
 
 
 class SnbException(Exception):
@@ -101,6 +101,16 @@ class OrderStatus(Enum):
     REPLACED = 'REPLACED'
 
 
+# 可撤销的订单状态
+OPEN_ORDER_STATUSES = (OrderStatus.NO_REPORT, OrderStatus.WAIT_REPORT, OrderStatus.REPORTED,
+                       OrderStatus.PART_CONCLUDED)
+
+# 未到最终状态的订单状态: 除可撤销状态外, 撤单中、改单中与已改单的订单之后仍可能成交或改变状态
+UNFINISHED_ORDER_STATUSES = OPEN_ORDER_STATUSES + (OrderStatus.WITHDRAWING, OrderStatus.WAIT_WITHDRAW,
+                                                   OrderStatus.PART_WAIT_WITHDRAW, OrderStatus.REPLACING,
+                                                   OrderStatus.WAIT_REPLACE, OrderStatus.REPLACED)
+
+
 @unique
 class HttpMethod(Enum):
     GET = 'GET'
@@ -0,0 +1,155 @@
+# coding=utf-8
+from enum import Enum
+
+from snbpy.common.constant.snb_constant import OrderStatus, OrderSide, SecurityType, Currency, OrderType, TimeInForce
+
+
+def _enum(enum_class):
+    """
+    转换为枚举, 未知的取值保留原始字符串, 避免服务端新增取值导致解析失败
+    """
+
+    def convert(value):
+        if value is None:
+            return None
+        try:
+            return enum_class(value)
+        except ValueError:
+            return value
+
+    return convert
+
+
+class Model(object):
+    """
+    响应模型基类, 使用 __slots__ 存储字段, 内存占用远小于 dict
+    子类通过 _FIELDS 声明 (字段名, 转换函数), 转换函数为 None 时保留原值
+    """
+    __slots__ = ()
+    _FIELDS = ()
+
+    @classmethod
+    def from_dict(cls, item: dict):
+        model = cls.__new__(cls)
+        for name, convert in cls._FIELDS:
+            value = item.get(name)
+            setattr(model, name, value if convert is None or value is None else convert(value))
+        return model
+
+    def to_dict(self) -> dict:
+        result = {}
+        for name, _ in self._FIELDS:
+            value = getattr(self, name)
+            result[name] = value.value if isinstance(value, Enum) else value
+        return result
+
+    def __eq__(self, other):
+        return type(self) is type(other) and all(
+            getattr(self, name) == getattr(other, name) for name, _ in self._FIELDS)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "%s(%s)" % (self.__class__.__name__,
+                           ", ".join("%s=%r" % (name, getattr(self, name)) for name, _ in self._FIELDS))
+
+
+class Order(Model):
+    _FIELDS = (("id", None), ("snb_order_id", None), ("account_id", None), ("symbol", None),
+               ("exchange", None), ("security_type", _enum(SecurityType)), ("currency", _enum(Currency)),
+               ("side", _enum(OrderSide)), ("order_type", _enum(OrderType)), ("tif", _enum(TimeInForce)),
+               ("status", _enum(OrderStatus)), ("price", None), ("stop_price", None), ("quantity", None),
+               ("filled_quantity", None), ("average_price", None), ("order_time", None), ("rth", None),
+               ("memo", None), ("parent", None), ("group_id", None), ("secondary_order_id", None),
+               ("children", None))
+    __slots__ = tuple(name for name, _ in _FIELDS)
+
+
+class Position(Model):
+    _FIELDS = (("account_id", None), ("symbol", None), ("exchange", None), ("security_type", _enum(SecurityType)),
+               ("position", None), ("average_price", None), ("market_price", None), ("realized_pnl", None))
+    __slots__ = tuple(name for name, _ in _FIELDS)
+
+
+class Transaction(Model):
+    _FIELDS = (("id", None), ("account_id", None), ("symbol", None), ("exchange", None),
+               ("security_type", _enum(SecurityType)), ("currency", _enum(Currency)), ("side", _enum(OrderSide)),
+               ("order_type", _enum(OrderType)), ("tif", _enum(TimeInForce)), ("status", _enum(OrderStatus)),
+               ("price", None), ("quantity", None), ("order_price", None), ("order_quantity", None),
+               ("order_time", None), ("trade_time", None), ("rth", None))
+    __slots__ = tuple(name for name, _ in _FIELDS)
+
+
+class BalanceDetail(Model):
+    _FIELDS = (("currency", _enum(Currency)), ("cash", None))
+    __slots__ = tuple(name for name, _ in _FIELDS)
+
+
+class Balance(Model):
+    _FIELDS = (("currency", _enum(Currency)), ("cash", None), ("net_liquidation_value", None),
+               ("equity_with_loan_value", None), ("previous_day_equity_with_loan_value", None),
+               ("securities_gross_position_value", None), ("current_available_funds", None),
+               ("current_excess_liquidity", None), ("current_initial_margin", None),
+               ("current_maintenance_margin", None), ("leverage", None), ("sma", None),
+               ("balance_detail_items", lambda items: [BalanceDetail.from_dict(item) for item in items]))
+    __slots__ = tuple(name for name, _ in _FIELDS)
+
+    def to_dict(self) -> dict:
+        result = super().to_dict()
+        if self.balance_detail_items is not None:
+            result["balance_detail_items"] = [item.to_dict() for item in self.balance_detail_items]
+        return result
+
+
+class SecurityDetail(Model):
+    """
+    证券信息, 常用字段为属性, 其余字段保存在 extra 中, 通过 get 访问
+    """
+    _FIELDS = (("symbol", None), ("exchange", None), ("security_type", _enum(SecurityType)),
+               ("currency", _enum(Currency)), ("lot_size", None))
+    __slots__ = tuple(name for name, _ in _FIELDS) + ("extra",)
+
+    @classmethod
+    def from_dict(cls, item: dict):
+        model = super().from_dict(item)
+        names = set(name for name, _ in cls._FIELDS)
+        model.extra = {key: value for key, value in item.items() if key not in names}
+        return model
+
+    def get(self, name: str, default=None):
+        if name in self.__slots__ and name != "extra":
+            return getattr(self, name)
+        return self.extra.get(name, default)
+
+    def to_dict(self) -> dict:
+        result = dict(self.extra)
+        result.update(super().to_dict())
+        return result
+
+
+class ModelList(object):
+    """
+    惰性的模型列表, 只在访问时把对应的 dict 转换为模型, 不缓存转换结果
+    需要长期持有时使用 list(model_list) 一次性转换, 之后即可释放原始响应
+    """
+    __slots__ = ("_items", "_model_class")
+
+    def __init__(self, items: list, model_class):
+        self._items = items or []
+        self._model_class = model_class
+
+    def __len__(self):
+        return len(self._items)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._model_class.from_dict(item) for item in self._items[index]]
+        return self._model_class.from_dict(self._items[index])
+
+    def __iter__(self):
+        from_dict = self._model_class.from_dict
+        for item in self._items:
+            yield from_dict(item)
@@ -1,5 +1,6 @@
 import abc
 import logging
+from urllib.parse import urlencode, quote_plus
 
 from snbpy.common.constant.exceptions import InvalidParamException, INVALID_ORDER_ID
 from snbpy.common.constant.snb_constant import HttpMethod, OrderSide, SecurityType, OrderType, Currency, TimeInForce, OrderIdType, TradingHours
@@ -91,7 +92,7 @@ class GetOrderListRequest(HttpRequest):
 
     @property
     def size(self):
-        return
+        return self._size
 
     @size.setter
     def size(self, size):
@@ -99,11 +100,11 @@ class GetOrderListRequest(HttpRequest):
 
     @property
     def status(self):
-        return
+        return self._status
 
     @property
     def security_type(self):
-        return
+        return self._security_type
 
     @security_type.setter
     def security_type(self, security_type):
@@ -167,6 +168,14 @@ class PlaceOrderRequest(HttpRequest):
         self._order_id_type = order_id_type
         self._trading_hours = trading_hours
 
+    @property
+    def order_id(self) -> str:
+        return self._order_id
+
+    @order_id.setter
+    def order_id(self, value: str):
+        self._order_id = value
+
     def auth(self) -> int:
         return 1
 
@@ -203,6 +212,102 @@ class PlaceOrderRequest(HttpRequest):
                 }
 
 
+class OrderTemplate(object):
+    """
+    下单模板, 用于对同一证券反复下单的低延迟场景
+    账户、证券、交易所、币种、订单类型、有效期等静态字段只编码一次, 每次下单只编码 order_id, side, quantity, price 等字段
+
+    template = OrderTemplate(account_id, SecurityType.STK, "00700", "HKEX", Currency.HKD)
+    client.execute(template.request(order_id, OrderSide.BUY, 100, 350.2))
+    """
+
+    _SIDES = {side: ("&side=%s" % side.value).encode("ascii") for side in OrderSide}
+
+    def __init__(self, account_id: str, security_type: SecurityType, symbol: str, exchange: str, currency: Currency,
+                 order_type: OrderType = OrderType.LIMIT, tif: TimeInForce = TimeInForce.DAY,
+                 force_only_rth: bool = True, order_id_type: OrderIdType = OrderIdType.CLIENT,
+                 trading_hours: TradingHours = None):
+        self._account_id = account_id
+        self._symbol = symbol
+        # 与 requests 的表单编码一致: 丢弃 None, 其余值转为字符串后编码
+        static_params = [("security_type", security_type.value), ("account_id", account_id), ("symbol", symbol),
+                         ("exchange", exchange), ("order_type", order_type.value), ("currency", currency.value),
+                         ("tif", tif.value), ("rth", force_only_rth), ("order_id_type", order_id_type.value),
+                         ("trading_hours", trading_hours.value if trading_hours else "")]
+        self._static_body = urlencode([(k, v) for k, v in static_params if v is not None]).encode("utf-8")
+
+    @property
+    def account_id(self) -> str:
+        return self._account_id
+
+    @property
+    def symbol(self) -> str:
+        return self._symbol
+
+    def encode(self, side: OrderSide, quantity: int, price: float = 0, stop_price: float = 0,
+               parent: str = None) -> bytes:
+        """
+        与 PlaceOrderRequest 一致, 值为 None 的字段不编码
+        :return: 表单编码后的请求体
+        """
+        body = self._static_body + self._SIDES[side]
+        for name, value in (("quantity", quantity), ("price", price), ("stop_price", stop_price), ("parent", parent)):
+            if value is not None:
+                body += ("&%s=%s" % (name, quote_plus(str(value)))).encode("ascii")
+        return body
+
+    def request(self, order_id: str, side: OrderSide, quantity: int, price: float = 0, stop_price: float = 0,
+                parent: str = None):
+        """
+        :return: TemplateOrderRequest
+        """
+        return TemplateOrderRequest(self, order_id, side, quantity, price, stop_price, parent)
+
+
+class TemplateOrderRequest(HttpRequest):
+    """
+    由 OrderTemplate 生成的下单请求, generate_params 返回已编码的请求体 bytes
+    """
+
+    def __init__(self, template: OrderTemplate, order_id: str, side: OrderSide, quantity: int, price: float = 0,
+                 stop_price: float = 0, parent: str = None):
+        self._template = template
+        self._order_id = order_id
+        self._side = side
+        self._quantity = quantity
+        self._price = price
+        self._stop_price = stop_price
+        self._parent = parent
+
+    @property
+    def order_id(self) -> str:
+        return self._order_id
+
+    @property
+    def template(self) -> OrderTemplate:
+        return self._template
+
+    def auth(self) -> int:
+        return 1
+
+    def verify(self) -> bool:
+        if StringUtils.is_blank(self._order_id):
+            logger.error("order id cannot by blank;; order_id: %s", self._order_id)
+            raise InvalidParamException(INVALID_ORDER_ID, "INVALID ORDER ID")
+        return True
+
+    @property
+    def method(self) -> HttpMethod:
+        return HttpMethod.POST
+
+    @property
+    def url(self) -> str:
+        return "order/%s" % self._order_id
+
+    def generate_params(self) -> bytes:
+        return self._template.encode(self._side, self._quantity, self._price, self._stop_price, self._parent)
+
+
 class CancelOrderRequest(HttpRequest):
     def __init__(self, account_id: str, order_id: str, origin_order_id: str, order_id_type: OrderIdType = OrderIdType.CLIENT):
         self._origin_order_id = origin_order_id
@@ -1,3 +1,6 @@
+from snbpy.common.domain.model import ModelList, Order, Position, Transaction, Balance, SecurityDetail
+
+
 class HttpResponse(object):
     def __init__(self):
         self._result_code = None
@@ -39,3 +42,65 @@ class HttpResponse(object):
     @data.setter
     def data(self, value: dict):
         self._data = value
+
+    def as_orders(self) -> ModelList:
+        """
+        get_order_list 的订单列表, 惰性转换为 Order
+        """
+        return ModelList((self._data or {}).get('items'), Order)
+
+    def as_order(self) -> Order:
+        """
+        get_order_by_id 的订单
+        """
+        return Order.from_dict(self._data) if self._data else None
+
+    def as_positions(self) -> ModelList:
+        """
+        get_position_list 的持仓列表, 惰性转换为 Position
+        """
+        return ModelList(self._data, Position)
+
+    def as_transactions(self) -> ModelList:
+        """
+        get_transaction_list 的成交列表, 惰性转换为 Transaction
+        """
+        return ModelList((self._data or {}).get('items'), Transaction)
+
+    def as_balance(self) -> Balance:
+        """
+        get_balance 的资产
+        """
+        return Balance.from_dict(self._data) if self._data else None
+
+    def as_security_detail(self) -> SecurityDetail:
+        """
+        get_security_detail 的证券信息
+        """
+        return SecurityDetail.from_dict(self._data) if self._data else None
+
+
+class BatchResult(object):
+    """
+    批量请求中单个请求的结果, response 与 exception 二者只有一个非空
+    """
+
+    def __init__(self, request, response: HttpResponse = None, exception: Exception = None):
+        self._request = request
+        self._response = response
+        self._exception = exception
+
+    def succeed(self):
+        return self._exception is None and self._response is not None and self._response.succeed()
+
+    @property
+    def request(self):
+        return self._request
+
+    @property
+    def response(self) -> HttpResponse:
+        return self._response
+
+    @property
+    def exception(self) -> Exception:
+        return self._exception
@@ -16,9 +16,11 @@ class SnbConfig(object):
     snb_server	API 服务器地址
     snb_port	API 服务器端口
     timeout	    Http 超时时间
-    cache_path	缓存路径	        暂不支持
+    cache_path	缓存目录, 用于持久化 token 与证券信息, 为空时不持久化
     schema	    API Http Schema
-    auto_login	是否自动登陆	    暂不支持
+    auto_login	是否自动登陆, 开启后按需登录、过期前后台刷新 token, token 失效时重新登录并重试一次
+    pool_size	连接池大小
+    keep_result_str	是否在 HttpResponse.result_str 中保留原始响应, 关闭可减少大分页的内存占用
     """
 
     def __init__(self):
@@ -31,6 +33,8 @@ class SnbConfig(object):
         self._cache_path = None
         self._schema = None
         self._auto_login = False
+        self._pool_size = 10
+        self._keep_result_str = True
 
     def verify(self):
         if StringUtils.is_any_blank(self.account, self.key, self.sign_type, self.snb_server, self.snb_port,
@@ -40,6 +44,9 @@ class SnbConfig(object):
         if self.timeout <= 0:
             logger.error("configuration is invalid;; timeout not set or invalid")
             raise ConfigException(CONFIGURATION_IS_INVALID, "configuration is invalid")
+        if self.pool_size <= 0:
+            logger.error("configuration is invalid;; pool_size invalid")
+            raise ConfigException(CONFIGURATION_IS_INVALID, "configuration is invalid")
 
     def __str__(self) -> str:
         return "schema: %s. server: %s, port: %s, timeout: %s" % (
@@ -116,3 +123,19 @@ class SnbConfig(object):
     @cache_path.setter
     def cache_path(self, cache_path: str):
         self._cache_path = cache_path
+
+    @property
+    def pool_size(self) -> int:
+        return self._pool_size
+
+    @pool_size.setter
+    def pool_size(self, pool_size: int):
+        self._pool_size = pool_size
+
+    @property
+    def keep_result_str(self) -> bool:
+        return self._keep_result_str
+
+    @keep_result_str.setter
+    def keep_result_str(self, keep_result_str: bool):
+        self._keep_result_str = keep_result_str
@@ -15,7 +15,10 @@ def _read_config(parser: configparser.ConfigParser) -> SnbConfig:
         config.snb_server = parser.get('SERVER', 'snb_server')
         config.snb_port = parser.get('SERVER', 'snb_port')
         config.schema = parser.get('SERVER', 'schema', fallback='https')
-        config.auto_login = bool(parser.get('SESSION', 'auto_login', fallback=False))
+        config.auto_login = parser.getboolean('SESSION', 'auto_login', fallback=False)
+        config.pool_size = int(parser.get('SESSION', 'pool_size', fallback='10'))
+        config.cache_path = parser.get('SESSION', 'cache_path', fallback=None)
+        config.keep_result_str = parser.getboolean('SESSION', 'keep_result_str', fallback=True)
         return config
     except Exception:
         raise ConfigException(CONFIGURATION_IS_INVALID, "config is invalid")
@@ -38,6 +41,7 @@ def read_config(config_file_path: str) -> SnbConfig:
     [SESSION]
     sign_type=Default
     timeout=1000
+    pool_size=10
 
     [SERVER]
     snb_server=localhost
@@ -0,0 +1,110 @@
+# coding=utf-8
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+try:
+    import pandas
+except ImportError:  # pragma: no cover
+    pandas = None
+
+try:
+    import pyarrow
+except ImportError:  # pragma: no cover
+    pyarrow = None
+
+STR = "str"
+FLOAT = "float"
+BOOL = "bool"
+# 毫秒时间戳
+TIME = "time"
+
+ORDER_SCHEMA = (("id", STR), ("snb_order_id", STR), ("account_id", STR), ("symbol", STR), ("exchange", STR),
+                ("security_type", STR), ("currency", STR), ("side", STR), ("order_type", STR), ("tif", STR),
+                ("status", STR), ("price", FLOAT), ("stop_price", FLOAT), ("quantity", FLOAT),
+                ("filled_quantity", FLOAT), ("average_price", FLOAT), ("order_time", TIME), ("rth", BOOL))
+
+POSITION_SCHEMA = (("account_id", STR), ("symbol", STR), ("exchange", STR), ("security_type", STR),
+                   ("position", FLOAT), ("average_price", FLOAT), ("market_price", FLOAT), ("realized_pnl", FLOAT))
+
+TRANSACTION_SCHEMA = (("id", STR), ("account_id", STR), ("symbol", STR), ("exchange", STR), ("security_type", STR),
+                      ("currency", STR), ("side", STR), ("order_type", STR), ("tif", STR), ("status", STR),
+                      ("price", FLOAT), ("quantity", FLOAT), ("order_price", FLOAT), ("order_quantity", FLOAT),
+                      ("order_time", TIME), ("trade_time", TIME), ("rth", BOOL))
+
+_NAN = float("nan")
+# numpy 中 NaT 的整数表示
+_NAT = -2 ** 63
+
+
+class ExportUtils(object):
+    """
+    把订单/持仓/成交列表导出为列式数据, 便于向量化计算
+    价格与数量为 float64, 时间为毫秒精度的 datetime64, 缺失值为 NaN/NaT; 布尔列的缺失值保留为 None/null, 不会变为 False
+    NumPy/pandas/Arrow 为可选依赖, 使用对应方法前需要安装
+    """
+
+    @staticmethod
+    def to_columns(items: list, schema: tuple) -> dict:
+        """
+        按列转换, 不依赖第三方库
+         * ExportUtils.to_columns([{"symbol": "EL", "position": 1}], (("symbol", "str"), ("position", "float")))
+           = {"symbol": ["EL"], "position": [1.0]}
+        :param items: 列表数据, 如 get_transaction_list 的 items
+        :param schema: 列定义, 如 TRANSACTION_SCHEMA
+        :return: 列名 -> 值列表, 时间列保留毫秒时间戳, 时间与布尔列缺失为 None
+        """
+        items = items or []
+        columns = {}
+        for name, kind in schema:
+            values = [item.get(name) for item in items]
+            if kind == FLOAT:
+                values = [_NAN if value is None else float(value) for value in values]
+            elif kind == BOOL:
+                values = [None if value is None else bool(value) for value in values]
+            columns[name] = values
+        return columns
+
+    @staticmethod
+    def to_numpy(items: list, schema: tuple):
+        """
+        :return: numpy 结构化数组, 字符串列与布尔列为 object, 布尔列缺失为 None
+        """
+        if numpy is None:
+            raise ImportError("numpy is required by to_numpy, install it with: pip install numpy")
+        columns = ExportUtils.to_columns(items, schema)
+        dtypes = {STR: object, FLOAT: "f8", BOOL: object, TIME: "datetime64[ms]"}
+        array = numpy.empty(len(items or []), dtype=[(name, dtypes[kind]) for name, kind in schema])
+        for name, kind in schema:
+            if kind == TIME:
+                array[name] = numpy.array([_NAT if value is None else value for value in columns[name]],
+                                          dtype="i8").view("datetime64[ms]")
+            else:
+                array[name] = columns[name]
+        return array
+
+    @staticmethod
+    def to_pandas(items: list, schema: tuple):
+        """
+        :return: pandas.DataFrame, 布尔列为可空的 boolean 类型, 缺失为 pandas.NA
+        """
+        if pandas is None:
+            raise ImportError("pandas is required by to_pandas, install it with: pip install pandas")
+        frame = pandas.DataFrame(ExportUtils.to_numpy(items, schema))
+        for name, kind in schema:
+            if kind == BOOL:
+                frame[name] = frame[name].astype("boolean")
+        return frame
+
+    @staticmethod
+    def to_arrow(items: list, schema: tuple):
+        """
+        :return: pyarrow.Table, 缺失值为 null
+        """
+        if pyarrow is None:
+            raise ImportError("pyarrow is required by to_arrow, install it with: pip install pyarrow")
+        columns = ExportUtils.to_columns(items, schema)
+        types = {STR: pyarrow.string(), FLOAT: pyarrow.float64(), BOOL: pyarrow.bool_(), TIME: pyarrow.timestamp("ms")}
+        return pyarrow.table({name: pyarrow.array(columns[name], type=types[kind],
+                                                  from_pandas=kind == FLOAT) for name, kind in schema})
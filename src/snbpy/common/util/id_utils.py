@@ -0,0 +1,20 @@
+# coding=utf-8
+import threading
+import time
+
+
+class OrderIdGenerator(object):
+    """
+    进程内唯一且单调递增的订单 ID 生成器, 形如 毫秒时间戳 + 3 位序号
+    多进程共用一个账户时, 可通过 prefix 区分
+    """
+
+    def __init__(self, prefix: str = ""):
+        self._prefix = prefix
+        self._last = 0
+        self._lock = threading.Lock()
+
+    def next_id(self) -> str:
+        with self._lock:
+            self._last = max(int(time.time() * 1000) * 1000, self._last + 1)
+            return "%s%d" % (self._prefix, self._last)
@@ -0,0 +1,36 @@
+# coding=utf-8
+class ItemUtils(object):
+    """
+    订单/成交等列表数据的工具方法
+    """
+
+    @staticmethod
+    def order_key(order: dict):
+        """
+        订单唯一键, 使用雪盈订单 ID
+        """
+        return order.get('snb_order_id')
+
+    @staticmethod
+    def transaction_key(transaction: dict) -> tuple:
+        """
+        成交唯一键, 成交的 id 可能为空, 因此带上成交时间与成交内容
+        """
+        return (transaction.get('id'), transaction.get('trade_time'), transaction.get('order_time'),
+                transaction.get('symbol'), transaction.get('side'), transaction.get('price'),
+                transaction.get('quantity'))
+
+    @staticmethod
+    def distinct(items, key) -> list:
+        """
+        按 key 去重并保持原有顺序
+         * ItemUtils.distinct([{"id": 1}, {"id": 2}, {"id": 1}], lambda x: x["id"]) = [{"id": 1}, {"id": 2}]
+        """
+        seen = set()
+        result = []
+        for item in items:
+            item_key = key(item)
+            if item_key not in seen:
+                seen.add(item_key)
+                result.append(item)
+        return result
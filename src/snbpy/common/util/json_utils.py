@@ -0,0 +1,38 @@
+# coding=utf-8
+import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+class JsonDecoder(object):
+    """
+    JSON 解码器, 直接从 bytes 解析, 无需先解码为 str
+    """
+    name = "json"
+
+    def loads(self, data):
+        return json.loads(data)
+
+
+class OrjsonDecoder(JsonDecoder):
+    """
+    基于 orjson 的解码器, 需要安装 orjson
+    """
+    name = "orjson"
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError("orjson is required by OrjsonDecoder, install it with: pip install orjson")
+
+    def loads(self, data):
+        return orjson.loads(data)
+
+
+def default_decoder() -> JsonDecoder:
+    """
+    已安装 orjson 时使用 OrjsonDecoder, 否则使用标准库
+    """
+    return OrjsonDecoder() if orjson is not None else JsonDecoder()
@@ -0,0 +1,470 @@
+# coding=utf-8
+"""
+本地 Open API 模拟服务, 用于离线压测与回归测试
+
+实现与正式服务相同的路由与 result_code/msg/result_data 响应结构, 订单、成交、持仓保存在内存中
+撤单与正式服务一样分两步: 撤单请求受理后订单进入 WAIT_WITHDRAW(已部分成交为 PART_WAIT_WITHDRAW),
+cancel_delay 秒后撤单才完成, 期间订单仍可成交
+支持配置延迟与错误注入, 使用 schema http 连接即可:
+
+    simulator = SnbSimulator(port=0, latency=0.005)
+    simulator.start()
+    config.snb_server, config.snb_port, config.schema = "127.0.0.1", simulator.port, "http"
+
+也可以独立运行: python -m snbpy.simulator --port 8080 --latency 0.005
+"""
+import argparse
+import itertools
+import json
+import logging
+import random
+import re
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import urlsplit, parse_qsl
+
+from snbpy.common.constant.exceptions import API_EXCEPTION, INVALID_PARAM, INVALID_ORDER_ID, KEY_INVALID
+from snbpy.common.constant.snb_constant import OrderStatus, OPEN_ORDER_STATUSES
+
+try:
+    from http.server import ThreadingHTTPServer
+except ImportError:  # pragma: no cover
+    from socketserver import ThreadingMixIn
+
+
+    class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+        daemon_threads = True
+
+logger = logging.getLogger("snbpy")
+
+SUCCESS = "60000"
+
+_OPEN_STATUSES = frozenset(status.value for status in OPEN_ORDER_STATUSES)
+
+_ROUTES = (("POST", re.compile(r"^auth/(?P<account>[^/]+)/access-token$"), "_login"),
+           ("GET", re.compile(r"^auth/(?P<account>[^/]+)/access-token/(?P<token>[^/]+)$"), "_token_status"),
+           ("GET", re.compile(r"^order$"), "_order_list"),
+           ("POST", re.compile(r"^order/(?P<order_id>[^/]+)$"), "_place_order"),
+           ("GET", re.compile(r"^order/(?P<order_id>[^/]+)$"), "_get_order"),
+           ("DELETE", re.compile(r"^order/(?P<order_id>[^/]+)$"), "_cancel_order"),
+           ("GET", re.compile(r"^position$"), "_position_list"),
+           ("GET", re.compile(r"^funds$"), "_balance"),
+           ("GET", re.compile(r"^trade$"), "_transaction_list"),
+           ("GET", re.compile(r"^security/details$"), "_security_detail"))
+
+
+class SimulatorError(Exception):
+    def __init__(self, code, msg):
+        self.code = code
+        self.msg = msg
+
+
+class SnbSimulator(object):
+    """
+    模拟服务, 线程安全, 各配置项可在运行中修改
+    """
+    INITIAL_CASH = 1.0E7
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8080, latency: float = 0, latency_jitter: float = 0,
+                 error_rate: float = 0, http_error_rate: float = 0, http_error_status: int = 503,
+                 auto_fill: bool = False, secret_key: str = None, token_ttl: float = 24 * 3600, seed: int = None,
+                 cancel_delay: float = 0):
+        """
+        :param host: 监听地址
+        :param port: 监听端口, 0 为随机端口, 启动后通过 port 获取
+        :param latency: 每个请求的固定延迟, 秒
+        :param latency_jitter: 在固定延迟上叠加的随机延迟上限, 秒
+        :param error_rate: 返回 result_code 为 API_EXCEPTION 的概率, 不影响登录
+        :param http_error_rate: 返回 http_error_status 的概率, 不影响登录
+        :param http_error_status: 注入的 http 状态码, 如 429, 503
+        :param auto_fill: 下单后立即全部成交
+        :param secret_key: 登录密钥, 为 None 时不校验
+        :param token_ttl: token 有效期, 秒
+        :param seed: 随机数种子, 用于复现延迟与错误
+        :param cancel_delay: 撤单请求受理到撤单完成的时间, 秒, 0 表示下一个请求到达时完成;
+                             也可以通过 complete_cancel 立即完成
+        """
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.http_error_rate = http_error_rate
+        self.http_error_status = http_error_status
+        self.auto_fill = auto_fill
+        self.secret_key = secret_key
+        self.token_ttl = token_ttl
+        self.cancel_delay = cancel_delay
+        self._host = host
+        self._port = port
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._tokens = {}
+        self._orders = {}
+        self._snb_orders = {}
+        self._transactions = []
+        self._positions = {}
+        # 撤单中的订单: 雪盈订单 ID -> 撤单完成时间(time.monotonic)
+        self._pending_cancels = {}
+        self._snb_order_ids = itertools.count(5588000000000000)
+        self._request_counts = {}
+        self._server = None
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1] if self._server is not None else self._port
+
+    def request_count(self, route: str = None) -> int:
+        """
+        :param route: 路由名, 如 place_order, order_list, 为 None 时返回总数
+        """
+        with self._lock:
+            if route is None:
+                return sum(self._request_counts.values())
+            return self._request_counts.get(route, 0)
+
+    def start(self):
+        self._server = ThreadingHTTPServer((self._host, self._port), self._handler_class())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="snbpy-simulator", daemon=True).start()
+        logger.info("simulator started;; %s:%s", self._host, self.port)
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def add_order(self, symbol: str = "00700", side: str = "BUY", quantity: float = 100, price: float = 10.0,
+                  security_type: str = "STK", exchange: str = "HKEX", currency: str = "HKD") -> dict:
+        """
+        添加一笔不是通过 API 下的订单(如 App 下单), 这类订单的 id 为空, 只能通过雪盈订单 ID 撤单或撮合
+        :return: 订单
+        """
+        params = {"security_type": security_type, "symbol": symbol, "exchange": exchange, "currency": currency,
+                  "side": side, "order_type": "LIMIT", "tif": "DAY", "rth": "True"}
+        with self._lock:
+            return dict(self._new_order("", params, float(quantity), float(price), 0))
+
+    def fill_order(self, order_id: str, quantity: float = None, price: float = None) -> dict:
+        """
+        撮合订单, 生成成交并更新持仓
+        :param order_id: 客户端订单 ID 或雪盈订单 ID
+        :param quantity: 成交数量, 为 None 时全部成交
+        :param price: 成交价格, 为 None 时使用委托价格
+        :return: 订单
+        """
+        with self._lock:
+            self._settle_cancels()
+            order = self._find_order(order_id)
+            if order is None or order["status"] not in _OPEN_STATUSES \
+                    and order["snb_order_id"] not in self._pending_cancels:
+                raise SimulatorError(INVALID_ORDER_ID, "order not open: %s" % order_id)
+            return dict(self._fill(order, quantity, price))
+
+    def complete_cancel(self, order_id: str) -> dict:
+        """
+        立即完成撤单中订单的撤单
+        :param order_id: 客户端订单 ID 或雪盈订单 ID
+        :return: 订单
+        """
+        with self._lock:
+            order = self._find_order(order_id)
+            if order is None or self._pending_cancels.pop(order["snb_order_id"], None) is None:
+                raise SimulatorError(INVALID_ORDER_ID, "order not withdrawing: %s" % order_id)
+            return dict(self._withdraw(order))
+
+    def handle(self, method: str, path: str, params: dict, headers: dict) -> tuple:
+        """
+        处理一个请求, 不经过网络, 便于单独测试
+        :return: (http 状态码, 响应 dict 或 None)
+        """
+        path = path.strip("/")
+        for route_method, pattern, handler_name in _ROUTES:
+            match = pattern.match(path)
+            if route_method != method or match is None:
+                continue
+            route = handler_name[1:]
+            with self._lock:
+                self._request_counts[route] = self._request_counts.get(route, 0) + 1
+                delay = self.latency + (self._random.random() * self.latency_jitter if self.latency_jitter else 0)
+                inject = route not in ("login", "token_status")
+                http_error = inject and self._random.random() < self.http_error_rate
+                api_error = inject and not http_error and self._random.random() < self.error_rate
+            if delay > 0:
+                time.sleep(delay)
+            if http_error:
+                return self.http_error_status, None
+            if route not in ("login", "token_status") and not self._authorized(headers):
+                return 401, None
+            if api_error:
+                return 200, self._envelope(API_EXCEPTION, "injected error", None)
+            try:
+                with self._lock:
+                    self._settle_cancels()
+                    data = getattr(self, handler_name)(params, **match.groupdict())
+            except SimulatorError as e:
+                return 200, self._envelope(e.code, e.msg, None)
+            return 200, self._envelope(SUCCESS, None, data)
+        return 404, None
+
+    @staticmethod
+    def _envelope(result_code, msg, data) -> dict:
+        return {"result_code": result_code, "msg": msg, "result_data": data}
+
+    def _authorized(self, headers: dict) -> bool:
+        cookie = headers.get("Cookie") or ""
+        token = None
+        for part in cookie.split(";"):
+            name, _, value = part.strip().partition("=")
+            if name == "access_token":
+                token = value
+        with self._lock:
+            expiry_time = self._tokens.get(token)
+        return expiry_time is not None and expiry_time > time.time() * 1000
+
+    def _find_order(self, order_id: str, order_id_type: str = None):
+        if order_id_type != "SNB" and order_id in self._orders:
+            return self._orders[order_id]
+        if order_id_type != "CLIENT":
+            return self._snb_orders.get(order_id)
+        return None
+
+    @staticmethod
+    def _page(items: list, params: dict) -> dict:
+        page, size = int(params.get("page") or 1), int(params.get("size") or 20)
+        return {"count": len(items), "page": page, "size": size, "items": items[(page - 1) * size:page * size]}
+
+    def _login(self, params, account):
+        if self.secret_key is not None and params.get("secret_key") != self.secret_key:
+            raise SimulatorError(KEY_INVALID, "secret key invalid")
+        token = secrets.token_urlsafe(24)
+        expiry_time = int((time.time() + self.token_ttl) * 1000)
+        self._tokens[token] = expiry_time
+        return {"access_token": token, "expiry_time": expiry_time}
+
+    def _token_status(self, params, account, token):
+        if token not in self._tokens:
+            raise SimulatorError(API_EXCEPTION, "token not found")
+        return {"access_token": token, "expiry_time": self._tokens[token]}
+
+    def _order_list(self, params):
+        # 与正式服务一致, status 只支持单个状态, security_type 可以用逗号分隔多个
+        status = params.get("status")
+        security_types = set(filter(None, (params.get("security_type") or "").split(",")))
+        orders = [dict(order) for order in reversed(list(self._snb_orders.values()))
+                  if (not status or order["status"] == status)
+                  and (not security_types or order["security_type"] in security_types)]
+        return self._page(orders, params)
+
+    def _place_order(self, params, order_id):
+        if order_id in self._orders:
+            raise SimulatorError(INVALID_ORDER_ID, "duplicate order id: %s" % order_id)
+        try:
+            quantity = float(params["quantity"])
+            price = float(params.get("price") or 0)
+            stop_price = float(params.get("stop_price") or 0)
+        except (KeyError, ValueError):
+            raise SimulatorError(INVALID_PARAM, "invalid quantity or price")
+        if quantity <= 0:
+            raise SimulatorError(INVALID_PARAM, "invalid quantity")
+        order = self._new_order(order_id, params, quantity, price, stop_price)
+        if self.auto_fill:
+            self._fill(order, None, None)
+        return {"id": order_id, "status": order["status"]}
+
+    def _new_order(self, order_id: str, params: dict, quantity: float, price: float, stop_price: float) -> dict:
+        order = {"account_id": params.get("account_id"), "average_price": 0.0, "children": None,
+                 "currency": params.get("currency"), "exchange": params.get("exchange"), "filled_quantity": 0,
+                 "group_id": None, "id": order_id, "memo": "", "order_time": int(time.time() * 1000),
+                 "order_type": params.get("order_type"), "parent": params.get("parent") or None, "price": price,
+                 "quantity": quantity, "rth": params.get("rth") == "True", "secondary_order_id": None,
+                 "security_type": params.get("security_type"), "side": params.get("side"),
+                 "snb_order_id": str(next(self._snb_order_ids)), "status": OrderStatus.REPORTED.value,
+                 "stop_price": stop_price or None, "symbol": params.get("symbol"), "tif": params.get("tif")}
+        if order_id:
+            self._orders[order_id] = order
+        self._snb_orders[order["snb_order_id"]] = order
+        return order
+
+    def _get_order(self, params, order_id):
+        # 与正式服务一致, 只支持客户端订单 ID
+        order = self._orders.get(order_id)
+        if order is None:
+            raise SimulatorError(INVALID_ORDER_ID, "order not found: %s" % order_id)
+        return dict(order)
+
+    def _cancel_order(self, params, order_id):
+        order = self._find_order(order_id, params.get("order_id_type"))
+        if order is None:
+            raise SimulatorError(INVALID_ORDER_ID, "order not found: %s" % order_id)
+        if order["status"] not in _OPEN_STATUSES:
+            raise SimulatorError(API_EXCEPTION, "order cannot be cancelled: %s" % order["status"])
+        order["status"] = OrderStatus.PART_WAIT_WITHDRAW.value if order["filled_quantity"] \
+            else OrderStatus.WAIT_WITHDRAW.value
+        self._pending_cancels[order["snb_order_id"]] = time.monotonic() + self.cancel_delay
+        return {"id": params.get("new_id"), "status": order["status"]}
+
+    def _settle_cancels(self):
+        if not self._pending_cancels:
+            return
+        now = time.monotonic()
+        for snb_order_id in [key for key, deadline in self._pending_cancels.items() if deadline <= now]:
+            del self._pending_cancels[snb_order_id]
+            self._withdraw(self._snb_orders[snb_order_id])
+
+    @staticmethod
+    def _withdraw(order: dict) -> dict:
+        order["status"] = OrderStatus.PART_WITHDRAW.value if order["filled_quantity"] else OrderStatus.WITHDRAWED.value
+        return order
+
+    def _position_list(self, params):
+        security_types = set(filter(None, (params.get("security_type") or "").split(",")))
+        return [dict(position) for position in self._positions.values()
+                if position["position"] and (not security_types or position["security_type"] in security_types)]
+
+    def _balance(self, params):
+        cash = self.INITIAL_CASH + sum(transaction["price"] * transaction["quantity"] *
+                                       (1 if transaction["side"] == "SELL" else -1)
+                                       for transaction in self._transactions)
+        position_value = sum(position["position"] * position["market_price"] for position in self._positions.values())
+        return {"balance_detail_items": [{"cash": cash, "currency": "USD"}], "cash": cash, "currency": "USD",
+                "current_available_funds": cash, "current_excess_liquidity": cash, "current_initial_margin": 0.0,
+                "current_maintenance_margin": 0.0, "equity_with_loan_value": cash + position_value, "leverage": 0.0,
+                "net_liquidation_value": cash + position_value,
+                "previous_day_equity_with_loan_value": cash + position_value,
+                "securities_gross_position_value": position_value, "sma": 0.0}
+
+    def _transaction_list(self, params):
+        side = params.get("side")
+        order_time_min, order_time_max = params.get("order_time_min"), params.get("order_time_max")
+        transactions = [dict(transaction) for transaction in reversed(self._transactions)
+                        if (not side or transaction["side"] == side)
+                        and (not order_time_min or transaction["order_time"] >= int(order_time_min))
+                        and (not order_time_max or transaction["order_time"] <= int(order_time_max))]
+        return self._page(transactions, params)
+
+    def _security_detail(self, params):
+        symbol = params.get("symbol")
+        if not symbol:
+            raise SimulatorError(INVALID_PARAM, "symbol required")
+        us = symbol.isalpha()
+        return {"symbol": symbol, "exchange": "USEX" if us else "HKEX", "security_type": "STK",
+                "currency": "USD" if us else "HKD", "lot_size": 1 if us else 100}
+
+    def _fill(self, order: dict, quantity, price) -> dict:
+        remaining = order["quantity"] - order["filled_quantity"]
+        quantity = remaining if quantity is None else min(float(quantity), remaining)
+        if quantity <= 0:
+            raise SimulatorError(INVALID_PARAM, "invalid fill quantity")
+        price = order["price"] if price is None else float(price)
+        filled = order["filled_quantity"] + quantity
+        order["average_price"] = (order["average_price"] * order["filled_quantity"] + price * quantity) / filled
+        order["filled_quantity"] = filled
+        if filled >= order["quantity"]:
+            # 撤单完成前全部成交, 撤单失败
+            self._pending_cancels.pop(order["snb_order_id"], None)
+            order["status"] = OrderStatus.CONCLUDED.value
+        elif order["snb_order_id"] in self._pending_cancels:
+            order["status"] = OrderStatus.PART_WAIT_WITHDRAW.value
+        else:
+            order["status"] = OrderStatus.PART_CONCLUDED.value
+        self._transactions.append({"account_id": order["account_id"], "currency": order["currency"],
+                                   "exchange": order["exchange"], "id": order["id"], "order_price": order["price"],
+                                   "order_quantity": order["quantity"], "order_time": order["order_time"],
+                                   "order_type": order["order_type"], "price": price, "quantity": quantity,
+                                   "rth": order["rth"], "security_type": order["security_type"],
+                                   "side": order["side"], "status": order["status"], "symbol": order["symbol"],
+                                   "tif": order["tif"], "trade_time": int(time.time() * 1000)})
+        key = (order["symbol"], order["security_type"])
+        position = self._positions.get(key)
+        if position is None:
+            position = self._positions[key] = {"account_id": order["account_id"], "average_price": 0.0,
+                                               "exchange": order["exchange"], "market_price": price,
+                                               "position": 0, "realized_pnl": 0.0,
+                                               "security_type": order["security_type"], "symbol": order["symbol"]}
+        signed = quantity if order["side"] == "BUY" else -quantity
+        if position["position"] * signed >= 0:
+            total = position["position"] + signed
+            position["average_price"] = (position["average_price"] * position["position"] + price * signed) / total
+        else:
+            closed = min(abs(signed), abs(position["position"]))
+            position["realized_pnl"] += (price - position["average_price"]) * closed * \
+                                        (1 if position["position"] > 0 else -1)
+            if abs(signed) > closed:
+                # 反手, 剩余部分按成交价开仓
+                position["average_price"] = price
+        position["position"] += signed
+        position["market_price"] = price
+        return order
+
+    def _handler_class(self):
+        simulator = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # 响应头与响应体分两次写出, 不关闭 Nagle 时每个请求会多等待一次延迟 ACK (~40ms)
+            disable_nagle_algorithm = True
+
+            def _handle(self, method):
+                split = urlsplit(self.path)
+                params = dict(parse_qsl(split.query))
+                length = int(self.headers.get("Content-Length") or 0)
+                if length:
+                    params.update(parse_qsl(self.rfile.read(length).decode("utf-8")))
+                status, body = simulator.handle(method, split.path, params, self.headers)
+                payload = json.dumps(body).encode("utf-8") if body is not None else b""
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                self._handle("GET")
+
+            def do_POST(self):
+                self._handle("POST")
+
+            def do_DELETE(self):
+                self._handle("DELETE")
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="snbpy Open API simulator")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0, help="fixed latency per request, seconds")
+    parser.add_argument("--latency-jitter", type=float, default=0, help="max random extra latency, seconds")
+    parser.add_argument("--error-rate", type=float, default=0, help="probability of an API_EXCEPTION result")
+    parser.add_argument("--http-error-rate", type=float, default=0, help="probability of an http error status")
+    parser.add_argument("--http-error-status", type=int, default=503)
+    parser.add_argument("--auto-fill", action="store_true", help="fill orders as soon as they are placed")
+    parser.add_argument("--cancel-delay", type=float, default=0, help="time for a cancel to complete, seconds")
+    args = parser.parse_args()
+    simulator = SnbSimulator(args.host, args.port, args.latency, args.latency_jitter, args.error_rate,
+                             args.http_error_rate, args.http_error_status, args.auto_fill,
+                             cancel_delay=args.cancel_delay)
+    simulator.start()
+    print("snbpy simulator listening on %s:%d" % (args.host, simulator.port))
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        simulator.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,33 @@
 # coding=utf-8
 import abc
-import json
 import logging
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 import requests
+from requests.adapters import HTTPAdapter
 
-from snbpy.common.constant.exceptions import ApiExecuteException, API_EXCEPTION, TokenInvalid, LOGIN_NEEDED
+from snbpy.common.component.file_cache import FileCache
+from snbpy.common.component.hedging import RequestHedger
+from snbpy.common.component.local_cache import LocalCache
+from snbpy.common.component.metrics import MetricsSink
+from snbpy.common.component.priority_scheduler import PriorityScheduler
+from snbpy.common.component.rate_limiter import RateLimiter
+from snbpy.common.component.single_flight import SingleFlight
+from snbpy.common.component.token_refresher import TokenRefresher
+from snbpy.common.constant.exceptions import ApiExecuteException, API_EXCEPTION, TokenInvalid, LOGIN_NEEDED, \
+    TOKEN_INVALID, SnbException, THROTTLED
 from snbpy.common.constant.snb_constant import API_VERSION, HttpMethod, SecurityType, OrderSide, Currency, TimeInForce, \
-    OrderType, OrderIdType, TradingHours
+    OrderType, OrderIdType, TradingHours, OPEN_ORDER_STATUSES
 from snbpy.common.domain.request import HttpRequest, AccessTokenRequest, GetOrderListRequest, GetPositionListRequest, \
     GetBalanceRequest, GetSecurityDetailRequest, GetOrderByOrderIdRequest, CancelOrderRequest, PlaceOrderRequest, \
-    GetTokenStatusRequest, GetTransactionListRequest
-from snbpy.common.domain.response import HttpResponse
+    GetTokenStatusRequest, GetTransactionListRequest, OrderTemplate
+from snbpy.common.domain.response import HttpResponse, BatchResult
 from snbpy.common.domain.snb_config import SnbConfig
+from snbpy.common.util.id_utils import OrderIdGenerator
+from snbpy.common.util.item_utils import ItemUtils
+from snbpy.common.util.json_utils import JsonDecoder, default_decoder
 from snbpy.common.util.string_utils import StringUtils
 
 logger = logging.getLogger("snbpy")
@@ -24,6 +38,13 @@ class SnbApiClient(metaclass=abc.ABCMeta):
     API Client 框架
     """
 
+    # 服务端表示 token 失效(如被踢出)的 result_code, 命中时抛出 TokenInvalid, auto_login 下会重新登录并重试
+    token_invalid_codes = frozenset()
+    # 服务端表示限流的 result_code, 与 http 429 一样会降低 rate_limiter 的并发上限
+    throttled_codes = frozenset()
+    # 默认合并并发请求的只读接口, 可通过 set_coalescing 调整
+    COALESCED_REQUESTS = (GetBalanceRequest, GetPositionListRequest)
+
     def __init__(self, config: SnbConfig, token: str = None, token_expire_time: int = 0):
         logger.debug("init snb api client;; config: %s", config)
         config.verify()
@@ -31,18 +52,90 @@ class SnbApiClient(metaclass=abc.ABCMeta):
         self._config = config
         self._token = token
         self._token_expire_time = token_expire_time
+        self._token_lock = threading.RLock()
+        self._single_flight = SingleFlight()
+        self._json_decoder = default_decoder()
+        self._metrics_sink = None
+        self._hedger = None
+        self._rate_limiter = None
+        self._priority_scheduler = None
+        self._coalesced_requests = set(self.COALESCED_REQUESTS)
+        self._file_cache = FileCache(config.cache_path, config.account) \
+            if StringUtils.is_not_blank(config.cache_path) else None
+        if self._file_cache is not None and StringUtils.is_blank(token):
+            cached_token = self._file_cache.get_token()
+            if cached_token is not None and (cached_token[1] or 0) > time.time() * 1000:
+                logger.debug("use access token from cache file;; expiry_time: %s", cached_token[1])
+                self._token, self._token_expire_time = cached_token
         self._headers = {"User-Agent": "snbpy/%s" % API_VERSION,
                          "Accecpt": "Accept:application/vnd.snowx+json; version=1.0",
                          "Cache-Control": "no-cache",
                          "Connection": "Keep-Alive"}
 
+    @property
+    def config(self) -> SnbConfig:
+        return self._config
+
+    @property
+    def json_decoder(self) -> JsonDecoder:
+        return self._json_decoder
+
+    @json_decoder.setter
+    def json_decoder(self, json_decoder: JsonDecoder):
+        self._json_decoder = json_decoder
+
+    @property
+    def metrics_sink(self) -> MetricsSink:
+        """
+        指标接收器, 如 MetricsRecorder, 为 None 时关闭统计
+        """
+        return self._metrics_sink
+
+    @metrics_sink.setter
+    def metrics_sink(self, metrics_sink: MetricsSink):
+        self._metrics_sink = metrics_sink
+
+    @property
+    def hedger(self) -> RequestHedger:
+        """
+        只读(GET)请求的对冲器, 为 None 时不对冲
+        """
+        return self._hedger
+
+    @hedger.setter
+    def hedger(self, hedger: RequestHedger):
+        self._hedger = hedger
+
+    @property
+    def rate_limiter(self) -> RateLimiter:
+        """
+        客户端限流器, 为 None 时不限流
+        """
+        return self._rate_limiter
+
+    @rate_limiter.setter
+    def rate_limiter(self, rate_limiter: RateLimiter):
+        self._rate_limiter = rate_limiter
+
+    @property
+    def priority_scheduler(self) -> PriorityScheduler:
+        """
+        按优先级分配连接的调度器, 为 None 时不区分优先级
+        """
+        return self._priority_scheduler
+
+    @priority_scheduler.setter
+    def priority_scheduler(self, priority_scheduler: PriorityScheduler):
+        self._priority_scheduler = priority_scheduler
+
     @property
     def token(self):
         return self._token
 
     @token.setter
     def token(self, token):
-        self._token = token
+        with self._token_lock:
+            self._token = token
 
     @property
     def token_expire_time(self):
@@ -50,19 +143,42 @@ class SnbApiClient(metaclass=abc.ABCMeta):
 
     @token_expire_time.setter
     def token_expire_time(self, token_expire_time):
-        self._token_expire_time = token_expire_time
+        with self._token_lock:
+            self._token_expire_time = token_expire_time
 
-    @abc.abstractmethod
-    def _parse_response(self, response_str: str) -> HttpResponse:
+    def _set_token(self, token: str, token_expire_time: int):
+        """
+        原子地更新 token 与过期时间
         """
-        解析请求返回值
-        :param response_str: response body
+        with self._token_lock:
+            self._token = token
+            self._token_expire_time = token_expire_time
+        if self._file_cache is not None:
+            self._file_cache.put_token(token, token_expire_time)
+
+    def _parse_response(self, response_str) -> HttpResponse:
+        """
+        解析请求返回值, 同步与异步 client 共用
+        :param response_str: response body, bytes 或 str
         :return: HttpResponse
         """
-        pass
+        dic = self._json_decoder.loads(response_str)
+        if 'result_code' not in dic \
+                or 'msg' not in dic \
+                or 'result_data' not in dic:
+            raise ApiExecuteException(API_EXCEPTION, 'response result invalid')
+        if dic.get('result_code') in self.token_invalid_codes:
+            raise TokenInvalid(TOKEN_INVALID, StringUtils.default_string(dic.get('msg'), "token invalid"))
+        response = HttpResponse()
+        response.data = dic.get('result_data')
+        response.result_code = dic.get('result_code')
+        response.message = StringUtils.default_string(dic.get('msg'))
+        if self._config.keep_result_str:
+            response.result_str = response_str.decode("utf-8") if isinstance(response_str, bytes) else response_str
+        return response
 
     @abc.abstractmethod
-    def _do_execute(self, url: str, params: dict, header: dict, timeout: int, method: HttpMethod) -> str:
+    def _do_execute(self, url: str, params: dict, header: dict, timeout: int, method: HttpMethod):
         """
         执行请求
         :param url:
@@ -70,20 +186,24 @@ class SnbApiClient(metaclass=abc.ABCMeta):
         :param header:
         :param timeout:
         :param method:
-        :return: response body
+        :return: response body, 建议直接返回 bytes, 避免额外的解码
         """
         pass
 
-    @abc.abstractmethod
     def _prepare_param(self, request: HttpRequest) -> dict:
         """
         准备请求参数
         :param request: 请求对象
-        :return: dict
+        :return: dict, 已编码的请求体(如 TemplateOrderRequest)为 bytes
         """
-        pass
+        return request.generate_params()
 
-    def execute(self, request: HttpRequest) -> HttpResponse:
+    def _pre_execute(self, request: HttpRequest) -> dict:
+        """
+        校验请求与 token, 生成请求头
+        :param request: 请求对象
+        :return: headers
+        """
         logger.debug("execute request;; request: %s; method: %s ;url: %s", request.__class__, request.method,
                      request.url)
         logger.debug("verify request;; request: %s; method: %s ;url: %s", request.__class__, request.method,
@@ -91,19 +211,167 @@ class SnbApiClient(metaclass=abc.ABCMeta):
         request.verify()
         logger.debug("request verify passed;; request: %s; method: %s ;url: %s", request.__class__, request.method,
                      request.url)
-        headers = self._headers
+        # 每个请求使用独立的 headers, 共享的 self._headers 只读, client 可在多线程间共享
+        headers = dict(self._headers)
         logger.debug("send http request: %s", request)
-        if request.auth() > 0 and (StringUtils.is_blank(self._token) or self._token_expire_time < time.time()):
-            raise TokenInvalid(LOGIN_NEEDED, "login first")
         if request.auth() > 0:
-            headers['Cookie'] = 'access_token=%s' % self._token
+            with self._token_lock:
+                token, token_expire_time = self._token, self._token_expire_time
+            # expiry_time 为毫秒时间戳
+            if StringUtils.is_blank(token) or (token_expire_time or 0) < time.time() * 1000:
+                raise TokenInvalid(LOGIN_NEEDED, "login first")
+            headers['Cookie'] = 'access_token=%s' % token
+        return headers
+
+    def set_coalescing(self, request_class, enabled: bool = True):
+        """
+        设置某个只读接口是否合并并发请求
+        开启后, url 与参数相同的并发 GET 请求只发送一次, 共享同一个 HttpResponse 对象, 调用方不应修改它
+        :param request_class: 请求类, 如 GetOrderListRequest
+        :param enabled: 是否开启
+        """
+        if enabled:
+            self._coalesced_requests.add(request_class)
+        else:
+            self._coalesced_requests.discard(request_class)
+
+    def execute(self, request: HttpRequest) -> HttpResponse:
+        if self._metrics_sink is not None:
+            return self._execute_with_metrics(request, self._metrics_sink)
+        headers = self._pre_execute(request)
+        params = self._prepare_param(request)
+        return self._dispatch(request, params, headers)
+
+    def _execute_with_metrics(self, request: HttpRequest, sink: MetricsSink) -> HttpResponse:
+        timings = {}
+        result_code = None
+        start = time.perf_counter()
         try:
-            response_str = self._do_execute(request.url, self._prepare_param(request), headers, self._config.timeout,
-                                            request.method)
+            headers = self._pre_execute(request)
+            verified = time.perf_counter()
+            timings["verify"] = verified - start
+            params = self._prepare_param(request)
+            timings["prepare"] = time.perf_counter() - verified
+            response = self._dispatch(request, params, headers, timings)
+            result_code = response.result_code
+            return response
+        except SnbException as e:
+            result_code = e.code
+            raise
+        except Exception as e:
+            result_code = e.__class__.__name__
+            raise
+        finally:
+            timings["total"] = time.perf_counter() - start
+            sink.record(request.__class__.__name__, result_code, timings)
+
+    def _dispatch(self, request: HttpRequest, params: dict, headers: dict, timings: dict = None) -> HttpResponse:
+        if request.method == HttpMethod.GET and type(request) in self._coalesced_requests:
+            key = (request.url, tuple(sorted(params.items(), key=lambda item: item[0])), headers.get('Cookie'))
+            return self._single_flight.do(key, lambda: self._send(request, params, headers, timings))
+        return self._send(request, params, headers, timings)
+
+    def _send(self, request: HttpRequest, params: dict, headers: dict, timings: dict = None) -> HttpResponse:
+        limiter, scheduler = self._rate_limiter, self._priority_scheduler
+        if limiter is None and scheduler is None:
+            return self._send_once(request, params, headers, timings)
+        permit = limiter.acquire(request) if limiter is not None else None
+        try:
+            # 通过限流后再占用连接, 避免排队等待令牌时占着连接
+            slot = scheduler.acquire(request) if scheduler is not None else None
+        except BaseException:
+            if limiter is not None:
+                # 请求未发出, 只归还名额
+                limiter.release(permit, None)
+            raise
+        throttled = False
+        # 占用连接后才开始计时, 在 priority_scheduler 中排队的时间不计入限流器的延迟样本, 避免被当作服务端拥塞
+        start = time.perf_counter()
+        try:
+            response = self._send_once(request, params, headers, timings)
+            throttled = response.result_code in self.throttled_codes
+            return response
+        except ApiExecuteException as e:
+            throttled = e.code == THROTTLED
+            raise
+        finally:
+            if scheduler is not None:
+                scheduler.release(slot)
+            if limiter is not None:
+                limiter.release(permit, time.perf_counter() - start, throttled)
+
+    def _send_once(self, request: HttpRequest, params: dict, headers: dict, timings: dict = None) -> HttpResponse:
+        start = time.perf_counter() if timings is not None else 0
+        hedger = self._hedger
+        try:
+            if hedger is not None and request.method == HttpMethod.GET:
+                # 两次请求可能同时进行, 各自使用一份 headers
+                response_str = hedger.call(
+                    request.__class__.__name__,
+                    lambda: self._do_execute(request.url, params, dict(headers), self._config.timeout, request.method),
+                    lambda: self._send_hedge(request, params, dict(headers)))
+            else:
+                response_str = self._do_execute(request.url, params, headers, self._config.timeout, request.method)
+        except (TokenInvalid, ApiExecuteException):
+            raise
         except Exception as e:
             logger.error("http excepiton;; %s", e)
             raise ApiExecuteException(API_EXCEPTION, "http exception" + str(e))
-        return self._parse_response(response_str)
+        if timings is None:
+            return self._parse_response(response_str)
+        received = time.perf_counter()
+        timings["network"] = received - start
+        response = self._parse_response(response_str)
+        timings["parse"] = time.perf_counter() - received
+        return response
+
+    def _send_hedge(self, request: HttpRequest, params: dict, headers: dict):
+        """
+        发送对冲请求, 与第一次请求一样占用 priority_scheduler 的连接与 rate_limiter 的名额,
+        没有空闲的连接或名额时不等待, 抛出异常放弃对冲
+        :return: response body
+        """
+        scheduler, limiter = self._priority_scheduler, self._rate_limiter
+        # 先占连接再取名额: 取到的名额一定对应一次实际发出的请求, 不会用未发出的请求的耗时调整并发上限
+        slot = scheduler.acquire(request, wait=False) if scheduler is not None else None
+        try:
+            if limiter is None:
+                return self._do_execute(request.url, params, headers, self._config.timeout, request.method)
+            permit = limiter.acquire(request, time.monotonic())
+            throttled = False
+            start = time.perf_counter()
+            try:
+                return self._do_execute(request.url, params, headers, self._config.timeout, request.method)
+            except ApiExecuteException as e:
+                throttled = e.code == THROTTLED
+                raise
+            finally:
+                limiter.release(permit, time.perf_counter() - start, throttled)
+        finally:
+            if scheduler is not None:
+                scheduler.release(slot)
+
+    def _execute_quietly(self, request: HttpRequest) -> BatchResult:
+        try:
+            return BatchResult(request, response=self.execute(request))
+        except Exception as e:
+            logger.warning("batch request failed;; request: %s; url: %s; %s", request.__class__, request.url, e)
+            return BatchResult(request, exception=e)
+
+    def execute_batch(self, request_list: list, max_workers: int = None) -> list:
+        """
+        并发执行一批请求, 单个请求失败不影响其他请求
+        :param request_list: 请求对象列表
+        :param max_workers: 最大并发数, 默认为 SnbConfig.pool_size
+        :return: 与 request_list 顺序一致的 BatchResult 列表
+        """
+        if not request_list:
+            return []
+        max_workers = min(len(request_list), max_workers or self._config.pool_size)
+        if max_workers <= 1:
+            return [self._execute_quietly(request) for request in request_list]
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="snbpy-batch") as executor:
+            return list(executor.map(self._execute_quietly, request_list))
 
 
 class TradeInterface(object):
@@ -484,46 +752,109 @@ class TradeInterface(object):
 
 
 class SnbHttpClient(SnbApiClient, TradeInterface):
-    def __init__(self, config: SnbConfig):
-        self.session = requests.session()
+    """
+    基于 requests 的 Client, 线程安全, 多个线程可共享同一个 client 及其连接池
+    连接池大小由 SnbConfig.pool_size 控制, 建议不小于并发线程数
+    """
+
+    # 证券信息变化很少, 默认缓存 1 小时
+    SECURITY_CACHE_TTL = 60 * 60
+    # auto_login 时提前刷新 token 的时间, 秒
+    TOKEN_REFRESH_AHEAD = 5 * 60
+
+    def __init__(self, config: SnbConfig, session: requests.Session = None):
+        """
+        :param config: 配置
+        :param session: 共享的 requests.Session, 如 SnbClientManager 中多个账户共用一个连接池, 为 None 时新建
+                        共享的 session 由创建方关闭, close 不会关闭它
+        """
+        self._owns_session = session is None
+        if session is None:
+            session = requests.session()
+            adapter = HTTPAdapter(pool_connections=config.pool_size, pool_maxsize=config.pool_size)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+        self.session = session
+        self.order_id_generator = OrderIdGenerator()
+        self.security_cache = LocalCache(max_size=4096, ttl=self.SECURITY_CACHE_TTL)
+        self._login_lock = threading.Lock()
+        self._token_refresher = TokenRefresher(self, self.TOKEN_REFRESH_AHEAD)
         super().__init__(config)
+        if self._file_cache is not None:
+            now = time.time()
+            for symbol, detail in self._file_cache.get_security_details().items():
+                response = HttpResponse()
+                response.result_code = detail.get('result_code')
+                response.message = detail.get('msg')
+                response.data = detail.get('data')
+                expire_at = detail.get('expire_at')
+                self.security_cache.put(symbol, response, None if expire_at is None else expire_at - now)
 
-    def _parse_response(self, response_str: str) -> HttpResponse:
-        dic = json.loads(response_str)
-        # todo 自动踢出
-        if 'result_code' not in dic \
-                or 'msg' not in dic \
-                or 'result_data' not in dic:
-            raise ApiExecuteException(API_EXCEPTION, 'response result invalid')
-        response = HttpResponse()
-        response.data = dic.get('result_data')
-        response.result_code = dic.get('result_code')
-        response.message = StringUtils.default_string(dic.get('msg'))
-        response.result_str = response_str
-        return response
+    def close(self):
+        """
+        停止后台刷新 token 并关闭连接池
+        """
+        self._token_refresher.stop()
+        if self._owns_session:
+            self.session.close()
+
+    def refresh_token(self, stale_token: str = None):
+        """
+        重新登录, 同一时刻只有一个登录请求
+        若等待期间其他线程已刷新出不同于 stale_token 的有效 token, 则直接使用
+        :param stale_token: 调用方认为已失效的 token
+        """
+        with self._login_lock:
+            with self._token_lock:
+                token, token_expire_time = self._token, self._token_expire_time
+            if StringUtils.is_not_blank(token) and token != stale_token \
+                    and (token_expire_time or 0) > time.time() * 1000:
+                return
+            self.login()
+
+    def execute(self, request: HttpRequest) -> HttpResponse:
+        if not self._config.auto_login or request.auth() <= 0:
+            return super().execute(request)
+        with self._token_lock:
+            token, token_expire_time = self._token, self._token_expire_time
+        if StringUtils.is_blank(token) or (token_expire_time or 0) < time.time() * 1000:
+            self.refresh_token(token)
+            token = self._token
+        try:
+            return super().execute(request)
+        except TokenInvalid as e:
+            logger.warning("token invalid, login and retry;; code: %s; msg: %s", e.code, e.msg)
+            self.refresh_token(token)
+            return super().execute(request)
 
-    def _do_execute(self, url: str, params: dict, header: dict, timeout: int, method: HttpMethod) -> str:
+    def _do_execute(self, url: str, params: dict, header: dict, timeout: int, method: HttpMethod) -> bytes:
         request_path = "%s://%s:%s/%s" % (self._config.schema, self._config.snb_server, self._config.snb_port, url)
         logger.debug("do execute;; url: %s, params: %s, header: %s, timeout: %s, method: %s", url, params, header,
                      timeout, method)
+        if isinstance(params, bytes):
+            # 已编码的表单请求体, 如 TemplateOrderRequest
+            header['Content-Type'] = 'application/x-www-form-urlencoded'
 
         try:
             if method == HttpMethod.GET:
-                return self.session.get(url=request_path, headers=header, params=params, timeout=timeout).content.decode(
-                    "utf-8")
+                response = self.session.get(url=request_path, headers=header, params=params, timeout=timeout)
             elif method == HttpMethod.POST:
-                return self.session.post(url=request_path, headers=header, data=params, timeout=timeout).content.decode(
-                    "utf-8")
+                response = self.session.post(url=request_path, headers=header, data=params, timeout=timeout)
             elif method == HttpMethod.DELETE:
-                return self.session.delete(url=request_path, headers=header, params=params, timeout=timeout).content.decode(
-                    "utf-8")
-
+                response = self.session.delete(url=request_path, headers=header, params=params, timeout=timeout)
+            else:
+                return None
         except Exception as e:
             logger.error("do execute with exception;; %s", e)
             raise e
-
-    def _prepare_param(self, request: HttpRequest) -> dict:
-        return request.generate_params()
+        if response.status_code == 401:
+            raise TokenInvalid(TOKEN_INVALID, "token invalid")
+        if response.status_code == 429:
+            raise ApiExecuteException(THROTTLED, "http status 429")
+        if response.status_code >= 500:
+            # 服务端错误, 响应体不是 result_code 结构
+            raise ApiExecuteException(API_EXCEPTION, "http status %d" % response.status_code)
+        return response.content
 
     def login(self) -> HttpResponse:
         """
@@ -545,8 +876,9 @@ class SnbHttpClient(SnbApiClient, TradeInterface):
         if not response.succeed():
             logger.warning("login failed %s", response)
             raise ApiExecuteException(API_EXCEPTION, "login failed")
-        self._token = response.data.get('access_token')
-        self._token_expire_time = response.data.get('expiry_time')
+        self._set_token(response.data.get('access_token'), response.data.get('expiry_time'))
+        if self._config.auto_login:
+            self._token_refresher.start()
         return response
 
     def get_token_status(self) -> HttpResponse:
@@ -570,11 +902,37 @@ class SnbHttpClient(SnbApiClient, TradeInterface):
         response = self.execute(balance_request)
         return response
 
-    def get_security_detail(self, symbol: str):
+    def get_security_detail(self, symbol: str, use_cache: bool = True):
+        """
+        证券信息查询, 成功的结果会缓存在 security_cache 中, 配置了 cache_path 时同时写入缓存文件
+        :param symbol: 证券代码
+        :param use_cache: 是否使用缓存, 为 False 时总是访问 API 并刷新缓存
+        """
+        if use_cache:
+            response = self.security_cache.get(symbol)
+            if response is not None:
+                return response
         security_detail_request = GetSecurityDetailRequest(self._config.account, symbol)
         response = self.execute(security_detail_request)
+        if response.succeed():
+            self.security_cache.put(symbol, response)
+            if self._file_cache is not None:
+                self._file_cache.put_security_detail(symbol, response.result_code, response.message, response.data,
+                                                     time.time() + self.SECURITY_CACHE_TTL)
         return response
 
+    def invalidate_security_detail(self, symbol: str = None):
+        """
+        清除证券信息缓存
+        :param symbol: 证券代码, 为空时清除全部
+        """
+        if symbol is None:
+            self.security_cache.clear()
+        else:
+            self.security_cache.invalidate(symbol)
+        if self._file_cache is not None:
+            self._file_cache.remove_security_detail(symbol)
+
     def get_order_by_id(self, order_id: str):
         order_request = GetOrderByOrderIdRequest(account_id=self._config.account, order_id=order_id)
         response = self.execute(order_request)
@@ -589,12 +947,221 @@ class SnbHttpClient(SnbApiClient, TradeInterface):
         response = self.execute(place_order_request)
         return response
 
+    def place_orders(self, request_list: list, max_workers: int = None) -> list:
+        """
+        批量下单, 在共享连接池上并发发送
+        :param request_list: PlaceOrderRequest 列表
+        :param max_workers: 最大并发数, 默认为 SnbConfig.pool_size
+        :return: 与 request_list 顺序一致的 BatchResult 列表, 单笔失败记录在对应 BatchResult.exception 中
+        """
+        return self.execute_batch(request_list, max_workers)
+
     def cancel_order(self, order_id: str, origin_order_id: str, order_id_type: OrderIdType = OrderIdType.CLIENT):
         cancel_order_request = CancelOrderRequest(account_id=self._config.account, origin_order_id=origin_order_id,
                                                   order_id=order_id, order_id_type=order_id_type)
         response = self.execute(cancel_order_request)
         return response
 
+    def create_order_template(self, security_type: SecurityType, symbol: str, exchange: str, currency: Currency,
+                              order_type: OrderType = OrderType.LIMIT, tif: TimeInForce = TimeInForce.DAY,
+                              force_only_rth: bool = True, order_id_type: OrderIdType = OrderIdType.CLIENT,
+                              trading_hours: TradingHours = None) -> OrderTemplate:
+        """
+        创建当前账户的下单模板, 参见 OrderTemplate
+        """
+        return OrderTemplate(self._config.account, security_type, symbol, exchange, currency, order_type, tif,
+                             force_only_rth, order_id_type, trading_hours)
+
+    def place_template_order(self, template: OrderTemplate, order_id: str, side: OrderSide, quantity: int,
+                             price: float = 0, stop_price: float = 0, parent: str = None) -> HttpResponse:
+        """
+        使用下单模板下单, 只编码 order_id, side, quantity, price 等字段
+        """
+        return self.execute(template.request(order_id, side, quantity, price, stop_price, parent))
+
+    def cancel_orders(self, origin_order_ids: list, order_id_type: OrderIdType = OrderIdType.CLIENT,
+                      max_workers: int = None) -> list:
+        """
+        批量撤单, 撤单请求 ID 由 order_id_generator 自动生成
+        :param origin_order_ids: 被撤订单 ID 列表
+        :param order_id_type: 订单 ID 类型, CLIENT 默认值/代表API订单ID，SNB代表雪盈订单ID
+        :param max_workers: 最大并发数, 默认为 SnbConfig.pool_size
+        :return: 与 origin_order_ids 顺序一致的 BatchResult 列表
+        """
+        request_list = [CancelOrderRequest(account_id=self._config.account, order_id=self.order_id_generator.next_id(),
+                                           origin_order_id=origin_order_id, order_id_type=order_id_type)
+                        for origin_order_id in origin_order_ids]
+        return self.execute_batch(request_list, max_workers)
+
+    def get_open_orders(self, symbol: str = None, security_type: str = "STK,OPT,WAR,IOPT,FUT",
+                        page_size: int = 100, max_workers: int = None) -> list:
+        """
+        查询全部可撤销订单
+        订单列表的 status 参数只支持单个状态, 因此每个未完成状态分别查询, 各状态并发拉取全部页
+        :param symbol: 证券代码, 为空时不过滤
+        :param security_type: 证券类型，多个类型用逗号分隔，参见数据字典：SecurityType
+        :param page_size: 每页大小
+        :param max_workers: 每个状态拉取分页的最大并发数, 默认为 SnbConfig.pool_size
+        :return: 订单列表, 结构同 get_order_list 的 items, 按 snb_order_id 去重
+        """
+        orders, failures = self._query_open_orders(symbol, security_type, page_size, max_workers)
+        if failures:
+            raise failures[0].exception
+        return orders
+
+    def _query_open_orders(self, symbol: str, security_type: str, page_size: int, max_workers: int) -> tuple:
+        """
+        分别查询每个可撤销状态的订单, 单个状态查询失败不影响其它状态
+        :return: (订单列表, 查询失败的 BatchResult 列表), BatchResult.request 为失败状态的 GetOrderListRequest
+        """
+        statuses = [status.value for status in OPEN_ORDER_STATUSES]
+
+        def query(status):
+            try:
+                return self.get_all_orders(page_size, status, security_type, max_workers), None
+            except Exception as e:
+                return [], BatchResult(GetOrderListRequest(self._config.account, 1, page_size, status, security_type),
+                                       exception=e)
+
+        with ThreadPoolExecutor(max_workers=len(statuses), thread_name_prefix="snbpy-open-orders") as executor:
+            results = list(executor.map(query, statuses))
+        failures = [failure for _, failure in results if failure is not None]
+        # 拉取期间状态变化的订单可能出现在两个状态的结果中
+        orders = ItemUtils.distinct([order for items, _ in results for order in items], ItemUtils.order_key)
+        return [order for order in orders
+                if order.get('status') in statuses and (symbol is None or order.get('symbol') == symbol)], failures
+
+    @staticmethod
+    def _iter_pages(fetch_page, size: int):
+        """
+        逐页遍历分页接口, 消费当前页的同时在后台线程预取下一页
+        :param fetch_page: 以页码为参数, 返回 HttpResponse 的函数
+        :param size: 每页大小
+        """
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="snbpy-prefetch")
+        page = 1
+        future = executor.submit(fetch_page, page)
+        try:
+            while future is not None:
+                response = future.result()
+                if not response.succeed():
+                    raise ApiExecuteException(API_EXCEPTION, "query page %s failed: %s" % (page, response.message))
+                items = response.data.get('items') or []
+                future = None
+                if items and page * size < (response.data.get('count') or 0):
+                    page += 1
+                    future = executor.submit(fetch_page, page)
+                for item in items:
+                    yield item
+        finally:
+            if future is not None:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+    def iter_orders(self, size: int = 100, status: str = None, security_type: str = "STK,OPT,WAR,IOPT,FUT"):
+        """
+        惰性遍历全部订单, 自动翻页并预取下一页
+        :param size: 每页大小
+        :param status: 订单状态
+        :param security_type: 证券类型，多个类型用逗号分隔，参见数据字典：SecurityType
+        :return: 订单生成器, 结构同 get_order_list 的 items
+        """
+        return self._iter_pages(lambda page: self.get_order_list(page, size, status, security_type), size)
+
+    def iter_transactions(self, size: int = 100, side=None, order_time_min=None, order_time_max=None):
+        """
+        惰性遍历全部成交, 自动翻页并预取下一页
+        :param size: 每页大小
+        :param side: 交易方向
+        :param order_time_min: 最小下单时间 毫秒时间戳
+        :param order_time_max: 最大下单时间 毫秒时间戳
+        :return: 成交生成器, 结构同 get_transaction_list 的 items
+        """
+        return self._iter_pages(
+            lambda page: self.get_transaction_list(page, size, side, order_time_min, order_time_max), size)
+
+    def _fetch_all_pages(self, fetch_page, size: int, key, max_workers: int = None) -> list:
+        """
+        读取第一页的 count 后并发拉取其余页, 按页序合并并去重
+        :param fetch_page: 以页码为参数, 返回 HttpResponse 的函数
+        :param size: 每页大小
+        :param key: 去重键函数, 拉取期间数据变动导致跨页重复的条目只保留一条
+        :param max_workers: 最大并发数, 默认为 SnbConfig.pool_size
+        """
+
+        def fetch_items(page):
+            response = fetch_page(page)
+            if not response.succeed():
+                raise ApiExecuteException(API_EXCEPTION, "query page %s failed: %s" % (page, response.message))
+            return response
+
+        first = fetch_items(1)
+        items = list(first.data.get('items') or [])
+        count = first.data.get('count') or 0
+        last_page = (count + size - 1) // size
+        if items and last_page > 1:
+            max_workers = min(last_page - 1, max_workers or self._config.pool_size)
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="snbpy-fetch") as executor:
+                for response in executor.map(fetch_items, range(2, last_page + 1)):
+                    items.extend(response.data.get('items') or [])
+                    count = max(count, response.data.get('count') or 0)
+            # 拉取期间新增的数据会把末尾条目挤到后面的页, 按最新的 count 补拉
+            while last_page * size < count:
+                last_page += 1
+                response = fetch_items(last_page)
+                items.extend(response.data.get('items') or [])
+                count = max(count, response.data.get('count') or 0)
+        return ItemUtils.distinct(items, key)
+
+    def get_all_orders(self, size: int = 100, status: str = None, security_type: str = "STK,OPT,WAR,IOPT,FUT",
+                       max_workers: int = None) -> list:
+        """
+        并发拉取全部订单
+        :param size: 每页大小
+        :param status: 订单状态
+        :param security_type: 证券类型，多个类型用逗号分隔，参见数据字典：SecurityType
+        :param max_workers: 最大并发数, 默认为 SnbConfig.pool_size
+        :return: 订单列表, 按 snb_order_id 去重
+        """
+        return self._fetch_all_pages(lambda page: self.get_order_list(page, size, status, security_type), size,
+                                     ItemUtils.order_key, max_workers)
+
+    def get_all_transactions(self, size: int = 100, side=None, order_time_min=None, order_time_max=None,
+                             max_workers: int = None) -> list:
+        """
+        并发拉取全部成交, 一般用于日终对账
+        :param size: 每页大小
+        :param side: 交易方向
+        :param order_time_min: 最小下单时间 毫秒时间戳
+        :param order_time_max: 最大下单时间 毫秒时间戳
+        :param max_workers: 最大并发数, 默认为 SnbConfig.pool_size
+        :return: 成交列表, 按 ItemUtils.transaction_key 去重
+        """
+        return self._fetch_all_pages(
+            lambda page: self.get_transaction_list(page, size, side, order_time_min, order_time_max), size,
+            ItemUtils.transaction_key, max_workers)
+
+    def cancel_all_open(self, symbol: str = None, security_type: str = "STK,OPT,WAR,IOPT,FUT",
+                        max_workers: int = None) -> list:
+        """
+        撤销全部可撤销订单, 一般用于风控触发时的紧急撤单
+        :param symbol: 证券代码, 为空时撤销所有证券的订单
+        :param security_type: 证券类型，多个类型用逗号分隔，参见数据字典：SecurityType
+        :param max_workers: 最大并发数, 默认为 SnbConfig.pool_size
+        某个状态的订单查询失败时不中断撤单, 已查到的订单照常撤销, 失败的查询随撤单结果一起返回
+        :return: BatchResult 列表, 依次为撤单结果和失败的订单查询;
+                 撤单结果的 request 为 CancelOrderRequest, origin_order_id 为被撤订单的雪盈订单 ID;
+                 失败查询的 request 为对应状态的 GetOrderListRequest, exception 为查询异常
+        """
+        orders, failures = self._query_open_orders(symbol, security_type, 100, max_workers)
+        for failure in failures:
+            logger.warning("query open orders failed, orders in this status are not cancelled;; status: %s; "
+                           "error: %s", failure.request.status, failure.exception)
+        logger.info("cancel all open orders;; symbol: %s; security_type: %s; count: %s", symbol, security_type,
+                    len(orders))
+        return self.cancel_orders([order.get('snb_order_id') for order in orders], OrderIdType.SNB,
+                                  max_workers) + failures
+
     def get_transaction_list(self, page=1, size=10, side=None, order_time_min=None, order_time_max=None):
         transaction_request = GetTransactionListRequest(self._config.account, page, size, side, order_time_min,
                                                         order_time_max)
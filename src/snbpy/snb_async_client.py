@@ -0,0 +1,300 @@
+# coding=utf-8
+import asyncio
+import logging
+import time
+
+from snbpy.common.component.metrics import MetricsSink
+from snbpy.common.constant.exceptions import ApiExecuteException, API_EXCEPTION, TokenInvalid, TOKEN_INVALID, \
+    THROTTLED, SnbException
+from snbpy.common.constant.snb_constant import HttpMethod, SecurityType, OrderSide, Currency, TimeInForce, \
+    OrderType, OrderIdType, TradingHours
+from snbpy.common.domain.request import HttpRequest, AccessTokenRequest, GetOrderListRequest, GetPositionListRequest, \
+    GetBalanceRequest, GetSecurityDetailRequest, GetOrderByOrderIdRequest, CancelOrderRequest, PlaceOrderRequest, \
+    GetTokenStatusRequest, GetTransactionListRequest
+from snbpy.common.domain.response import HttpResponse, BatchResult
+from snbpy.common.domain.snb_config import SnbConfig
+from snbpy.common.util.string_utils import StringUtils
+from snbpy.snb_api_client import SnbApiClient, TradeInterface
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover
+    aiohttp = None
+
+logger = logging.getLogger("snbpy")
+
+
+class AsyncSnbApiClient(SnbApiClient):
+    """
+    异步 API Client 框架, 校验/解析流程与 SnbApiClient 一致, _do_execute 为协程
+    支持 metrics_sink; 请求合并(set_coalescing)、hedger、rate_limiter、priority_scheduler 基于线程实现,
+    只对同步 client 生效, 在异步 client 上开启时抛出 ValueError
+    """
+
+    @property
+    def hedger(self):
+        return None
+
+    @hedger.setter
+    def hedger(self, hedger):
+        if hedger is not None:
+            raise ValueError("hedger is only supported by SnbHttpClient")
+
+    @property
+    def rate_limiter(self):
+        return None
+
+    @rate_limiter.setter
+    def rate_limiter(self, rate_limiter):
+        if rate_limiter is not None:
+            raise ValueError("rate_limiter is only supported by SnbHttpClient")
+
+    @property
+    def priority_scheduler(self):
+        return None
+
+    @priority_scheduler.setter
+    def priority_scheduler(self, priority_scheduler):
+        if priority_scheduler is not None:
+            raise ValueError("priority_scheduler is only supported by SnbHttpClient")
+
+    def set_coalescing(self, request_class, enabled: bool = True):
+        if enabled:
+            raise ValueError("request coalescing is only supported by SnbHttpClient")
+
+    async def execute(self, request: HttpRequest) -> HttpResponse:
+        if self._metrics_sink is not None:
+            return await self._execute_with_metrics(request, self._metrics_sink)
+        headers = self._pre_execute(request)
+        return await self._send_once(request, self._prepare_param(request), headers)
+
+    async def _execute_with_metrics(self, request: HttpRequest, sink: MetricsSink) -> HttpResponse:
+        timings = {}
+        result_code = None
+        start = time.perf_counter()
+        try:
+            headers = self._pre_execute(request)
+            verified = time.perf_counter()
+            timings["verify"] = verified - start
+            params = self._prepare_param(request)
+            timings["prepare"] = time.perf_counter() - verified
+            response = await self._send_once(request, params, headers, timings)
+            result_code = response.result_code
+            return response
+        except SnbException as e:
+            result_code = e.code
+            raise
+        except Exception as e:
+            result_code = e.__class__.__name__
+            raise
+        finally:
+            timings["total"] = time.perf_counter() - start
+            sink.record(request.__class__.__name__, result_code, timings)
+
+    async def _send_once(self, request: HttpRequest, params: dict, headers: dict,
+                         timings: dict = None) -> HttpResponse:
+        start = time.perf_counter() if timings is not None else 0
+        try:
+            response_str = await self._do_execute(request.url, params, headers, self._config.timeout,
+                                                  request.method)
+        except (TokenInvalid, ApiExecuteException):
+            raise
+        except Exception as e:
+            logger.error("http excepiton;; %s", e)
+            raise ApiExecuteException(API_EXCEPTION, "http exception" + str(e))
+        if timings is None:
+            return self._parse_response(response_str)
+        received = time.perf_counter()
+        timings["network"] = received - start
+        response = self._parse_response(response_str)
+        timings["parse"] = time.perf_counter() - received
+        return response
+
+    async def _execute_quietly(self, request: HttpRequest, semaphore: asyncio.Semaphore) -> BatchResult:
+        async with semaphore:
+            try:
+                return BatchResult(request, response=await self.execute(request))
+            except Exception as e:
+                logger.warning("batch request failed;; request: %s; url: %s; %s", request.__class__, request.url, e)
+                return BatchResult(request, exception=e)
+
+    async def execute_batch(self, request_list: list, max_workers: int = None) -> list:
+        """
+        并发执行一批请求, 单个请求失败不影响其他请求
+        :param request_list: 请求对象列表
+        :param max_workers: 最大并发数, 默认为 SnbConfig.pool_size
+        :return: 与 request_list 顺序一致的 BatchResult 列表
+        """
+        semaphore = asyncio.Semaphore(max_workers or self._config.pool_size)
+        return list(await asyncio.gather(*[self._execute_quietly(request, semaphore) for request in request_list]))
+
+
+class AsyncSnbHttpClient(AsyncSnbApiClient, TradeInterface):
+    """
+    基于 aiohttp 的异步 Client, 需要安装 aiohttp: pip install snbpy[async]
+    所有 TradeInterface 方法均为协程, 连接池大小由 SnbConfig.pool_size 控制
+    auto_login 时在 token 缺失/过期或服务端报告 token 失效时自动登录并重试一次
+
+    async with AsyncSnbHttpClient(config) as client:
+        await client.login()
+        order_list_response = await client.get_order_list()
+    """
+
+    def __init__(self, config: SnbConfig):
+        super().__init__(config)
+        self._session = None
+        self._login_lock = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            if aiohttp is None:
+                raise ImportError("aiohttp is required by AsyncSnbHttpClient, install it with: pip install aiohttp")
+            connector = aiohttp.TCPConnector(limit=self._config.pool_size)
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    async def refresh_token(self, stale_token: str = None):
+        """
+        重新登录, 同一时刻只有一个登录请求, 参见 SnbHttpClient.refresh_token
+        """
+        if self._login_lock is None:
+            self._login_lock = asyncio.Lock()
+        async with self._login_lock:
+            token, token_expire_time = self._token, self._token_expire_time
+            if StringUtils.is_not_blank(token) and token != stale_token \
+                    and (token_expire_time or 0) > time.time() * 1000:
+                return
+            await self.login()
+
+    async def execute(self, request: HttpRequest) -> HttpResponse:
+        if not self._config.auto_login or request.auth() <= 0:
+            return await super().execute(request)
+        token = self._token
+        if StringUtils.is_blank(token) or (self._token_expire_time or 0) < time.time() * 1000:
+            await self.refresh_token(token)
+            token = self._token
+        try:
+            return await super().execute(request)
+        except TokenInvalid as e:
+            logger.warning("token invalid, login and retry;; code: %s; msg: %s", e.code, e.msg)
+            await self.refresh_token(token)
+            return await super().execute(request)
+
+    @staticmethod
+    def _encode_params(params: dict) -> dict:
+        """
+        与 requests 的编码保持一致: 丢弃 None, 其余值转为字符串, 已编码的请求体原样返回
+        """
+        if isinstance(params, bytes):
+            return params
+        return {k: str(v) for k, v in params.items() if v is not None}
+
+    async def _do_execute(self, url: str, params: dict, header: dict, timeout: int, method: HttpMethod) -> bytes:
+        request_path = "%s://%s:%s/%s" % (self._config.schema, self._config.snb_server, self._config.snb_port, url)
+        logger.debug("do execute;; url: %s, params: %s, header: %s, timeout: %s, method: %s", url, params, header,
+                     timeout, method)
+        session = self._get_session()
+        params = self._encode_params(params)
+        if isinstance(params, bytes):
+            header['Content-Type'] = 'application/x-www-form-urlencoded'
+        client_timeout = aiohttp.ClientTimeout(total=timeout)
+        try:
+            if method == HttpMethod.GET:
+                context = session.get(request_path, headers=header, params=params, timeout=client_timeout)
+            elif method == HttpMethod.POST:
+                context = session.post(request_path, headers=header, data=params, timeout=client_timeout)
+            elif method == HttpMethod.DELETE:
+                context = session.delete(request_path, headers=header, params=params, timeout=client_timeout)
+            else:
+                return None
+            async with context as resp:
+                status, body = resp.status, await resp.read()
+        except Exception as e:
+            logger.error("do execute with exception;; %s", e)
+            raise e
+        if status == 401:
+            raise TokenInvalid(TOKEN_INVALID, "token invalid")
+        if status == 429:
+            raise ApiExecuteException(THROTTLED, "http status 429")
+        if status >= 500:
+            # 服务端错误, 响应体不是 result_code 结构
+            raise ApiExecuteException(API_EXCEPTION, "http status %d" % status)
+        return body
+
+    async def login(self) -> HttpResponse:
+        login_request = AccessTokenRequest(self._config.account, self._config.key)
+        logger.debug("login request: %s", login_request)
+        response = await self.execute(login_request)
+        logger.debug("login result: %s", response)
+        if not response.succeed():
+            logger.warning("login failed %s", response)
+            raise ApiExecuteException(API_EXCEPTION, "login failed")
+        # _set_token 会持有文件锁写缓存文件, 放到线程池执行以免阻塞事件循环
+        await asyncio.get_running_loop().run_in_executor(None, self._set_token, response.data.get('access_token'),
+                                                         response.data.get('expiry_time'))
+        return response
+
+    async def get_token_status(self) -> HttpResponse:
+        token_request = GetTokenStatusRequest(self._config.account, self._token)
+        return await self.execute(token_request)
+
+    async def get_order_list(self, page: int = 1, size: int = 10, status: str = None,
+                             security_type: str = "STK,OPT,WAR,IOPT,FUT") -> HttpResponse:
+        order_list_request = GetOrderListRequest(self._config.account, page, size, status, security_type)
+        return await self.execute(order_list_request)
+
+    async def get_position_list(self, security_type: str = "STK,OPT,WAR,IOPT,FUT") -> HttpResponse:
+        position_list_request = GetPositionListRequest(self._config.account, security_type)
+        return await self.execute(position_list_request)
+
+    async def get_balance(self) -> HttpResponse:
+        balance_request = GetBalanceRequest(self._config.account)
+        return await self.execute(balance_request)
+
+    async def get_security_detail(self, symbol: str) -> HttpResponse:
+        security_detail_request = GetSecurityDetailRequest(self._config.account, symbol)
+        return await self.execute(security_detail_request)
+
+    async def get_order_by_id(self, order_id: str) -> HttpResponse:
+        order_request = GetOrderByOrderIdRequest(account_id=self._config.account, order_id=order_id)
+        return await self.execute(order_request)
+
+    async def place_order(self, order_id: str, security_type: SecurityType, symbol: str, exchange: str,
+                          side: OrderSide, currency: Currency, quantity: int, price: float = 0,
+                          order_type: OrderType = OrderType.LIMIT, tif: TimeInForce = TimeInForce.DAY,
+                          force_only_rth: bool = True, stop_price: float = 0, parent: str = None,
+                          order_id_type: OrderIdType = OrderIdType.CLIENT,
+                          trading_hours: TradingHours = None) -> HttpResponse:
+        place_order_request = PlaceOrderRequest(self._config.account, order_id, security_type, symbol, exchange,
+                                                side, currency, quantity, price, order_type, tif, force_only_rth,
+                                                stop_price, parent, order_id_type, trading_hours)
+        return await self.execute(place_order_request)
+
+    async def place_orders(self, request_list: list, max_workers: int = None) -> list:
+        """
+        批量下单, 参见 SnbHttpClient.place_orders
+        """
+        return await self.execute_batch(request_list, max_workers)
+
+    async def cancel_order(self, order_id: str, origin_order_id: str,
+                           order_id_type: OrderIdType = OrderIdType.CLIENT) -> HttpResponse:
+        cancel_order_request = CancelOrderRequest(account_id=self._config.account, origin_order_id=origin_order_id,
+                                                  order_id=order_id, order_id_type=order_id_type)
+        return await self.execute(cancel_order_request)
+
+    async def get_transaction_list(self, page=1, size=10, side=None, order_time_min=None,
+                                   order_time_max=None) -> HttpResponse:
+        transaction_request = GetTransactionListRequest(self._config.account, page, size, side, order_time_min,
+                                                        order_time_max)
+        return await self.execute(transaction_request)
@@ -0,0 +1,117 @@
+# coding=utf-8
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from http.cookiejar import DefaultCookiePolicy
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from snbpy.common.constant.exceptions import ConfigException, CONFIGURATION_IS_INVALID
+from snbpy.common.domain.response import BatchResult
+from snbpy.snb_api_client import SnbHttpClient
+
+logger = logging.getLogger("snbpy")
+
+
+class SnbClientManager(object):
+    """
+    多账户 Client 管理, 所有账户共用一个 requests.Session 及其连接池, 每个账户有独立的 token
+    账户维度的查询可并发发往全部账户, 结果按账户返回
+
+    with SnbClientManager([config1, config2], pool_size=32) as manager:
+        manager.login()
+        balances = manager.get_balance()
+        balances["U123"].response.data
+    """
+
+    def __init__(self, configs: list, pool_size: int = None, max_workers: int = None):
+        """
+        :param configs: 各账户的 SnbConfig, 账户不能重复
+        :param pool_size: 共享连接池大小, 默认为各配置中最大的 pool_size
+        :param max_workers: 并发查询的线程数, 默认为 pool_size
+        """
+        if not configs:
+            raise ConfigException(CONFIGURATION_IS_INVALID, "configs is empty")
+        self._pool_size = pool_size or max(config.pool_size for config in configs)
+        self._max_workers = max_workers or self._pool_size
+        self._session = requests.session()
+        # token 通过每个请求的 Cookie 头传递, 共享的 session 不保存服务端下发的 cookie, 避免在账户间串用
+        self._session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self._pool_size)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        self._clients = {}
+        for config in configs:
+            if config.account in self._clients:
+                raise ConfigException(CONFIGURATION_IS_INVALID, "duplicate account: %s" % config.account)
+            self._clients[config.account] = self._create_client(config)
+
+    def _create_client(self, config) -> SnbHttpClient:
+        return SnbHttpClient(config, session=self._session)
+
+    @property
+    def session(self) -> requests.Session:
+        return self._session
+
+    @property
+    def accounts(self) -> list:
+        return list(self._clients)
+
+    def client(self, account: str) -> SnbHttpClient:
+        return self._clients[account]
+
+    def __getitem__(self, account: str) -> SnbHttpClient:
+        return self._clients[account]
+
+    def __len__(self):
+        return len(self._clients)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """
+        停止各账户的后台刷新 token 并关闭共享连接池
+        """
+        for client in self._clients.values():
+            client.close()
+        self._session.close()
+
+    def execute_all(self, func, accounts: list = None, max_workers: int = None) -> dict:
+        """
+        对多个账户并发执行 func(client), 单个账户失败不影响其他账户
+        :param func: 以 client 为参数, 返回 HttpResponse 的函数
+        :param accounts: 账户列表, 默认为全部账户
+        :param max_workers: 最大并发数, 默认为构造时的 max_workers
+        :return: 账户 -> BatchResult, BatchResult.request 为账户
+        """
+        accounts = list(accounts) if accounts is not None else list(self._clients)
+
+        def call(account):
+            try:
+                return BatchResult(account, response=func(self._clients[account]))
+            except Exception as e:
+                logger.warning("account request failed;; account: %s; %s", account, e)
+                return BatchResult(account, exception=e)
+
+        max_workers = min(len(accounts), max_workers or self._max_workers)
+        if max_workers <= 1:
+            return {account: call(account) for account in accounts}
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="snbpy-accounts") as executor:
+            return dict(zip(accounts, executor.map(call, accounts)))
+
+    def login(self, accounts: list = None) -> dict:
+        return self.execute_all(lambda client: client.login(), accounts)
+
+    def get_balance(self, accounts: list = None) -> dict:
+        return self.execute_all(lambda client: client.get_balance(), accounts)
+
+    def get_position_list(self, security_type: str = "STK,OPT,WAR,IOPT,FUT", accounts: list = None) -> dict:
+        return self.execute_all(lambda client: client.get_position_list(security_type), accounts)
+
+    def get_order_list(self, page: int = 1, size: int = 10, status: str = None,
+                       security_type: str = "STK,OPT,WAR,IOPT,FUT", accounts: list = None) -> dict:
+        return self.execute_all(lambda client: client.get_order_list(page, size, status, security_type), accounts)
@@ -0,0 +1,58 @@
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+
+from snbpy.common.component.file_cache import FileCache
+
+
+class TestFileCache(TestCase):
+    def setUp(self) -> None:
+        self.dir = tempfile.TemporaryDirectory()
+        self.cache = FileCache(self.dir.name, "U123")
+
+    def tearDown(self) -> None:
+        self.dir.cleanup()
+
+    def test_token(self):
+        self.assertIsNone(self.cache.get_token())
+        self.cache.put_token("token", 1711451636344)
+        self.assertEqual(FileCache(self.dir.name, "U123").get_token(), ("token", 1711451636344))
+        self.assertIsNone(FileCache(self.dir.name, "U456").get_token())
+
+    def test_security_details(self):
+        self.cache.put_security_detail("00700", "60000", "", {"symbol": "00700"}, time.time() + 60)
+        self.cache.put_security_detail("AAPL", "60000", "", {"symbol": "AAPL"}, time.time() - 1)
+        self.assertEqual(list(self.cache.get_security_details()), ["00700"])
+        self.cache.remove_security_detail("00700")
+        self.assertEqual(self.cache.get_security_details(), {})
+
+    def test_concurrent_update(self):
+        def put(i):
+            FileCache(self.dir.name, "U123").put_security_detail(str(i), "60000", "", {}, None)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(put, range(50)))
+        self.assertEqual(len(self.cache.get_security_details()), 50)
+        self.assertEqual([name for name in os.listdir(self.dir.name) if name.startswith(".snbpy_")], [])
+
+    def test_broken_file(self):
+        with open(self.cache.file, "w") as f:
+            f.write("{broken")
+        self.assertIsNone(self.cache.get_token())
+        self.cache.put_token("token", 1)
+        self.assertEqual(self.cache.get_token(), ("token", 1))
+
+    def test_unwritable_cache_path(self):
+        blocker = os.path.join(self.dir.name, "blocker")
+        with open(blocker, "w") as f:
+            f.write("")
+        cache = FileCache(os.path.join(blocker, "cache"), "U123")
+        self.assertIsNone(cache.get_token())
+        with self.assertLogs("snbpy", level="WARNING"):
+            cache.put_token("token", 1)
+        self.assertTrue(cache.disabled)
+        self.assertIsNone(cache.get_token())
+        cache.put_security_detail("00700", "60000", "", {}, None)
+        self.assertEqual(cache.get_security_details(), {})
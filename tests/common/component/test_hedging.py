@@ -0,0 +1,134 @@
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+
+from snbpy.common.component.hedging import RequestHedger
+from snbpy.common.constant.exceptions import ApiExecuteException, OVERLOADED, RATE_LIMITED
+
+
+def slow_first(result="ok", delay=0.5):
+    """
+    第一次调用耗时 delay 秒, 之后立即返回 调用序号:result
+    """
+    counter = itertools.count(1)
+
+    def func():
+        index = next(counter)
+        if index == 1:
+            time.sleep(delay)
+        return "%d:%s" % (index, result)
+
+    return func
+
+
+class TestRequestHedger(TestCase):
+    def setUp(self) -> None:
+        self.hedger = RequestHedger(min_delay=0.01, max_delay=0.05, min_samples=5, window=16)
+
+    def tearDown(self) -> None:
+        self.hedger.close()
+
+    def test_fast_request_not_hedged(self):
+        self.assertEqual(self.hedger.call("a", lambda: "ok"), "ok")
+        self.assertEqual(self.hedger.stats()["hedged"], 0)
+
+    def test_hedge_wins(self):
+        start = time.perf_counter()
+        self.assertEqual(self.hedger.call("a", slow_first()), "2:ok")
+        self.assertLess(time.perf_counter() - start, 0.3)
+        self.assertEqual(self.hedger.stats()["hedge_wins"], 1)
+
+    def test_failed_attempt_falls_back(self):
+        counter = itertools.count(1)
+
+        def func():
+            if next(counter) == 1:
+                time.sleep(0.1)
+                return "primary"
+            raise ValueError("boom")
+
+        self.assertEqual(self.hedger.call("a", func), "primary")
+
+        def failing():
+            time.sleep(0.06)
+            raise KeyError("fail")
+
+        self.assertRaises(KeyError, self.hedger.call, "a", failing)
+
+    def test_primary_not_queued(self):
+        hedger = RequestHedger(min_delay=0.5, max_delay=0.5, max_workers=2)
+        try:
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=16) as executor:
+                results = list(executor.map(lambda _: hedger.call("a", lambda: time.sleep(0.05) or "ok"), range(16)))
+            self.assertEqual(results, ["ok"] * 16)
+            # 第一次请求不经过对冲线程池, 16 个并发调用不会被 max_workers 限制为 8 轮
+            self.assertLess(time.perf_counter() - start, 0.3)
+            self.assertEqual(hedger.stats()["hedged"], 0)
+        finally:
+            hedger.close()
+
+    def test_primary_threads_reused(self):
+        hedger = RequestHedger(min_delay=0.5, max_delay=0.5, primary_workers=2)
+        threads = set()
+
+        def func():
+            thread = threading.current_thread()
+            if thread.name.startswith("snbpy-hedge-primary"):
+                threads.add(thread)
+            time.sleep(0.02)
+            return "ok"
+
+        try:
+            for _ in range(5):
+                hedger.call("a", func)
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                results = list(executor.map(lambda _: hedger.call("a", func), range(16)))
+            self.assertEqual(results, ["ok"] * 16)
+            # 线程池已满时在调用线程执行, 第一次请求最多使用 primary_workers 个线程
+            self.assertEqual(len(threads), 2)
+        finally:
+            hedger.close()
+
+    def test_hedge_not_sent_refunded(self):
+        hedger = RequestHedger(min_delay=0.01, max_delay=0.01, budget_ratio=0, max_budget=1)
+        try:
+            for code in (OVERLOADED, RATE_LIMITED):
+                def hedge_func():
+                    raise ApiExecuteException(code, "no free slot")
+
+                self.assertEqual(hedger.call("a", slow_first(delay=0.05), hedge_func), "1:ok")
+                self.assertEqual(hedger.stats()["hedged"], 0)
+                self.assertEqual(hedger.stats()["budget"], 1)
+            self.assertEqual(hedger.call("a", slow_first(delay=0.05)), "2:ok")
+            self.assertEqual(hedger.stats()["hedged"], 1)
+            self.assertEqual(hedger.stats()["budget"], 0)
+        finally:
+            hedger.close()
+
+    def test_hedge_func(self):
+        def hedge_func():
+            raise RuntimeError("no free connection")
+
+        self.assertEqual(self.hedger.call("a", slow_first(delay=0.1), hedge_func), "1:ok")
+        self.assertEqual(self.hedger.stats()["hedge_wins"], 0)
+        self.assertEqual(self.hedger.call("a", slow_first(delay=0.1), lambda: "hedge"), "hedge")
+
+    def test_budget(self):
+        hedger = RequestHedger(min_delay=0.01, max_delay=0.01, budget_ratio=0, max_budget=1)
+        try:
+            hedger.call("a", slow_first(delay=0.05))
+            hedger.call("a", slow_first(delay=0.05))
+            self.assertEqual(hedger.stats()["hedged"], 1)
+        finally:
+            hedger.close()
+
+    def test_delay_follows_quantile(self):
+        self.assertEqual(self.hedger.delay("a"), 0.05)
+        for _ in range(5):
+            self.hedger.call("a", lambda: time.sleep(0.02))
+        self.assertGreaterEqual(self.hedger.delay("a"), 0.02)
+        self.assertLess(self.hedger.delay("a"), 0.05)
+        self.assertEqual(self.hedger.delay("b"), 0.05)
@@ -0,0 +1,36 @@
+import time
+from unittest import TestCase
+
+from snbpy.common.component.local_cache import LocalCache
+
+
+class TestLocalCache(TestCase):
+    def test_lru(self):
+        cache = LocalCache(max_size=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.put("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.get("c"), 3)
+        self.assertEqual(cache.evictions, 1)
+        self.assertEqual(len(cache), 2)
+
+    def test_ttl(self):
+        cache = LocalCache(ttl=60)
+        cache.put("a", 1, ttl=0.01)
+        cache.put("b", 2)
+        time.sleep(0.02)
+        self.assertNotIn("a", cache)
+        self.assertEqual(cache.get("a", "default"), "default")
+        self.assertEqual(cache.get("b"), 2)
+
+    def test_stats(self):
+        cache = LocalCache()
+        cache.put("a", 1)
+        cache.get("a")
+        cache.get("b")
+        self.assertTrue(cache.invalidate("a"))
+        self.assertFalse(cache.invalidate("a"))
+        self.assertEqual(cache.stats(), {"size": 0, "hits": 1, "misses": 1, "evictions": 0, "hit_rate": 0.5})
@@ -0,0 +1,50 @@
+from unittest import TestCase
+from urllib.request import urlopen
+
+from snbpy.common.component.metrics import MetricsSink, MetricsRecorder, CallbackMetricsSink, PrometheusExporter, Histogram
+
+
+class TestMetrics(TestCase):
+    def test_histogram(self):
+        histogram = Histogram((0.01, 0.1, 1.0))
+        for value in (0.005, 0.05, 0.05, 0.5, 5):
+            histogram.observe(value)
+        self.assertEqual(histogram.cumulative(), [(0.01, 1), (0.1, 3), (1.0, 4), (float("inf"), 5)])
+        self.assertEqual(histogram.quantile(0.5), 0.1)
+        self.assertEqual(histogram.quantile(1), 1.0)
+        self.assertIsNone(Histogram().quantile(0.5))
+
+    def test_recorder(self):
+        recorder = MetricsRecorder()
+        recorder.record("GetBalanceRequest", "60000", {"network": 0.02, "total": 0.03})
+        recorder.record("GetBalanceRequest", "002001", {"total": 0.2})
+        snapshot = recorder.snapshot()["GetBalanceRequest"]
+        self.assertEqual(snapshot["count"], 2)
+        self.assertEqual(snapshot["result_codes"], {"60000": 1, "002001": 1})
+        self.assertEqual(snapshot["latency"]["network"]["count"], 1)
+        self.assertEqual(recorder.quantile("GetBalanceRequest", 0.99), 0.25)
+        text = recorder.render_prometheus()
+        self.assertIn('snbpy_requests_total{endpoint="GetBalanceRequest",result_code="60000"} 1', text)
+        self.assertIn('snbpy_request_duration_seconds_count{endpoint="GetBalanceRequest",phase="total"} 2', text)
+
+    def test_callback(self):
+        records = []
+        CallbackMetricsSink(lambda *args: records.append(args)).record("a", "60000", {})
+        CallbackMetricsSink(lambda *args: 1 / 0).record("a", "60000", {})
+        self.assertEqual(records, [("a", "60000", {})])
+
+    def test_exporter(self):
+        recorder = MetricsRecorder()
+        recorder.record("GetBalanceRequest", "60000", {"total": 0.03})
+        exporter = PrometheusExporter(recorder, port=0)
+        exporter.start()
+        try:
+            body = urlopen("http://127.0.0.1:%d/metrics" % exporter.port).read().decode("utf-8")
+            host = exporter._server.server_address[0]
+        finally:
+            exporter.stop()
+        self.assertEqual(body, recorder.render_prometheus())
+        self.assertEqual(host, "127.0.0.1")
+
+    def test_sink_is_abstract(self):
+        self.assertRaises(TypeError, MetricsSink)
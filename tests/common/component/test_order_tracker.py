@@ -0,0 +1,115 @@
+from unittest import TestCase
+
+from snbpy.common.component.order_tracker import OrderTracker
+from snbpy.common.constant.snb_constant import SecurityType, OrderSide, Currency
+from snbpy.simulator import SnbSimulator
+from snbpy.snb_api_client import SnbHttpClient
+from tests.test_snb_http_client import build_config
+
+
+class TestOrderTracker(TestCase):
+    def setUp(self) -> None:
+        self.simulator = SnbSimulator(port=0)
+        self.simulator.start()
+        config = build_config()
+        config.snb_server = "127.0.0.1"
+        config.snb_port = str(self.simulator.port)
+        self.client = SnbHttpClient(config)
+        self.client.login()
+        self.tracker = OrderTracker(self.client, page_size=2)
+        self.events = []
+        self.tracker.add_listener(lambda order, changes: self.events.append((order["id"], changes)))
+
+    def tearDown(self) -> None:
+        self.client.close()
+        self.simulator.stop()
+
+    def place(self, order_id):
+        self.client.place_order(order_id, SecurityType.STK, "00700", "HKEX", OrderSide.BUY, Currency.HKD, 100, 10.0)
+
+    def test_refresh(self):
+        for order_id in ("1", "2", "3"):
+            self.place(order_id)
+        self.assertEqual(len(self.tracker.refresh()), 3)
+        self.assertEqual(self.tracker.get("1")["status"], "REPORTED")
+        snb_order_id = self.tracker.get("2")["snb_order_id"]
+        self.assertEqual(self.tracker.get_by_snb_order_id(snb_order_id)["id"], "2")
+        self.assertEqual(set(self.events[0][1]), {"status", "filled_quantity", "average_price"})
+
+        del self.events[:]
+        self.assertEqual(self.tracker.refresh(), [])
+        self.assertEqual(self.events, [])
+
+        self.simulator.fill_order("1", 40, 9.5)
+        self.simulator.fill_order("2")
+        self.client.cancel_order("c3", "3")
+        before = self.simulator.request_count("get_order")
+        self.tracker.refresh()
+        self.assertEqual(sorted(self.events), [
+            ("1", {"status": ("REPORTED", "PART_CONCLUDED"), "filled_quantity": (0, 40.0),
+                   "average_price": (0.0, 9.5)}),
+            ("2", {"status": ("REPORTED", "CONCLUDED"), "filled_quantity": (0, 100.0),
+                   "average_price": (0.0, 10.0)}),
+            ("3", {"status": ("REPORTED", "WITHDRAWED")})])
+        # 只对离开未完成状态的订单查询最终状态
+        self.assertEqual(self.simulator.request_count("get_order") - before, 2)
+        self.assertEqual([order["id"] for order in self.tracker.open_orders()], ["1"])
+        self.assertEqual(self.tracker.clear_final(), 2)
+        self.assertIsNone(self.tracker.get("2"))
+        self.assertEqual(len(self.tracker), 1)
+
+    def test_incomplete_listing(self):
+        tracker = OrderTracker(self.client, page_size=1, max_pages=1)
+        self.place("1")
+        self.place("2")
+        tracker.refresh()
+        self.assertEqual(len(tracker), 1)
+        self.client.cancel_order("c2", "2")
+        self.place("3")
+        # 未完成订单超过 max_pages, 无法判断 2 是否已完成, 不查询
+        tracker.refresh()
+        self.assertEqual(self.simulator.request_count("get_order"), 0)
+        self.assertEqual(tracker.get("2")["status"], "REPORTED")
+        self.client.cancel_order("c1", "1")
+        tracker.refresh()
+        self.assertEqual(self.simulator.request_count("get_order"), 1)
+        self.assertEqual(tracker.get("2")["status"], "WITHDRAWED")
+
+    def test_order_without_client_id(self):
+        self.place("1")
+        external = self.simulator.add_order()
+        self.tracker.refresh()
+        self.assertEqual(len(self.tracker), 2)
+        self.simulator.fill_order(external["snb_order_id"])
+        self.client.cancel_order("c1", "1")
+        del self.events[:]
+        self.tracker.refresh()
+        # get_order_by_id 只支持客户端订单 ID, 没有 id 的订单只标记 departed, 不查询
+        self.assertEqual(self.simulator.request_count("get_order"), 1)
+        self.assertEqual(sorted(self.events), [("", {"departed": (None, True)}),
+                                               ("1", {"status": ("REPORTED", "WITHDRAWED")})])
+        self.assertEqual(self.tracker.open_orders(), [])
+        self.tracker.refresh()
+        self.assertEqual(self.simulator.request_count("get_order"), 1)
+        self.assertEqual(self.tracker.clear_final(), 2)
+
+    def test_pending_cancel(self):
+        self.simulator.cancel_delay = 60
+        self.place("1")
+        self.tracker.refresh()
+        self.client.cancel_order("c1", "1")
+        del self.events[:]
+        self.tracker.refresh()
+        self.assertEqual(self.events, [("1", {"status": ("REPORTED", "WAIT_WITHDRAW")})])
+        # 撤单中的订单仍是未完成订单, 之后的成交与最终状态都会同步
+        self.assertEqual([order["id"] for order in self.tracker.open_orders()], ["1"])
+        self.simulator.fill_order("1", 40)
+        self.tracker.refresh()
+        self.assertEqual(self.events[-1], ("1", {"status": ("WAIT_WITHDRAW", "PART_WAIT_WITHDRAW"),
+                                                 "filled_quantity": (0, 40.0), "average_price": (0.0, 10.0)}))
+        self.simulator.fill_order("1")
+        self.tracker.refresh()
+        self.assertEqual(self.events[-1], ("1", {"status": ("PART_WAIT_WITHDRAW", "CONCLUDED"),
+                                                 "filled_quantity": (40.0, 100.0)}))
+        self.assertEqual(self.tracker.open_orders(), [])
+        self.assertEqual(self.simulator.request_count("get_order"), 1)
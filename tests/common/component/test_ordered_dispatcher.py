@@ -0,0 +1,68 @@
+import threading
+import time
+from unittest import TestCase
+
+from snbpy.common.component.ordered_dispatcher import OrderedDispatcher
+from snbpy.common.constant.exceptions import ApiExecuteException
+from snbpy.common.constant.snb_constant import SecurityType, OrderSide, Currency, HttpMethod
+from snbpy.common.domain.request import PlaceOrderRequest, CancelOrderRequest, GetBalanceRequest
+from tests.test_snb_http_client import FakeHttpClient, build_config
+
+
+def place(order_id):
+    return PlaceOrderRequest("U123", order_id, SecurityType.STK, "00700", "HKEX", OrderSide.BUY, Currency.HKD, 100, 1)
+
+
+class TestOrderedDispatcher(TestCase):
+    def setUp(self) -> None:
+        self.log = []
+        self.lock = threading.Lock()
+        self.delays = {}
+
+        def handler(url, params, method):
+            name = "%s %s" % (method.value, url)
+            with self.lock:
+                self.log.append(("start", name))
+            time.sleep(self.delays.get(name, 0))
+            with self.lock:
+                self.log.append(("end", name))
+            if url == "order/bad":
+                return ValueError("boom")
+            return {"url": url}
+
+        self.client = FakeHttpClient(build_config(), handler)
+        self.client.login()
+
+    def index(self, event, name):
+        return self.log.index((event, "%s %s" % (name[0].value, name[1])))
+
+    def test_same_key_in_order(self):
+        self.delays["POST order/1"] = 0.1
+        with OrderedDispatcher(self.client, max_workers=4) as dispatcher:
+            futures = [dispatcher.submit(place("1")), dispatcher.submit(CancelOrderRequest("U123", "c1", "1")),
+                       dispatcher.submit(place("2"))]
+        self.assertTrue(all(future.result().succeed() for future in futures))
+        self.assertLess(self.index("end", (HttpMethod.POST, "order/1")),
+                        self.index("start", (HttpMethod.DELETE, "order/1")))
+        # 不同 key 并行执行
+        self.assertLess(self.index("start", (HttpMethod.POST, "order/2")),
+                        self.index("end", (HttpMethod.POST, "order/1")))
+
+    def test_cancel_priority(self):
+        self.delays["GET funds"] = 0.1
+        dispatcher = OrderedDispatcher(self.client, max_workers=1)
+        dispatcher.submit(GetBalanceRequest("U123"))
+        time.sleep(0.02)
+        dispatcher.submit(GetBalanceRequest("U123"), key="query")
+        dispatcher.submit(place("3"))
+        dispatcher.submit(CancelOrderRequest("U123", "c2", "2"))
+        dispatcher.shutdown()
+        self.assertEqual([name for event, name in self.log if event == "start"],
+                         ["GET funds", "DELETE order/2", "POST order/3", "GET funds"])
+
+    def test_exception_and_shutdown(self):
+        dispatcher = OrderedDispatcher(self.client, max_workers=2)
+        future = dispatcher.submit(place("bad"))
+        self.assertRaises(ApiExecuteException, future.result)
+        dispatcher.shutdown()
+        self.assertRaises(RuntimeError, dispatcher.submit, place("4"))
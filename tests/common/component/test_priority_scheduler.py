@@ -0,0 +1,75 @@
+import threading
+import time
+from unittest import TestCase
+
+from snbpy.common.component.priority_scheduler import PriorityScheduler, CANCEL, PLACE, ORDER_STATUS, ACCOUNT, \
+    HISTORY
+from snbpy.common.constant.exceptions import ApiExecuteException, OVERLOADED
+from snbpy.common.constant.snb_constant import SecurityType, OrderSide, Currency
+from snbpy.common.domain.request import PlaceOrderRequest, CancelOrderRequest, GetBalanceRequest, \
+    GetTransactionListRequest, GetOrderByOrderIdRequest, AccessTokenRequest, GetPositionListRequest
+
+PLACE_REQUEST = PlaceOrderRequest("U123", "1", SecurityType.STK, "00700", "HKEX", OrderSide.BUY, Currency.HKD, 100)
+CANCEL_REQUEST = CancelOrderRequest("U123", "c1", "1")
+HISTORY_REQUEST = GetTransactionListRequest("U123")
+ACCOUNT_REQUEST = GetBalanceRequest("U123")
+
+
+class TestPriorityScheduler(TestCase):
+    def test_priority(self):
+        scheduler = PriorityScheduler(4)
+        self.assertEqual([scheduler.priority(request) for request in (
+            CANCEL_REQUEST, PLACE_REQUEST, GetOrderByOrderIdRequest("U123", "1"), ACCOUNT_REQUEST,
+            HISTORY_REQUEST)], [CANCEL, PLACE, ORDER_STATUS, ACCOUNT, HISTORY])
+        self.assertIsNone(scheduler.priority(AccessTokenRequest("U123", "key")))
+        scheduler.set_priority(GetPositionListRequest, ORDER_STATUS)
+        self.assertEqual(scheduler.priority(GetPositionListRequest("U123")), ORDER_STATUS)
+
+    def test_reserved_slots(self):
+        scheduler = PriorityScheduler(4, max_wait={HISTORY: 0.02, PLACE: 0.02})
+        slots = [scheduler.acquire(HISTORY_REQUEST), scheduler.acquire(HISTORY_REQUEST)]
+        # 历史查询最多占用一半连接
+        with self.assertRaises(ApiExecuteException) as context:
+            scheduler.acquire(HISTORY_REQUEST)
+        self.assertEqual(context.exception.code, OVERLOADED)
+        slots.append(scheduler.acquire(PLACE_REQUEST))
+        # 最后一个连接留给撤单
+        self.assertRaises(ApiExecuteException, scheduler.acquire, PLACE_REQUEST)
+        slots.append(scheduler.acquire(CANCEL_REQUEST))
+        self.assertEqual(scheduler.stats()["in_use"], 4)
+        self.assertEqual(scheduler.stats()["shed"][HISTORY], 1)
+        for slot in slots:
+            scheduler.release(slot)
+        self.assertEqual(scheduler.stats(), {"in_use": 0, "queued": dict.fromkeys(range(5), 0),
+                                             "shed": {CANCEL: 0, PLACE: 1, ORDER_STATUS: 0, ACCOUNT: 0, HISTORY: 1}})
+
+    def test_queue_by_priority(self):
+        scheduler = PriorityScheduler(2)
+        slots = [scheduler.acquire(CANCEL_REQUEST), scheduler.acquire(CANCEL_REQUEST)]
+        order = []
+
+        def worker(request, name):
+            slot = scheduler.acquire(request)
+            order.append(name)
+            time.sleep(0.01)
+            scheduler.release(slot)
+
+        threads = []
+        for request, name in ((HISTORY_REQUEST, "history"), (ACCOUNT_REQUEST, "account"),
+                              (PLACE_REQUEST, "place"), (CANCEL_REQUEST, "cancel")):
+            threads.append(threading.Thread(target=worker, args=(request, name)))
+            threads[-1].start()
+            time.sleep(0.02)
+        self.assertEqual(scheduler.stats()["queued"], {CANCEL: 1, PLACE: 1, ORDER_STATUS: 0, ACCOUNT: 1, HISTORY: 1})
+        for slot in slots:
+            scheduler.release(slot)
+        for thread in threads:
+            thread.join()
+        self.assertEqual(order, ["cancel", "place", "account", "history"])
+
+    def test_max_queue(self):
+        scheduler = PriorityScheduler(2, max_queue={HISTORY: 0})
+        slot = scheduler.acquire(HISTORY_REQUEST)
+        self.assertRaises(ApiExecuteException, scheduler.acquire, HISTORY_REQUEST)
+        scheduler.release(slot)
+        scheduler.release(scheduler.acquire(HISTORY_REQUEST))
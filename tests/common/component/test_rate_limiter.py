@@ -0,0 +1,75 @@
+import threading
+import time
+from unittest import TestCase
+
+from snbpy.common.component.rate_limiter import TokenBucket, AimdLimiter, RateLimiter, ORDER, CANCEL, QUERY
+from snbpy.common.constant.exceptions import ApiExecuteException, RATE_LIMITED
+from snbpy.common.constant.snb_constant import SecurityType, OrderSide, Currency
+from snbpy.common.domain.request import PlaceOrderRequest, CancelOrderRequest, GetBalanceRequest, AccessTokenRequest
+
+
+class TestRateLimiter(TestCase):
+    def test_token_bucket(self):
+        bucket = TokenBucket(100, burst=5)
+        start = time.monotonic()
+        for _ in range(15):
+            self.assertTrue(bucket.acquire())
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+        bucket = TokenBucket(1, burst=1)
+        self.assertTrue(bucket.acquire())
+        self.assertFalse(bucket.acquire(time.monotonic() + 0.01))
+
+    def test_aimd_increase(self):
+        limiter = AimdLimiter(initial_limit=2, max_limit=4)
+        for _ in range(20):
+            self.assertTrue(limiter.acquire())
+            limiter.release(0.01)
+        self.assertEqual(limiter.limit, 4)
+
+    def test_aimd_release_unsent(self):
+        limiter = AimdLimiter(initial_limit=2)
+        limiter.acquire()
+        limiter.release(None)
+        self.assertEqual((limiter.limit, limiter.in_flight), (2, 0))
+
+    def test_aimd_decrease(self):
+        limiter = AimdLimiter(initial_limit=8)
+        limiter.acquire()
+        limiter.release(0.01, throttled=True)
+        self.assertEqual((limiter.limit, limiter.throttled), (4, 1))
+        # 同一个延迟周期内的限流不重复降低
+        limiter.acquire()
+        limiter.release(0.01)
+        limiter.acquire()
+        limiter.release(0.01, throttled=True)
+        self.assertEqual(limiter.limit, 4)
+
+        limiter = AimdLimiter(initial_limit=8)
+        for latency in (0.01, 0.01, 0.2, 0.2, 0.2):
+            limiter.acquire()
+            limiter.release(latency)
+        self.assertLess(limiter.limit, 8)
+
+    def test_concurrency_limit(self):
+        limiter = AimdLimiter(initial_limit=1)
+        self.assertTrue(limiter.acquire())
+        self.assertFalse(limiter.acquire(time.monotonic() + 0.02))
+        threading.Timer(0.02, limiter.release, (0.01,)).start()
+        self.assertTrue(limiter.acquire(time.monotonic() + 1))
+
+    def test_classify(self):
+        place = PlaceOrderRequest("U123", "1", SecurityType.STK, "00700", "HKEX", OrderSide.BUY, Currency.HKD, 100)
+        self.assertEqual(RateLimiter.classify(place), ORDER)
+        self.assertEqual(RateLimiter.classify(CancelOrderRequest("U123", "2", "1")), CANCEL)
+        self.assertEqual(RateLimiter.classify(GetBalanceRequest("U123")), QUERY)
+        self.assertIsNone(RateLimiter.classify(AccessTokenRequest("U123", "key")))
+
+    def test_max_wait(self):
+        rate_limiter = RateLimiter(max_wait=0.01, initial_limit=1)
+        request = GetBalanceRequest("U123")
+        permit = rate_limiter.acquire(request)
+        with self.assertRaises(ApiExecuteException) as context:
+            rate_limiter.acquire(request)
+        self.assertEqual(context.exception.code, RATE_LIMITED)
+        rate_limiter.release(permit, 0.01)
+        self.assertEqual(rate_limiter.stats()[QUERY]["in_flight"], 0)
@@ -0,0 +1,41 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+
+from snbpy.common.component.single_flight import SingleFlight
+
+
+class TestSingleFlight(TestCase):
+    def test_do(self):
+        single_flight = SingleFlight()
+        calls = []
+
+        def func():
+            calls.append(1)
+            time.sleep(0.05)
+            return object()
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda _: single_flight.do("key", func), range(8)))
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(set(id(result) for result in results)), 1)
+        self.assertEqual(single_flight.in_flight(), 0)
+        single_flight.do("key", func)
+        self.assertEqual(len(calls), 2)
+
+    def test_exception_shared(self):
+        single_flight = SingleFlight()
+        started = threading.Event()
+
+        def func():
+            started.set()
+            time.sleep(0.05)
+            raise ValueError("boom")
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            first = executor.submit(single_flight.do, "key", func)
+            started.wait()
+            second = executor.submit(single_flight.do, "key", func)
+            self.assertRaises(ValueError, first.result)
+            self.assertRaises(ValueError, second.result)
@@ -0,0 +1,132 @@
+import asyncio
+import threading
+import time
+from unittest import TestCase
+
+from snbpy.common.component.subscription import SubscriptionScheduler, ORDER, FILL, POSITION
+from snbpy.common.constant.exceptions import ApiExecuteException
+from snbpy.common.constant.snb_constant import SecurityType, OrderSide, Currency
+from snbpy.simulator import SnbSimulator
+from snbpy.snb_api_client import SnbHttpClient
+from tests.test_snb_http_client import build_config
+
+
+class TestSubscriptionScheduler(TestCase):
+    def setUp(self) -> None:
+        self.simulator = SnbSimulator(port=0)
+        self.simulator.start()
+        config = build_config()
+        config.snb_server = "127.0.0.1"
+        config.snb_port = str(self.simulator.port)
+        self.client = SnbHttpClient(config)
+        self.client.login()
+        self.scheduler = SubscriptionScheduler(self.client, requests_per_second=100, min_interval=0.02,
+                                               max_interval=0.2, hot_period=0.1)
+
+    def tearDown(self) -> None:
+        self.scheduler.stop()
+        self.client.close()
+        self.simulator.stop()
+
+    def place(self, order_id):
+        self.client.place_order(order_id, SecurityType.STK, "00700", "HKEX", OrderSide.BUY, Currency.HKD, 100, 10.0)
+
+    def wait_for(self, predicate, timeout=3):
+        deadline = time.monotonic() + timeout
+        while not predicate():
+            if time.monotonic() > deadline:
+                self.fail("timeout")
+            time.sleep(0.01)
+
+    def test_events(self):
+        self.place("1")
+        self.simulator.fill_order("1", 10)
+        events = []
+        lock = threading.Lock()
+
+        def callback(event):
+            with lock:
+                events.append(event)
+
+        for subscribe in (self.scheduler.subscribe_orders, self.scheduler.subscribe_fills,
+                          self.scheduler.subscribe_positions):
+            subscribe(callback)
+        self.wait_for(lambda: len(events) >= 2)
+        self.assertEqual(sorted(event.kind for event in events), [ORDER, POSITION])
+
+        self.simulator.fill_order("1")
+        self.wait_for(lambda: len(events) >= 5)
+        time.sleep(0.1)
+        kinds = [event.kind for event in events[2:]]
+        self.assertEqual(sorted(kinds), [FILL, ORDER, POSITION])
+        fill = next(event for event in events if event.kind == FILL)
+        self.assertEqual((fill.data["id"], fill.data["quantity"]), ("1", 90))
+        order = next(event for event in events[2:] if event.kind == ORDER)
+        self.assertEqual(order.changes["status"], ("PART_CONCLUDED", "CONCLUDED"))
+
+    def test_pending_cancel_stays_hot(self):
+        self.simulator.cancel_delay = 60
+        self.place("1")
+        events = []
+        subscription = self.scheduler.subscribe_orders(events.append)
+        self.wait_for(lambda: len(events) >= 1)
+        self.client.cancel_order("c1", "1")
+        self.wait_for(lambda: len(events) >= 2)
+        self.assertEqual(events[1].changes["status"], ("REPORTED", "WAIT_WITHDRAW"))
+        # 超过 hot_period 没有事件, 撤单中的订单仍按 min_interval 轮询
+        time.sleep(0.3)
+        self.assertEqual(self.scheduler._channels[ORDER].interval, 0.02)
+        self.simulator.fill_order("1")
+        self.wait_for(lambda: len(events) >= 3)
+        self.assertEqual(events[2].changes["status"], ("WAIT_WITHDRAW", "CONCLUDED"))
+        subscription.cancel()
+
+    def test_backoff(self):
+        subscription = self.scheduler.subscribe_positions(lambda event: None)
+        time.sleep(0.6)
+        # 空闲后间隔按倍数增长到 max_interval, 请求数远少于固定间隔轮询
+        self.assertLess(self.simulator.request_count("position_list"), 12)
+        subscription.cancel()
+        count = self.simulator.request_count("position_list")
+        time.sleep(0.3)
+        self.assertLessEqual(self.simulator.request_count("position_list"), count + 1)
+
+    def test_first_fill_poll_failed(self):
+        self.place("1")
+        self.simulator.fill_order("1", 10)
+        self.simulator.fill_order("1", 20)
+        self.simulator.http_error_rate = 1
+        self.assertRaises(ApiExecuteException, self.scheduler._poll_fills)
+        self.simulator.http_error_rate = 0
+        self.simulator.error_rate = 1
+        self.assertEqual(self.scheduler._poll_fills(), [])
+        self.simulator.error_rate = 0
+        # 首次成功读取前失败的轮询不会把订阅前的成交当作新成交
+        self.assertEqual(self.scheduler._poll_fills(), [])
+        self.simulator.fill_order("1", 30)
+        self.assertEqual([event.data["quantity"] for event in self.scheduler._poll_fills()], [30])
+
+    def test_budget_per_request(self):
+        scheduler = SubscriptionScheduler(self.client, requests_per_second=5)
+        start = time.perf_counter()
+        # 每个未完成状态一个请求, 共 10 个, 超出 5 个令牌的部分需要等待约 1 秒
+        scheduler._poll_orders()
+        self.assertGreater(time.perf_counter() - start, 0.8)
+        self.assertEqual(self.simulator.request_count("order_list"), 10)
+
+    def test_queue(self):
+        async def consume():
+            queue = asyncio.Queue()
+            self.scheduler.subscribe_orders(queue=queue)
+            return await asyncio.wait_for(queue.get(), 3)
+
+        self.place("1")
+        loop = asyncio.new_event_loop()
+        try:
+            event = loop.run_until_complete(consume())
+        finally:
+            loop.close()
+        self.assertEqual((event.kind, event.data["id"]), (ORDER, "1"))
+
+    def test_requires_target(self):
+        self.assertRaises(ValueError, self.scheduler.subscribe_fills)
@@ -0,0 +1,37 @@
+import threading
+import time
+from unittest import TestCase
+
+from snbpy.common.component.token_refresher import TokenRefresher
+
+
+class DummyClient(object):
+    def __init__(self):
+        self.token = "token"
+        self.token_expire_time = int(time.time() * 1000) + 1000
+        self.refreshed = threading.Event()
+
+    def refresh_token(self, stale_token=None):
+        self.token = "new_token"
+        self.token_expire_time = int(time.time() * 1000) + 3600 * 1000
+        self.refreshed.set()
+
+
+class TestTokenRefresher(TestCase):
+    def test_refresh_before_expiry(self):
+        client = DummyClient()
+        refresher = TokenRefresher(client, refresh_ahead=60, retry_interval=0.01)
+        refresher.start()
+        self.assertTrue(client.refreshed.wait(1))
+        self.assertEqual(client.token, "new_token")
+        self.assertTrue(refresher.running)
+        refresher.stop()
+        self.assertFalse(refresher.running)
+
+    def test_not_refresh_valid_token(self):
+        client = DummyClient()
+        client.token_expire_time = int(time.time() * 1000) + 3600 * 1000
+        refresher = TokenRefresher(client, refresh_ahead=60, retry_interval=0.01)
+        refresher.start()
+        self.assertFalse(client.refreshed.wait(0.05))
+        refresher.stop()
@@ -0,0 +1,38 @@
+from unittest import TestCase
+
+from snbpy.common.component.transaction_sync import TransactionStore, TransactionSync
+from tests.test_snb_http_client import FakeHttpClient, build_config
+
+
+class TestTransactionSync(TestCase):
+    def setUp(self) -> None:
+        self.transactions = [{"id": str(i), "order_time": i * 1000, "trade_time": i * 1000 + 10, "symbol": "00700"}
+                             for i in range(25)]
+
+        def handler(url, params, method):
+            order_time_min = params.get("order_time_min")
+            items = [item for item in self.transactions
+                     if order_time_min is None or item["order_time"] >= order_time_min]
+            page, size = params["page"], params["size"]
+            return {"count": len(items), "page": page, "size": size, "items": items[(page - 1) * size:page * size]}
+
+        self.client = FakeHttpClient(build_config(), handler)
+        self.client.login()
+        self.store = TransactionStore()
+        self.sync = TransactionSync(self.client, self.store, overlap=2000, page_size=10)
+
+    def test_sync(self):
+        self.assertEqual(self.sync.sync(), 25)
+        self.assertEqual(self.store.get_watermark("U123"), 24010)
+        self.assertEqual(self.store.count("U123"), 25)
+
+        self.transactions.append({"id": "25", "order_time": 23500, "trade_time": 25010, "symbol": "00700"})
+        self.assertEqual(self.sync.sync(), 1)
+        self.assertEqual(self.client.calls[-1][1]["order_time_min"], 22010)
+        self.assertEqual(self.store.get_watermark("U123"), 25010)
+        self.assertEqual([item["id"] for item in self.store.query("U123", trade_time_min=24000)], ["24", "25"])
+
+    def test_sync_nothing_new(self):
+        self.sync.sync()
+        self.assertEqual(self.sync.sync(), 0)
+        self.assertEqual(self.store.get_watermark("U123"), 24010)
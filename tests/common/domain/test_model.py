@@ -0,0 +1,55 @@
+from unittest import TestCase
+
+from snbpy.common.constant.snb_constant import OrderStatus, OrderSide, SecurityType, Currency, OrderType
+from snbpy.common.domain.model import Order, SecurityDetail
+from snbpy.common.domain.response import HttpResponse
+
+ORDER = {"account_id": "DU123456", "average_price": 0.0, "children": None, "currency": "HKD", "exchange": "HKEX",
+         "filled_quantity": 0, "group_id": None, "id": "1711419657579", "memo": "", "order_time": 1711419658000,
+         "order_type": "STOP_LIMIT", "parent": None, "price": 100.0, "quantity": 100, "rth": True,
+         "secondary_order_id": "004c4d6b.000130f7.66010d09.0002", "security_type": "STK", "side": "BUY",
+         "snb_order_id": "5588456391694560", "status": "WITHDRAWED", "stop_price": None, "symbol": "00700",
+         "tif": "DAY"}
+
+
+class TestModel(TestCase):
+    def test_order(self):
+        order = Order.from_dict(ORDER)
+        self.assertEqual(order.status, OrderStatus.WITHDRAWED)
+        self.assertEqual(order.side, OrderSide.BUY)
+        self.assertEqual(order.security_type, SecurityType.STK)
+        self.assertEqual(order.currency, Currency.HKD)
+        self.assertEqual(order.order_type, OrderType.STOP_LIMIT)
+        self.assertEqual(order.price, 100.0)
+        self.assertEqual(order.to_dict(), ORDER)
+        self.assertFalse(hasattr(order, "__dict__"))
+
+    def test_unknown_enum_value(self):
+        order = Order.from_dict(dict(ORDER, status="NEW_STATUS"))
+        self.assertEqual(order.status, "NEW_STATUS")
+
+    def test_response_accessors(self):
+        response = HttpResponse()
+        response.data = {"count": 2, "page": 1, "size": 10,
+                         "items": [ORDER, dict(ORDER, snb_order_id="2", status="REPORTED")]}
+        orders = response.as_orders()
+        self.assertEqual(len(orders), 2)
+        self.assertEqual(orders[1].status, OrderStatus.REPORTED)
+        self.assertEqual([order.snb_order_id for order in orders], ["5588456391694560", "2"])
+        self.assertEqual(orders[:1], [Order.from_dict(ORDER)])
+
+        response.data = {"cash": 1.0, "currency": "USD", "balance_detail_items": [{"cash": 2.0, "currency": "HKD"}]}
+        balance = response.as_balance()
+        self.assertEqual(balance.currency, Currency.USD)
+        self.assertEqual(balance.balance_detail_items[0].currency, Currency.HKD)
+        self.assertEqual(balance.to_dict()["balance_detail_items"], [{"cash": 2.0, "currency": "HKD"}])
+
+        response.data = [{"symbol": "NVDA", "position": 100, "security_type": "STK"}]
+        self.assertEqual(response.as_positions()[0].position, 100)
+
+    def test_security_detail(self):
+        detail = SecurityDetail.from_dict({"symbol": "00700", "exchange": "HKEX", "currency": "HKD", "name": "腾讯"})
+        self.assertEqual(detail.currency, Currency.HKD)
+        self.assertEqual(detail.get("name"), "腾讯")
+        self.assertEqual(detail.get("exchange"), "HKEX")
+        self.assertEqual(detail.to_dict()["name"], "腾讯")
@@ -0,0 +1,49 @@
+from unittest import TestCase
+from urllib.parse import parse_qsl
+
+from requests.models import RequestEncodingMixin
+
+from snbpy.common.constant.exceptions import InvalidParamException
+from snbpy.common.constant.snb_constant import SecurityType, OrderSide, Currency, OrderType, TradingHours
+from snbpy.common.domain.request import PlaceOrderRequest, OrderTemplate
+
+
+def form(body) -> list:
+    if isinstance(body, bytes):
+        body = body.decode("utf-8")
+    return sorted(parse_qsl(body, keep_blank_values=True))
+
+
+class TestOrderTemplate(TestCase):
+    def test_same_body_as_place_order_request(self):
+        template = OrderTemplate("U123", SecurityType.STK, "00700", "HKEX", Currency.HKD)
+        for side, quantity, price, parent in ((OrderSide.BUY, 100, 100.1, None), (OrderSide.SELL, 200, 99, "P 1")):
+            request = PlaceOrderRequest("U123", "1", SecurityType.STK, "00700", "HKEX", side, Currency.HKD,
+                                        quantity, price, parent=parent)
+            expected = RequestEncodingMixin._encode_params(request.generate_params())
+            self.assertEqual(form(template.encode(side, quantity, price, parent=parent)), form(expected))
+
+    def test_none_fields_omitted(self):
+        template = OrderTemplate("U123", SecurityType.STK, "AAPL", "USEX", Currency.USD, OrderType.MARKET)
+        request = PlaceOrderRequest("U123", "1", SecurityType.STK, "AAPL", "USEX", OrderSide.BUY, Currency.USD, 1,
+                                    price=None, order_type=OrderType.MARKET, stop_price=None)
+        expected = RequestEncodingMixin._encode_params(request.generate_params())
+        body = template.encode(OrderSide.BUY, 1, price=None, stop_price=None)
+        self.assertEqual(form(body), form(expected))
+        self.assertNotIn(b"None", body)
+        self.assertNotIn(b"stop_price", template.request("1", OrderSide.BUY, 1, None, None).generate_params())
+
+    def test_trading_hours(self):
+        template = OrderTemplate("U123", SecurityType.STK, "AAPL", "USEX", Currency.USD, OrderType.MARKET,
+                                 trading_hours=TradingHours.OVERNIGHT)
+        request = PlaceOrderRequest("U123", "1", SecurityType.STK, "AAPL", "USEX", OrderSide.BUY, Currency.USD, 1,
+                                    order_type=OrderType.MARKET, trading_hours=TradingHours.OVERNIGHT)
+        expected = RequestEncodingMixin._encode_params(request.generate_params())
+        self.assertEqual(form(template.encode(OrderSide.BUY, 1)), form(expected))
+
+    def test_request(self):
+        template = OrderTemplate("U123", SecurityType.STK, "00700", "HKEX", Currency.HKD)
+        request = template.request("42", OrderSide.BUY, 100, 100.1)
+        self.assertEqual(request.url, "order/42")
+        self.assertEqual(request.generate_params(), template.encode(OrderSide.BUY, 100, 100.1))
+        self.assertRaises(InvalidParamException, template.request("", OrderSide.BUY, 100, 100.1).verify)
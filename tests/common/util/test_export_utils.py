@@ -0,0 +1,51 @@
+import math
+from unittest import TestCase, skipIf
+
+from snbpy.common.util.export_utils import ExportUtils, TRANSACTION_SCHEMA, POSITION_SCHEMA, numpy, pandas, pyarrow
+
+TRANSACTIONS = [{"account_id": "DU123456", "currency": "USD", "exchange": "USEX", "id": "", "order_price": 18547.75,
+                 "order_quantity": 1.0, "order_time": 1711432599000, "order_type": "LIMIT", "price": 18547.75,
+                 "quantity": 1.0, "rth": False, "security_type": "FUT", "side": "BUY", "status": "CONCLUDED",
+                 "symbol": "MNQ2406", "tif": "DAY", "trade_time": 1711432771000},
+                {"account_id": "DU123456", "currency": "USD", "exchange": "USEX", "id": "", "order_price": 0.0066,
+                 "order_quantity": 1.0, "order_time": 1711331475000, "order_type": "LIMIT", "price": None,
+                 "quantity": 2, "rth": None, "security_type": "FUT", "side": "SELL", "status": "CONCLUDED",
+                 "symbol": "6J2404", "tif": "DAY", "trade_time": None}]
+
+
+class TestExportUtils(TestCase):
+    def test_to_columns(self):
+        columns = ExportUtils.to_columns(TRANSACTIONS, TRANSACTION_SCHEMA)
+        self.assertEqual(list(columns), [name for name, _ in TRANSACTION_SCHEMA])
+        self.assertEqual(columns["symbol"], ["MNQ2406", "6J2404"])
+        self.assertEqual(columns["quantity"], [1.0, 2.0])
+        self.assertTrue(math.isnan(columns["price"][1]))
+        self.assertEqual(columns["rth"], [False, None])
+        self.assertEqual(columns["trade_time"], [1711432771000, None])
+        self.assertEqual(ExportUtils.to_columns([], POSITION_SCHEMA)["symbol"], [])
+
+    @skipIf(numpy is None, "numpy is not installed")
+    def test_to_numpy(self):
+        array = ExportUtils.to_numpy(TRANSACTIONS, TRANSACTION_SCHEMA)
+        self.assertEqual(array.dtype["price"], numpy.dtype("f8"))
+        self.assertEqual(array["trade_time"][0], numpy.datetime64(1711432771000, "ms"))
+        self.assertTrue(numpy.isnat(array["trade_time"][1]))
+        self.assertEqual((array["quantity"] * array["order_price"]).tolist(), [18547.75, 0.0132])
+        self.assertEqual(array["rth"].tolist(), [False, None])
+
+    @skipIf(pandas is None, "pandas is not installed")
+    def test_to_pandas(self):
+        frame = ExportUtils.to_pandas(TRANSACTIONS, TRANSACTION_SCHEMA)
+        self.assertEqual(len(frame), 2)
+        self.assertEqual(str(frame["order_time"].dtype), "datetime64[ms]")
+        self.assertEqual(frame.groupby("side")["quantity"].sum().to_dict(), {"BUY": 1.0, "SELL": 2.0})
+        self.assertEqual(str(frame["rth"].dtype), "boolean")
+        self.assertEqual(frame["rth"].isna().tolist(), [False, True])
+
+    @skipIf(pyarrow is None, "pyarrow is not installed")
+    def test_to_arrow(self):
+        table = ExportUtils.to_arrow(TRANSACTIONS, TRANSACTION_SCHEMA)
+        self.assertEqual(table.num_rows, 2)
+        self.assertEqual(str(table.schema.field("trade_time").type), "timestamp[ms]")
+        self.assertEqual(table.column("price").null_count, 1)
+        self.assertEqual(table.column("rth").to_pylist(), [False, None])
@@ -0,0 +1,19 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+
+from snbpy.common.util.id_utils import OrderIdGenerator
+
+
+class TestOrderIdGenerator(TestCase):
+    def test_next_id(self):
+        generator = OrderIdGenerator()
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            ids = list(executor.map(lambda _: generator.next_id(), range(5000)))
+        self.assertEqual(len(set(ids)), 5000)
+        self.assertTrue(all(order_id.isdigit() for order_id in ids))
+
+    def test_prefix(self):
+        generator = OrderIdGenerator("A")
+        first, second = generator.next_id(), generator.next_id()
+        self.assertTrue(first.startswith("A"))
+        self.assertLess(int(first[1:]), int(second[1:]))
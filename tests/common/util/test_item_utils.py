@@ -0,0 +1,16 @@
+from unittest import TestCase
+
+from snbpy.common.util.item_utils import ItemUtils
+
+
+class TestItemUtils(TestCase):
+    def test_distinct(self):
+        items = [{"snb_order_id": "1"}, {"snb_order_id": "2"}, {"snb_order_id": "1"}]
+        self.assertEqual(ItemUtils.distinct(items, ItemUtils.order_key), items[:2])
+        self.assertEqual(ItemUtils.distinct([], ItemUtils.order_key), [])
+
+    def test_transaction_key(self):
+        first = {"id": "", "trade_time": 1, "symbol": "00700", "side": "BUY", "price": 1.0, "quantity": 100}
+        second = dict(first, trade_time=2)
+        self.assertNotEqual(ItemUtils.transaction_key(first), ItemUtils.transaction_key(second))
+        self.assertEqual(ItemUtils.transaction_key(first), ItemUtils.transaction_key(dict(first)))
@@ -0,0 +1,21 @@
+from unittest import TestCase, skipIf
+
+from snbpy.common.util.json_utils import JsonDecoder, OrjsonDecoder, default_decoder, orjson
+
+BODY = '{"result_code":"60000","msg":null,"result_data":{"symbol":"腾讯控股","price":1.5}}'
+EXPECTED = {"result_code": "60000", "msg": None, "result_data": {"symbol": "腾讯控股", "price": 1.5}}
+
+
+class TestJsonUtils(TestCase):
+    def test_json_decoder(self):
+        self.assertEqual(JsonDecoder().loads(BODY), EXPECTED)
+        self.assertEqual(JsonDecoder().loads(BODY.encode("utf-8")), EXPECTED)
+
+    @skipIf(orjson is None, "orjson is not installed")
+    def test_orjson_decoder(self):
+        self.assertEqual(OrjsonDecoder().loads(BODY.encode("utf-8")), EXPECTED)
+        self.assertEqual(OrjsonDecoder().loads(BODY), EXPECTED)
+        self.assertIsInstance(default_decoder(), OrjsonDecoder)
+
+    def test_default_decoder(self):
+        self.assertEqual(default_decoder().loads(BODY), EXPECTED)
@@ -0,0 +1,102 @@
+from unittest import TestCase
+
+from snbpy.common.constant.exceptions import TokenInvalid, ApiExecuteException
+from snbpy.common.constant.snb_constant import SecurityType, OrderSide, Currency, OrderIdType
+from snbpy.simulator import SnbSimulator, SimulatorError
+from snbpy.snb_api_client import SnbHttpClient
+from tests.test_snb_http_client import build_config
+
+
+class TestSnbSimulator(TestCase):
+    def setUp(self) -> None:
+        self.simulator = SnbSimulator(port=0, secret_key="123", seed=1)
+        self.simulator.start()
+        config = build_config()
+        config.snb_server = "127.0.0.1"
+        config.snb_port = str(self.simulator.port)
+        self.client = SnbHttpClient(config)
+
+    def tearDown(self) -> None:
+        self.client.close()
+        self.simulator.stop()
+
+    def place(self, order_id, side=OrderSide.BUY, quantity=100, price=10.0):
+        return self.client.place_order(order_id, SecurityType.STK, "00700", "HKEX", side, Currency.HKD, quantity,
+                                       price)
+
+    def test_login(self):
+        self.assertRaises(TokenInvalid, self.client.get_balance)
+        self.client.login()
+        self.assertTrue(self.client.get_token_status().succeed())
+        self.client.config.key = "bad"
+        self.assertRaises(ApiExecuteException, self.client.login)
+
+    def test_order_lifecycle(self):
+        self.client.login()
+        self.assertEqual(self.place("1").data, {"id": "1", "status": "REPORTED"})
+        self.assertEqual(self.place("1").result_code, "002006")
+        self.place("2")
+        self.simulator.fill_order("1", 40, 9.5)
+        order = self.client.get_order_by_id("1").data
+        self.assertEqual((order["status"], order["filled_quantity"], order["average_price"]),
+                         ("PART_CONCLUDED", 40, 9.5))
+        self.assertEqual([item["id"] for item in self.client.get_order_list().data["items"]], ["2", "1"])
+        self.assertEqual(self.client.get_order_list(status="REPORTED").data["count"], 1)
+        # 与正式服务一致: status 只支持单个状态, 按 ID 查询只支持客户端订单 ID
+        self.assertEqual(self.client.get_order_list(status="REPORTED,PART_CONCLUDED").data["count"], 0)
+        self.assertEqual(self.client.get_order_by_id(order["snb_order_id"]).result_code, "002006")
+        external = self.simulator.add_order()
+        self.assertEqual(self.client.get_order_list().data["items"][0]["snb_order_id"], external["snb_order_id"])
+
+        snb_order_id = self.client.get_order_by_id("2").data["snb_order_id"]
+        self.assertEqual(self.client.cancel_order("c1", snb_order_id, OrderIdType.SNB).data["status"],
+                         "WAIT_WITHDRAW")
+        self.assertEqual(self.client.cancel_order("c2", "1").data["status"], "PART_WAIT_WITHDRAW")
+        self.assertEqual(self.client.cancel_order("c3", "1").result_code, "002001")
+        # cancel_delay 为 0 时撤单在下一个请求到达时完成
+        self.assertEqual(self.client.get_order_by_id("1").data["status"], "PART_WITHDRAW")
+        self.assertEqual(self.client.get_order_by_id("2").data["status"], "WITHDRAWED")
+
+        self.assertEqual(self.client.get_transaction_list().data["items"][0]["quantity"], 40)
+        position = self.client.get_position_list().data[0]
+        self.assertEqual((position["symbol"], position["position"]), ("00700", 40))
+        self.assertEqual(self.client.get_balance().data["cash"], SnbSimulator.INITIAL_CASH - 380)
+        self.assertEqual(self.client.get_security_detail("00700").data["lot_size"], 100)
+
+    def test_pending_cancel(self):
+        self.client.login()
+        self.simulator.cancel_delay = 60
+        for order_id in ("1", "2", "3"):
+            self.place(order_id)
+        for order_id in ("1", "2", "3"):
+            self.assertEqual(self.client.cancel_order("c" + order_id, order_id).data["status"], "WAIT_WITHDRAW")
+        # 撤单完成前仍可成交
+        self.assertEqual(self.simulator.fill_order("1", 40)["status"], "PART_WAIT_WITHDRAW")
+        self.assertEqual(self.simulator.fill_order("2")["status"], "CONCLUDED")
+        self.assertEqual(self.client.get_order_list(status="WAIT_WITHDRAW").data["count"], 1)
+        self.assertEqual(self.simulator.complete_cancel("1")["status"], "PART_WITHDRAW")
+        self.assertRaises(SimulatorError, self.simulator.complete_cancel, "2")
+        self.simulator.cancel_delay = 0
+        self.assertEqual(self.client.cancel_order("c4", "3").result_code, "002001")
+        self.assertEqual(self.simulator.complete_cancel("3")["status"], "WITHDRAWED")
+        self.assertRaises(SimulatorError, self.simulator.fill_order, "3")
+
+    def test_auto_fill(self):
+        self.client.login()
+        self.simulator.auto_fill = True
+        self.place("1")
+        self.place("2", OrderSide.SELL, 150, 12.0)
+        position = self.client.get_position_list().data[0]
+        self.assertEqual((position["position"], position["realized_pnl"], position["average_price"]),
+                         (-50, 200.0, 12.0))
+
+    def test_error_injection(self):
+        self.client.login()
+        self.simulator.error_rate = 1
+        self.assertEqual(self.client.get_balance().result_code, "002001")
+        self.simulator.error_rate = 0
+        self.simulator.http_error_rate = 1
+        self.assertRaises(ApiExecuteException, self.client.get_balance)
+        self.assertEqual(self.simulator.handle("GET", "funds", {}, {})[0], 503)
+        self.assertEqual(self.simulator.handle("GET", "unknown", {}, {})[0], 404)
+        self.assertEqual(self.simulator.request_count("balance"), 3)
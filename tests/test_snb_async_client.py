@@ -0,0 +1,174 @@
+import asyncio
+import json
+import threading
+from unittest import TestCase, skipIf
+
+from snbpy.common.component.hedging import RequestHedger
+from snbpy.common.component.metrics import MetricsRecorder
+from snbpy.common.constant.exceptions import TokenInvalid, ApiExecuteException, THROTTLED, LOGIN_NEEDED
+from snbpy.common.constant.snb_constant import HttpMethod, SecurityType, OrderSide, Currency
+from snbpy.common.domain.request import PlaceOrderRequest, OrderTemplate, GetOrderListRequest
+from snbpy.common.domain.snb_config import SnbConfig
+from snbpy.simulator import SnbSimulator
+from snbpy.snb_async_client import AsyncSnbHttpClient, aiohttp
+
+
+class FakeAsyncClient(AsyncSnbHttpClient):
+    def __init__(self, config):
+        super().__init__(config)
+        self.calls = []
+
+    async def _do_execute(self, url, params, header, timeout, method):
+        self.calls.append((url, params, dict(header), method))
+        await asyncio.sleep(0)
+        if url.startswith("auth/"):
+            data = {"access_token": "token", "expiry_time": 4102416000000}
+        else:
+            data = {"url": url}
+        return json.dumps({"result_code": "60000", "msg": None, "result_data": data})
+
+
+class TestAsyncSnbHttpClient(TestCase):
+    def setUp(self) -> None:
+        self.config = SnbConfig()
+        self.config.account = "U123"
+        self.config.key = "123"
+        self.config.sign_type = "None"
+        self.config.snb_server = "localhost"
+        self.config.snb_port = "8080"
+        self.config.timeout = 1000
+        self.config.schema = "http"
+        self.client = FakeAsyncClient(self.config)
+
+    def test_login_needed(self):
+        with self.assertRaises(TokenInvalid):
+            asyncio.run(self.client.get_balance())
+
+    def test_concurrent_requests(self):
+        async def run():
+            await self.client.login()
+            return await asyncio.gather(self.client.get_balance(), self.client.get_position_list(),
+                                        self.client.place_order("1", SecurityType.STK, "00700", "HKEX", OrderSide.BUY,
+                                                                Currency.HKD, 100, 100.1))
+
+        balance, positions, order = asyncio.run(run())
+        self.assertEqual(self.client.token, "token")
+        self.assertEqual(balance.data, {"url": "funds"})
+        self.assertEqual(positions.data, {"url": "position"})
+        self.assertTrue(order.succeed())
+        self.assertEqual(self.client.calls[-1][3], HttpMethod.POST)
+        self.assertEqual(self.client.calls[-1][2]["Cookie"], "access_token=token")
+
+    def test_place_orders(self):
+        async def run():
+            await self.client.login()
+            request_list = [PlaceOrderRequest("U123", str(i), SecurityType.STK, "00700", "HKEX", OrderSide.BUY,
+                                              Currency.HKD, 100, 100.1) for i in ("1", "", "3")]
+            return await self.client.place_orders(request_list, max_workers=2)
+
+        results = asyncio.run(run())
+        self.assertEqual([result.succeed() for result in results], [True, False, True])
+        self.assertEqual(results[2].response.data, {"url": "order/3"})
+
+    def test_metrics(self):
+        recorder = MetricsRecorder()
+        self.client.metrics_sink = recorder
+
+        async def run():
+            await self.client.login()
+            await self.client.get_balance()
+
+        asyncio.run(run())
+        self.client.token = None
+        with self.assertRaises(TokenInvalid):
+            asyncio.run(self.client.get_balance())
+        snapshot = recorder.snapshot()
+        self.assertEqual(snapshot["GetBalanceRequest"]["result_codes"], {"60000": 1, LOGIN_NEEDED: 1})
+        self.assertEqual(set(phase for phase, latency in snapshot["GetBalanceRequest"]["latency"].items()
+                             if latency["count"]), {"verify", "prepare", "network", "parse", "total"})
+
+    def test_login_persists_token_off_loop(self):
+        threads = []
+
+        def set_token(token, token_expire_time):
+            threads.append(threading.current_thread())
+
+        self.client._set_token = set_token
+        asyncio.run(self.client.login())
+        self.assertEqual(len(threads), 1)
+        self.assertIsNot(threads[0], threading.main_thread())
+
+    def test_sync_only_hooks(self):
+        with self.assertRaises(ValueError):
+            self.client.hedger = RequestHedger()
+        with self.assertRaises(ValueError):
+            self.client.set_coalescing(GetOrderListRequest)
+        self.client.rate_limiter = None
+        self.client.set_coalescing(GetOrderListRequest, False)
+        self.assertIsNone(self.client.hedger)
+
+    def test_encode_params(self):
+        self.assertEqual(AsyncSnbHttpClient._encode_params({"a": None, "b": True, "c": 1}), {"b": "True", "c": "1"})
+
+
+@skipIf(aiohttp is None, "aiohttp is not installed")
+class TestAsyncSnbHttpClientWithSimulator(TestCase):
+    def setUp(self) -> None:
+        self.simulator = SnbSimulator(port=0, secret_key="123")
+        self.simulator.start()
+        self.config = SnbConfig()
+        self.config.account = "U123"
+        self.config.key = "123"
+        self.config.sign_type = "None"
+        self.config.snb_server = "127.0.0.1"
+        self.config.snb_port = str(self.simulator.port)
+        self.config.timeout = 5
+        self.config.schema = "http"
+
+    def tearDown(self) -> None:
+        self.simulator.stop()
+
+    def run_client(self, func):
+        async def run():
+            async with AsyncSnbHttpClient(self.config) as client:
+                return await func(client)
+
+        return asyncio.run(run())
+
+    def test_orders(self):
+        async def run(client):
+            await client.login()
+            placed = await client.place_order("1", SecurityType.STK, "00700", "HKEX", OrderSide.BUY, Currency.HKD,
+                                              100, 350.2)
+            template = OrderTemplate("U123", SecurityType.STK, "00700", "HKEX", Currency.HKD)
+            template_placed = await client.execute(template.request("2", OrderSide.SELL, 200, 351.4))
+            reported = await client.get_order_list(status="REPORTED", size=1)
+            order = await client.get_order_by_id("2")
+            return placed, template_placed, reported, order
+
+        placed, template_placed, reported, order = self.run_client(run)
+        self.assertEqual(placed.data, {"id": "1", "status": "REPORTED"})
+        self.assertEqual(template_placed.data, {"id": "2", "status": "REPORTED"})
+        # GET 参数: status 过滤与分页
+        self.assertEqual((reported.data["count"], reported.data["size"], len(reported.data["items"])), (2, 1, 1))
+        # POST 表单: 模板编码的请求体
+        self.assertEqual((order.data["side"], order.data["quantity"], order.data["price"], order.data["symbol"]),
+                         ("SELL", 200, 351.4, "00700"))
+
+    def test_token_invalid(self):
+        async def run(client):
+            client.token, client.token_expire_time = "bad", 4102416000000
+            await client.get_balance()
+
+        self.assertRaises(TokenInvalid, self.run_client, run)
+
+    def test_throttled(self):
+        async def run(client):
+            await client.login()
+            self.simulator.http_error_status = 429
+            self.simulator.http_error_rate = 1
+            await client.get_balance()
+
+        with self.assertRaises(ApiExecuteException) as context:
+            self.run_client(run)
+        self.assertEqual(context.exception.code, THROTTLED)
@@ -0,0 +1,53 @@
+from unittest import TestCase
+
+from snbpy.common.constant.exceptions import ConfigException, TokenInvalid
+from snbpy.simulator import SnbSimulator
+from snbpy.snb_client_manager import SnbClientManager
+from tests.test_snb_http_client import build_config
+
+
+class TestSnbClientManager(TestCase):
+    def setUp(self) -> None:
+        self.simulator = SnbSimulator(port=0)
+        self.simulator.start()
+        self.configs = []
+        for account in ("U1", "U2", "U3"):
+            config = build_config()
+            config.account = account
+            config.snb_server = "127.0.0.1"
+            config.snb_port = str(self.simulator.port)
+            self.configs.append(config)
+        self.manager = SnbClientManager(self.configs, pool_size=4)
+
+    def tearDown(self) -> None:
+        self.manager.close()
+        self.simulator.stop()
+
+    def test_shared_session(self):
+        self.assertEqual(self.manager.accounts, ["U1", "U2", "U3"])
+        self.assertTrue(all(self.manager[account].session is self.manager.session
+                            for account in self.manager.accounts))
+        self.assertEqual(self.manager.session.get_adapter("http://127.0.0.1")._pool_maxsize, 4)
+        self.manager["U1"].close()
+        self.manager.login(["U2"])
+        self.assertTrue(self.manager["U2"].get_balance().succeed())
+
+    def test_fan_out(self):
+        results = self.manager.login()
+        self.assertTrue(all(result.succeed() for result in results.values()))
+        tokens = set(self.manager[account].token for account in self.manager.accounts)
+        self.assertEqual(len(tokens), 3)
+
+        self.manager["U3"]._set_token(None, 0)
+        balances = self.manager.get_balance()
+        self.assertEqual(list(balances), ["U1", "U2", "U3"])
+        self.assertTrue(balances["U1"].succeed() and balances["U2"].succeed())
+        self.assertIsInstance(balances["U3"].exception, TokenInvalid)
+        self.assertEqual(balances["U1"].request, "U1")
+
+        self.assertTrue(all(result.succeed() for result in self.manager.get_position_list(accounts=["U1"]).values()))
+        self.assertEqual(self.manager.get_order_list(accounts=["U1", "U2"])["U2"].response.data["count"], 0)
+
+    def test_duplicate_account(self):
+        self.assertRaises(ConfigException, SnbClientManager, self.configs + [self.configs[0]])
+        self.assertRaises(ConfigException, SnbClientManager, [])
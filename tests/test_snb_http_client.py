@@ -0,0 +1,425 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+
+from snbpy.common.component.hedging import RequestHedger
+from snbpy.common.component.metrics import MetricsRecorder
+from snbpy.common.component.priority_scheduler import PriorityScheduler, HISTORY
+from snbpy.common.component.rate_limiter import RateLimiter, QUERY
+from snbpy.common.constant.exceptions import ApiExecuteException, TokenInvalid, THROTTLED, OVERLOADED
+from snbpy.common.constant.snb_constant import SecurityType, OrderSide, Currency, HttpMethod
+from snbpy.common.domain.request import PlaceOrderRequest, GetOrderListRequest
+from snbpy.common.domain.snb_config import SnbConfig
+from snbpy.snb_api_client import SnbHttpClient
+
+
+def build_config() -> SnbConfig:
+    config = SnbConfig()
+    config.account = "U123"
+    config.key = "123"
+    config.sign_type = "None"
+    config.snb_server = "localhost"
+    config.snb_port = "8080"
+    config.timeout = 1000
+    config.schema = "http"
+    return config
+
+
+class FakeHttpClient(SnbHttpClient):
+    """
+    不访问网络, 按 url 返回 handler 生成的 result_data
+    handler 返回异常时抛出, 返回 (result_code, result_data) 时使用指定的 result_code
+    每次登录返回不同的 token: token, token2, token3 ...
+    """
+
+    def __init__(self, config, handler=None):
+        super().__init__(config)
+        self.handler = handler
+        self.calls = []
+        self.login_count = 0
+        self._calls_lock = threading.Lock()
+
+    def _do_execute(self, url, params, header, timeout, method):
+        result_code = "60000"
+        with self._calls_lock:
+            self.calls.append((url, params, header, method))
+            if url.startswith("auth/"):
+                self.login_count += 1
+        if url.startswith("auth/"):
+            time.sleep(0.01)
+            token = "token" if self.login_count == 1 else "token%d" % self.login_count
+            data = {"access_token": token, "expiry_time": 4102416000000}
+        elif self.handler is not None:
+            data = self.handler(url, params, method)
+        else:
+            data = {"url": url}
+        if isinstance(data, Exception):
+            raise data
+        if isinstance(data, tuple):
+            result_code, data = data
+        return json.dumps({"result_code": result_code, "msg": None, "result_data": data})
+
+
+def order_list_handler(orders):
+    """
+    按 page/size 分页返回 orders, status 与正式服务一样只支持单个状态
+    """
+
+    def handler(url, params, method):
+        if url in ("order", "trade") and method == HttpMethod.GET:
+            page, size = params["page"], params["size"]
+            items = [order for order in orders if order.get("status") == params["status"]] \
+                if params.get("status") else orders
+            return {"count": len(items), "page": page, "size": size, "items": items[(page - 1) * size:page * size]}
+        return {"id": params.get("new_id"), "status": "WITHDRAWED"}
+
+    return handler
+
+
+class TestSnbHttpClient(TestCase):
+    def setUp(self) -> None:
+        self.client = FakeHttpClient(build_config())
+        self.client.login()
+
+    def test_pool_size(self):
+        adapter = self.client.session.get_adapter("https://localhost")
+        self.assertEqual(adapter._pool_maxsize, 10)
+
+    def test_shared_headers_not_mutated(self):
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            responses = list(executor.map(lambda _: self.client.get_balance(), range(64)))
+        self.assertTrue(all(response.succeed() for response in responses))
+        self.assertNotIn("Cookie", self.client._headers)
+        headers = [call[2] for call in self.client.calls if call[0] == "funds"]
+        self.assertEqual(len(headers), 64)
+        self.assertEqual(len(set(id(header) for header in headers)), 64)
+        self.assertTrue(all(header["Cookie"] == "access_token=token" for header in headers))
+
+    def test_place_orders(self):
+        def handler(url, params, method):
+            if url == "order/3":
+                return ValueError("boom")
+            return {"id": url.split("/")[1], "status": "REPORTED"}
+
+        self.client.handler = handler
+        request_list = [PlaceOrderRequest("U123", str(i), SecurityType.STK, "00700", "HKEX", OrderSide.BUY,
+                                          Currency.HKD, 100, 100.1) for i in range(1, 21)]
+        request_list.append(PlaceOrderRequest("U123", "", SecurityType.STK, "00700", "HKEX", OrderSide.BUY,
+                                              Currency.HKD, 100, 100.1))
+        results = self.client.place_orders(request_list, max_workers=4)
+        self.assertEqual(len(results), 21)
+        self.assertEqual([result.request for result in results], request_list)
+        self.assertEqual(results[0].response.data["id"], "1")
+        self.assertFalse(results[2].succeed())
+        self.assertIsInstance(results[2].exception, ApiExecuteException)
+        self.assertFalse(results[20].succeed())
+        self.assertEqual(sum(1 for result in results if result.succeed()), 19)
+
+    def test_cancel_all_open(self):
+        statuses = ["REPORTED", "CONCLUDED", "PART_CONCLUDED", "WITHDRAWED", "WAIT_REPORT"]
+        orders = [{"snb_order_id": str(i), "symbol": "00700" if i % 2 else "AAPL", "status": statuses[i % 5]}
+                  for i in range(250)]
+        self.client.handler = order_list_handler(orders)
+        results = self.client.cancel_all_open()
+        self.assertEqual(len(results), 150)
+        self.assertTrue(all(result.succeed() for result in results))
+        self.assertEqual(sorted(int(result.request.origin_order_id) for result in results),
+                         [int(order["snb_order_id"]) for order in orders if order["status"] in
+                          ("REPORTED", "PART_CONCLUDED", "WAIT_REPORT")])
+        self.assertEqual(sorted(call[1]["status"] for call in self.client.calls if call[0] == "order"),
+                         ["NO_REPORT", "PART_CONCLUDED", "REPORTED", "WAIT_REPORT"])
+        cancel_ids = [call[1]["new_id"] for call in self.client.calls if call[3] == HttpMethod.DELETE]
+        self.assertEqual(len(set(cancel_ids)), 150)
+        self.assertTrue(all(call[1]["order_id_type"] == "SNB" for call in self.client.calls
+                            if call[3] == HttpMethod.DELETE))
+
+        results = self.client.cancel_all_open(symbol="AAPL")
+        self.assertEqual(len(results), 75)
+
+    def test_cancel_all_open_partial_query_failure(self):
+        orders = [{"snb_order_id": str(i), "status": "REPORTED"} for i in range(5)]
+        list_handler = order_list_handler(orders)
+
+        def handler(url, params, method):
+            if url == "order" and params.get("status") == "NO_REPORT":
+                return ValueError("timeout")
+            return list_handler(url, params, method)
+
+        self.client.handler = handler
+        with self.assertRaises(ApiExecuteException):
+            self.client.get_open_orders()
+        results = self.client.cancel_all_open()
+        self.assertEqual(len(results), 6)
+        self.assertTrue(all(result.succeed() for result in results[:5]))
+        self.assertEqual(sorted(result.request.origin_order_id for result in results[:5]),
+                         [order["snb_order_id"] for order in orders])
+        self.assertFalse(results[5].succeed())
+        self.assertEqual(results[5].request.status, "NO_REPORT")
+        self.assertIsInstance(results[5].exception, ApiExecuteException)
+        self.assertEqual(len([call for call in self.client.calls if call[3] == HttpMethod.DELETE]), 5)
+
+    def test_iter_orders(self):
+        orders = [{"snb_order_id": str(i)} for i in range(95)]
+        self.client.handler = order_list_handler(orders)
+        iterator = self.client.iter_orders(size=10)
+        self.assertEqual(next(iterator), orders[0])
+        self.assertEqual([orders[0]] + list(iterator), orders)
+        self.assertEqual(len([call for call in self.client.calls if call[0] == "order"]), 10)
+
+    def test_iter_transactions_close_early(self):
+        transactions = [{"id": str(i)} for i in range(50)]
+        self.client.handler = order_list_handler(transactions)
+        iterator = self.client.iter_transactions(size=10, side="BUY")
+        self.assertEqual([next(iterator) for _ in range(3)], transactions[:3])
+        iterator.close()
+        self.assertLessEqual(len([call for call in self.client.calls if call[0] == "trade"]), 2)
+        self.assertEqual(self.client.calls[-1][1]["side"], "BUY")
+
+    def test_get_all_orders(self):
+        orders = [{"snb_order_id": str(i)} for i in range(95)]
+        self.client.handler = order_list_handler(orders)
+        self.assertEqual(self.client.get_all_orders(size=10, max_workers=4), orders)
+        self.assertEqual(sorted(call[1]["page"] for call in self.client.calls if call[0] == "order"),
+                         list(range(1, 11)))
+
+    def test_get_all_transactions_shifted(self):
+        transactions = [{"id": str(i), "trade_time": i} for i in range(30)]
+        handler = order_list_handler(transactions)
+
+        def shifting_handler(url, params, method):
+            if params["page"] == 1:
+                data = handler(url, params, method)
+                # 第一页之后有新成交插入到最前面, 后续页整体后移一条
+                transactions.insert(0, {"id": "new", "trade_time": 100})
+                return data
+            return handler(url, params, method)
+
+        self.client.handler = shifting_handler
+        result = self.client.get_all_transactions(size=10)
+        self.assertEqual([item["id"] for item in result], [str(i) for i in range(30)])
+        self.assertEqual(len([call for call in self.client.calls if call[0] == "trade"]), 4)
+
+    def test_security_detail_cache(self):
+        self.assertEqual(self.client.get_security_detail("00700").data, {"url": "security/details"})
+        self.client.get_security_detail("00700")
+        self.assertEqual(len([call for call in self.client.calls if call[0] == "security/details"]), 1)
+        self.assertEqual(self.client.security_cache.hits, 1)
+
+        self.client.get_security_detail("00700", use_cache=False)
+        self.client.invalidate_security_detail("00700")
+        self.client.get_security_detail("00700")
+        self.assertEqual(len([call for call in self.client.calls if call[0] == "security/details"]), 3)
+
+    def test_cache_path(self):
+        with tempfile.TemporaryDirectory() as cache_path:
+            config = build_config()
+            config.cache_path = cache_path
+            client = FakeHttpClient(config)
+            client.login()
+            client.get_security_detail("00700")
+
+            warm_client = FakeHttpClient(config)
+            self.assertEqual(warm_client.token, "token")
+            self.assertEqual(warm_client.get_security_detail("00700").data, {"url": "security/details"})
+            self.assertEqual(warm_client.calls, [])
+
+    def test_unwritable_cache_path(self):
+        with tempfile.NamedTemporaryFile() as blocker:
+            config = build_config()
+            config.cache_path = os.path.join(blocker.name, "cache")
+            client = FakeHttpClient(config)
+            with self.assertLogs("snbpy", level="WARNING"):
+                client.login()
+            self.assertEqual(client.token, "token")
+            self.assertTrue(client.get_security_detail("00700").succeed())
+
+    def test_token_expired(self):
+        self.client.token_expire_time = int(time.time() * 1000) - 1
+        self.assertRaises(TokenInvalid, self.client.get_balance)
+
+    def test_coalescing(self):
+        def handler(url, params, method):
+            time.sleep(0.05)
+            return {"url": url}
+
+        self.client.handler = handler
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            balances = list(executor.map(lambda _: self.client.get_balance(), range(8)))
+            orders = list(executor.map(lambda _: self.client.get_order_list(), range(4)))
+        self.assertEqual(len(set(id(response) for response in balances)), 1)
+        self.assertEqual(len([call for call in self.client.calls if call[0] == "funds"]), 1)
+        self.assertEqual(len([call for call in self.client.calls if call[0] == "order"]), 4)
+
+        self.client.set_coalescing(GetOrderListRequest)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(lambda page: self.client.get_order_list(page=page % 2 + 1), range(4)))
+        self.assertEqual(len([call for call in self.client.calls if call[0] == "order"]), 6)
+
+    def test_keep_result_str(self):
+        body = b'{"result_code":"60000","msg":null,"result_data":{"symbol":"\xe8\x85\xbe\xe8\xae\xaf"}}'
+        response = self.client._parse_response(body)
+        self.assertEqual(response.data, {"symbol": "腾讯"})
+        self.assertEqual(response.result_str, body.decode("utf-8"))
+
+        config = build_config()
+        config.keep_result_str = False
+        response = FakeHttpClient(config)._parse_response(body)
+        self.assertEqual(response.data, {"symbol": "腾讯"})
+        self.assertIsNone(response.result_str)
+
+    def test_place_template_order(self):
+        template = self.client.create_order_template(SecurityType.STK, "00700", "HKEX", Currency.HKD)
+        self.assertEqual(template.account_id, "U123")
+        response = self.client.place_template_order(template, "42", OrderSide.BUY, 100, 100.1)
+        self.assertTrue(response.succeed())
+        url, params, _, method = self.client.calls[-1]
+        self.assertEqual((url, method), ("order/42", HttpMethod.POST))
+        self.assertEqual(params, template.encode(OrderSide.BUY, 100, 100.1))
+
+    def test_metrics(self):
+        recorder = MetricsRecorder()
+        self.client.metrics_sink = recorder
+        self.client.get_balance()
+        self.client.handler = lambda url, params, method: ValueError("boom")
+        self.assertRaises(ApiExecuteException, self.client.get_position_list)
+        snapshot = recorder.snapshot()
+        self.assertEqual(snapshot["GetBalanceRequest"]["result_codes"], {"60000": 1})
+        self.assertEqual(set(phase for phase, latency in snapshot["GetBalanceRequest"]["latency"].items()
+                             if latency["count"]), {"verify", "prepare", "network", "parse", "total"})
+        self.assertEqual(snapshot["GetPositionListRequest"]["result_codes"], {"002001": 1})
+
+        self.client.metrics_sink = None
+        self.client.handler = None
+        self.client.get_balance()
+        self.assertEqual(recorder.snapshot()["GetBalanceRequest"]["count"], 1)
+
+    def test_hedging(self):
+        self.client.hedger = RequestHedger(min_delay=0.01, max_delay=0.02)
+        slow = threading.Event()
+
+        def handler(url, params, method):
+            if url == "order/1" and not slow.is_set():
+                slow.set()
+                time.sleep(0.5)
+            return {"url": url}
+
+        self.client.handler = handler
+        start = time.perf_counter()
+        self.assertEqual(self.client.get_order_by_id("1").data, {"url": "order/1"})
+        self.assertLess(time.perf_counter() - start, 0.3)
+        self.client.place_order("2", SecurityType.STK, "00700", "HKEX", OrderSide.BUY, Currency.HKD, 100, 1)
+        self.assertEqual(self.client.hedger.stats()["requests"], 1)
+        headers = [call[2] for call in self.client.calls if call[0] == "order/1"]
+        self.assertEqual(len(headers), 2)
+        self.assertIsNot(headers[0], headers[1])
+        self.client.hedger.close()
+
+    def test_hedge_takes_slot(self):
+        self.client.hedger = RequestHedger(min_delay=0.01, max_delay=0.01)
+        self.client.priority_scheduler = PriorityScheduler(slots=1)
+
+        def handler(url, params, method):
+            time.sleep(0.1)
+            return {"url": url}
+
+        self.client.handler = handler
+        self.assertEqual(self.client.get_order_by_id("1").data, {"url": "order/1"})
+        # 唯一的连接被第一次请求占用, 不发送对冲请求
+        self.assertEqual(len([call for call in self.client.calls if call[0] == "order/1"]), 1)
+        self.assertEqual(self.client.priority_scheduler.stats()["in_use"], 0)
+        self.assertEqual(self.client.hedger.stats()["hedged"], 0)
+        self.assertEqual(self.client.hedger.stats()["budget"], 10)
+        self.client.hedger.close()
+
+    def test_rate_limiter(self):
+        self.client.rate_limiter = RateLimiter(initial_limit=8)
+        self.client.handler = lambda url, params, method: ApiExecuteException(THROTTLED, "http status 429")
+        with self.assertRaises(ApiExecuteException) as context:
+            self.client.get_order_by_id("1")
+        self.assertEqual(context.exception.code, THROTTLED)
+        self.assertEqual(self.client.rate_limiter.stats()[QUERY], {"limit": 4, "in_flight": 0, "throttled": 1})
+
+        self.client.throttled_codes = frozenset(["003001"])
+        self.client.handler = lambda url, params, method: ("003001", None)
+        time.sleep(0.01)
+        self.assertEqual(self.client.get_order_by_id("1").result_code, "003001")
+        self.assertEqual(self.client.rate_limiter.stats()[QUERY]["throttled"], 2)
+
+    def test_rate_limiter_ignores_scheduler_wait(self):
+        self.client.rate_limiter = RateLimiter(initial_limit=8)
+        self.client.priority_scheduler = PriorityScheduler(slots=1)
+
+        def handler(url, params, method):
+            time.sleep(0.01)
+            return {"url": url}
+
+        self.client.handler = handler
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(lambda i: self.client.get_order_by_id(str(i)), range(32)))
+        # 排队等待连接的时间不计入延迟, 限流器不会把本地排队当作服务端拥塞而降低并发上限
+        self.assertGreaterEqual(self.client.rate_limiter.stats()[QUERY]["limit"], 8)
+        self.assertEqual(self.client.rate_limiter.stats()[QUERY]["in_flight"], 0)
+
+    def test_priority_scheduler(self):
+        self.client.priority_scheduler = PriorityScheduler(2, max_wait={HISTORY: 0.05})
+        started = threading.Event()
+
+        def handler(url, params, method):
+            if url == "trade":
+                started.set()
+                time.sleep(0.3)
+            return {"url": url}
+
+        self.client.handler = handler
+        thread = threading.Thread(target=self.client.get_transaction_list)
+        thread.start()
+        started.wait()
+        with self.assertRaises(ApiExecuteException) as context:
+            self.client.get_transaction_list()
+        self.assertEqual(context.exception.code, OVERLOADED)
+        # 历史查询占满自己的份额时, 下单与撤单仍有连接可用
+        start = time.perf_counter()
+        self.client.cancel_order("c1", "1")
+        self.assertLess(time.perf_counter() - start, 0.2)
+        thread.join()
+        self.assertEqual(self.client.priority_scheduler.stats()["in_use"], 0)
+
+
+class TestAutoLogin(TestCase):
+    def setUp(self) -> None:
+        config = build_config()
+        config.auto_login = True
+        self.client = FakeHttpClient(config)
+
+    def tearDown(self) -> None:
+        self.client.close()
+
+    def test_login_once(self):
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            responses = list(executor.map(lambda _: self.client.get_balance(), range(64)))
+        self.assertTrue(all(response.succeed() for response in responses))
+        self.assertEqual(self.client.login_count, 1)
+        self.assertTrue(self.client._token_refresher.running)
+
+    def test_relogin_on_token_invalid(self):
+        self.client.token_invalid_codes = frozenset(["60401"])
+
+        def handler(url, params, method):
+            return {"url": url} if self.client.login_count > 1 else ("60401", None)
+
+        self.client.handler = handler
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            responses = list(executor.map(lambda _: self.client.get_position_list(), range(16)))
+        self.assertTrue(all(response.succeed() for response in responses))
+        self.assertEqual(self.client.login_count, 2)
+        self.assertEqual(self.client.token, "token2")
+
+    def test_retry_once(self):
+        self.client.token_invalid_codes = frozenset(["60401"])
+        self.client.handler = lambda url, params, method: ("60401", None)
+        self.assertRaises(TokenInvalid, self.client.get_balance)
+        self.assertEqual(self.client.login_count, 2)